@@ -8,6 +8,7 @@
 from .geoseries import GeoSeries
 from .psds import PSD, MultiplePSD
 from .multipleseries import MultipleSeries
+from .alignedmultipleseries import AlignedMultipleSeries
 from .multiplegeoseries import MultipleGeoSeries
 from .surrogateseries import SurrogateSeries
 from .ensembleseries import EnsembleSeries
@@ -15,6 +16,8 @@
 from .coherence import Coherence
 from .corr import Corr
 from .correns import CorrEns
+from .laggedcorr import LaggedCorr
+from .causalitymatrix import CausalityMatrix
 from .multivardecomp import MultivariateDecomp
 from .ssares import SsaRes
 from .lipd import Lipd
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AlignedMultipleSeries objects are MultipleSeries whose members share a single time axis,
+stored as one time vector and an (nt, p) matrix of values. The member Series are only created
+on demand, as views into that matrix, so that matrix-based methods (e.g. PCA, correlation and
+causality matrices) can operate on the aligned data without copying it.
+"""
+
+import copy
+
+import numpy as np
+
+from ..core.multipleseries import MultipleSeries
+
+class AlignedMultipleSeries(MultipleSeries):
+    '''AlignedMultipleSeries objects are MultipleSeries whose members share a single time axis.
+
+    They are returned by `MultipleSeries.common_time(as_matrix=True)`. The aligned data are
+    stored as a time vector and an (nt, p) matrix of values; the `series_list` is only built
+    the first time it is accessed, each member being a shallow copy of the original Series whose
+    `time` and `value` are views into the shared arrays.
+
+    Once `series_list` has been accessed, its members may be modified or replaced like those of
+    any MultipleSeries; `time` and `values` are then read back from the members.
+
+    Parameters
+    ----------
+
+    time : array
+
+        the common time axis, of length nt
+
+    values : array
+
+        the aligned values, of shape (nt, p)
+
+    series_list : list
+
+        the p original Series, which provide the metadata (labels, units, etc.) of the members
+
+    time_unit : str
+
+        The target time unit for every series in the list.
+        If None, then no conversion will be applied;
+
+    label : str
+
+        label of the collection of timeseries (e.g. 'Euro 2k')
+
+    See also
+    --------
+
+    pyleoclim.core.multipleseries.MultipleSeries.common_time : Aligns the time axes of a MultipleSeries object
+
+    Examples
+    --------
+
+    .. jupyter-execute::
+
+        import numpy as np
+        import pyleoclim as pyleo
+        from pyleoclim.utils.tsmodel import colored_noise
+
+        serieslist = []
+        for j in range(3):
+            t = np.sort(np.random.default_rng(j).uniform(0, 200, 150))
+            v = colored_noise(alpha=1, t=t)
+            serieslist.append(pyleo.Series(time=t, value=v, label=f'series {j+1}', verbose=False))
+
+        msa = pyleo.MultipleSeries(serieslist).common_time(as_matrix=True)
+        print(msa.values.shape)
+        res = msa.pca()
+
+    '''
+
+    def __init__(self, time, values, series_list, time_unit=None, label=None):
+        time = np.asarray(time)
+        values = np.asarray(values)
+        if np.ndim(values) != 2 or np.shape(values)[0] != np.size(time):
+            raise ValueError('values must be a 2D array with as many rows as the time axis has points')
+        if np.shape(values)[1] != len(series_list):
+            raise ValueError('values must have one column per Series')
+
+        self._time = time
+        self._values = values
+        self._templates = list(series_list)
+        self._series_list = None
+        self.time_unit = time_unit
+        self.label = label
+        self.name = None
+
+    @property
+    def series_list(self):
+        if self._series_list is None:
+            views = []
+            for idx, item in enumerate(self._templates):
+                ts = copy.copy(item)
+                ts.time = self._time
+                ts.value = self._values[:, idx]
+                views.append(ts)
+            self._series_list = views
+            # from now on, the members are the reference
+            self._time, self._values, self._templates = None, None, None
+        return self._series_list
+
+    @series_list.setter
+    def series_list(self, series_list):
+        self._series_list = series_list
+        self._time, self._values, self._templates = None, None, None
+
+    @property
+    def time(self):
+        '''The common time axis
+        '''
+        if self._series_list is None:
+            return self._time
+
+        time0 = self._series_list[0].time
+        if not all(np.array_equal(ts.time, time0) for ts in self._series_list):
+            raise ValueError('The Series no longer share a time axis. Apply common_time() first')
+        return time0
+
+    @property
+    def values(self):
+        '''The aligned values, of shape (nt, p)
+        '''
+        if self._series_list is None:
+            return self._values
+
+        self.time # check that the time axes are still shared
+        return np.stack([ts.value for ts in self._series_list], axis=1)
+
+    def __len__(self):
+        if self._series_list is None:
+            return len(self._templates)
+        return len(self._series_list)
+
+    def slice(self, timespan):
+        '''Slicing the aligned series with a timespan (tuple or list)
+
+        Parameters
+        ----------
+
+        timespan : tuple or list
+
+            The list of time points for slicing, whose length must be even.
+            When there are n time points, the output Series includes n/2 segments.
+            For example, if timespan = [a, b], then the sliced output includes one segment [a, b];
+            if timespan = [a, b, c, d], then the sliced output includes segment [a, b] and segment [c, d].
+
+        Returns
+        -------
+
+        new : AlignedMultipleSeries
+
+            The sliced aligned series
+
+        See also
+        --------
+
+        pyleoclim.core.series.Series.slice : Slicing a Series
+
+        '''
+        n_elements = len(timespan)
+        if n_elements % 2 == 1:
+            raise ValueError('The number of elements in timespan must be even!')
+
+        time = self.time
+        mask = np.zeros(np.size(time), dtype=bool)
+        for i in range(n_elements // 2):
+            mask |= (time >= timespan[i*2]) & (time <= timespan[i*2+1])
+
+        templates = self._templates if self._series_list is None else self._series_list
+        return AlignedMultipleSeries(time[mask], self.values[mask], templates,
+                                     time_unit=self.time_unit, label=self.label)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CausalityMatrix objects store the result of a causality calculation between all ordered pairs
+of the series of a MultipleSeries, i.e. a directed network. The class enables a print function
+and an export to a pandas DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+from copy import deepcopy
+
+class CausalityMatrix:
+    ''' CausalityMatrix objects store the result of a causality calculation between all ordered pairs
+    of the series of a MultipleSeries, as a directed adjacency structure.
+
+    In all the matrices, entry [i, j] pertains to the causal influence of series j (the source)
+    on series i (the target); the diagonal is NaN.
+
+    Parameters
+    ----------
+
+    method : str
+
+        the causality method, 'liang' or 'granger'
+
+    labels : list
+
+        the labels of the series
+
+    p : array
+
+        the matrix of p-values
+
+    signif : array
+
+        the matrix of significance
+
+    alpha : float
+
+        The significance level
+
+    T21 : array
+
+        the matrix of information flow (Liang method only)
+
+    tau21 : array
+
+        the matrix of standardized information flow (Liang method only)
+
+    F : array
+
+        the matrix of F statistics (Granger method only)
+
+    See also
+    --------
+
+    pyleoclim.core.multipleseries.MultipleSeries.causality_matrix : causality between all pairs of series
+
+    pyleoclim.utils.causality.liang_causality_matrix : Liang-Kleeman information flow between all ordered pairs
+
+    pyleoclim.utils.causality.granger_causality_matrix : Granger causality tests between all ordered pairs
+    '''
+
+    def __init__(self, method, labels, p, signif, alpha, T21=None, tau21=None, F=None):
+        self.method = method
+        self.labels = labels
+        self.p = p
+        self.signif = signif
+        self.alpha = alpha
+        self.T21 = T21
+        self.tau21 = tau21
+        self.F = F
+
+    def copy(self):
+        '''Copy object
+        '''
+        return deepcopy(self)
+
+    def to_pandas(self, significant_only=False):
+        ''' Export the directed network to a pandas DataFrame, with one row per ordered pair
+
+        Parameters
+        ----------
+
+        significant_only : bool, optional
+
+            If True, only the significant pairs are exported. The default is False.
+
+        Returns
+        -------
+
+        df : pandas.DataFrame
+
+            with columns 'source', 'target', the statistics of the method ('T21' and 'tau21', or 'F'),
+            'p' and 'signif'
+
+        '''
+        ns = len(self.labels)
+        i, j = np.nonzero(~np.eye(ns, dtype=bool))
+
+        data = {
+            'source': [self.labels[k] for k in j],
+            'target': [self.labels[k] for k in i],
+        }
+        for name in ['T21', 'tau21', 'F']:
+            stat = getattr(self, name)
+            if stat is not None:
+                data[name] = np.asarray(stat)[i, j]
+        data['p'] = np.asarray(self.p)[i, j]
+        data['signif'] = np.asarray(self.signif)[i, j]
+
+        df = pd.DataFrame(data)
+        if significant_only:
+            df = df[df['signif']].reset_index(drop=True)
+
+        return df
+
+    def __str__(self):
+        '''
+        Prints out the causality results
+        '''
+        df = self.to_pandas()
+        msg = print(tabulate(df, headers='keys', showindex=False))
+
+        return f'Method: {self.method}; number of series: {len(self.labels)}; significance level: {self.alpha}'
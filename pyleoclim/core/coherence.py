@@ -7,6 +7,7 @@
 from ..utils import plotting
 from ..utils import wavelet as waveutils
 from ..utils import lipdutils
+from ..utils import mcutils
 
 from ..core.scalograms import Scalogram, MultipleScalogram
 
@@ -595,7 +596,7 @@ def dashboard(self, title=None, figsize=[9,12], phase_style = {},
          else:
              return ax
 
-    def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], settings=None, mute_pbar=False):
+    def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], settings=None, mute_pbar=False, mc_kwargs=None):
         '''Significance testing for Coherence objects
 
         The method obtains quantiles `qs` of the distribution of coherence between
@@ -605,19 +606,22 @@ def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], setting
         Parameters
         ----------
         
-        number : int, optional
+        number : int or 'auto', optional
         
             Number of surrogate series to create for significance testing. The default is 200.
+            If 'auto', surrogate pairs are drawn in batches until the quantiles stabilize (see `mc_kwargs`),
+            and the convergence diagnostics are stored in the `signif_diagnostics` attribute of the result.
         
         method : {'ar1sim'}, optional
         
             Method through which to generate the surrogate series. The default is 'ar1sim'.
        
-        seed : int, optional
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
         
             Fixes the seed for NumPy's random number generator.
             Useful for reproducibility. The default is None, so fresh, unpredictable
             entropy will be pulled from the operating system.
+            The surrogates of the two series use independent streams spawned from it.
         
         qs : list, optional
         
@@ -631,6 +635,12 @@ def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], setting
         
             Mute the progress bar. The default is False.
 
+        mc_kwargs : dict, optional
+
+            Settings of the adaptive Monte Carlo procedure used when number is 'auto':
+            'batch_size' (default: 50), 'min_number' (default: 100), 'max_number' (default: 2000)
+            and 'tol', the tolerance on the relative change of the quantiles between batches (default: 0.02).
+
         Returns
         -------
         
@@ -699,6 +709,12 @@ def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], setting
         (pseudo)random number at every execution, which may be important for marginal features
         in small ensembles. In general, however, we recommend increasing the
         number of draws to check that features are robust.
+        Alternatively, the draws may continue until the quantiles stabilize:
+
+        .. jupyter-execute::
+
+            coh_auto = coh.signif_test(number='auto', mc_kwargs={'tol': 0.05, 'max_number': 100})
+            print(coh_auto.signif_diagnostics['number'])
 
         '''
 
@@ -706,21 +722,39 @@ def signif_test(self, number=200, method='ar1sim', seed=None, qs=[0.95], setting
             return self
 
         new = self.copy()
-        surr1 = self.timeseries1.surrogates(
-            number=number, seed=seed, method=method, settings=settings
-        )
-        surr2 = self.timeseries2.surrogates(
-            number=number, seed=seed, method=method, settings=settings
-        )
-
-        wtcs, xwts = [], []
-
-        for i in tqdm(range(number), desc='Performing wavelet coherence on surrogate pairs', total=number, disable=mute_pbar):
-            coh_tmp = surr1.series_list[i].wavelet_coherence(surr2.series_list[i],
-                                                             method  = self.wave_method,
-                                                             settings = self.wave_args)
-            wtcs.append(coh_tmp.wtc)
-            xwts.append(coh_tmp.xwt)
+
+        def draw(n, batch_seed):
+            seed1, seed2 = mcutils.seed_sequence(batch_seed).spawn(2)
+            surr1 = self.timeseries1.surrogates(
+                number=n, seed=seed1, method=method, settings=settings
+            )
+            surr2 = self.timeseries2.surrogates(
+                number=n, seed=seed2, method=method, settings=settings
+            )
+
+            pairs = []
+            for i in tqdm(range(n), desc='Performing wavelet coherence on surrogate pairs', total=n, disable=mute_pbar):
+                coh_tmp = surr1.series_list[i].wavelet_coherence(surr2.series_list[i],
+                                                                 method  = self.wave_method,
+                                                                 settings = self.wave_args)
+                pairs.append((coh_tmp.wtc, coh_tmp.xwt))
+
+            return pairs
+
+        def stat(pairs):
+            wtcs = np.array([pair[0] for pair in pairs])
+            xwts = np.array([pair[1] for pair in pairs])
+            ne = len(pairs)
+            return np.concatenate([mquantiles(np.reshape(wtcs, (ne, -1)), qs, axis=0),
+                                   mquantiles(np.reshape(xwts, (ne, -1)), qs, axis=0)])
+
+        if number == 'auto':
+            pairs, new.signif_diagnostics = mcutils.mc_adaptive_quantiles(draw, stat, seed=seed, mc_kwargs=mc_kwargs)
+        else:
+            pairs = draw(number, seed)
+
+        wtcs = [pair[0] for pair in pairs]
+        xwts = [pair[1] for pair in pairs]
 
         wtcs = np.array(wtcs)
         xwts = np.array(xwts)
@@ -10,6 +10,7 @@
 from ..core.series import Series
 from ..core.correns import CorrEns
 from ..core.multipleseries import MultipleSeries
+from ..core.alignedmultipleseries import AlignedMultipleSeries
 
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -199,6 +200,12 @@ def correlation(self, target=None, timespan=None, alpha=0.05, settings=None, fdr
         If the target is not specified, then the 1st member of the ensemble will be the target
         Note that the FDR approach is applied by default to determine the significance of the p-values (more information in See Also below).
 
+        When the target is a Series, all the members share a time axis and the method is 'isospectral' or 'isopersistent',
+        the members are aligned with the target only once and the surrogates of the target are drawn only once
+        (see pyleoclim.utils.correlation.corr_ens_sig). Otherwise, the members are processed one at a time.
+        Both computations use the same null distributions, in which the member and the target are randomized,
+        and the same random numbers: the p-values agree, up to the tolerance of the AR(1) fits for the 'isopersistent' method.
+
         Parameters
         ----------
 
@@ -256,6 +263,8 @@ def correlation(self, target=None, timespan=None, alpha=0.05, settings=None, fdr
 
         pyleoclim.utils.correlation.corr_sig : Correlation function
 
+        pyleoclim.utils.correlation.corr_ens_sig : Batched correlation function
+
         pyleoclim.utils.correlation.fdr : False Discovery Rate
 
         pyleoclim.core.correns.CorrEns : The correlation ensemble object
@@ -295,28 +304,59 @@ def correlation(self, target=None, timespan=None, alpha=0.05, settings=None, fdr
         if target is None:
             target = self.series_list[0]
 
+        settings = {} if settings is None else settings.copy()
+        corr_args = {'alpha': alpha, 'nsim': 1000, 'method': 'isospectral'}
+        corr_args.update(settings)
+
+        time = self.series_list[0].time
+        batched = (not hasattr(target, 'series_list')
+                   and corr_args['method'] in ['isospectral', 'isopersistent'] and corr_args['nsim'] != 'auto'
+                   and set(corr_args.keys()) <= {'alpha', 'nsim', 'method'}
+                   and all(np.array_equal(ts.time, time) for ts in self.series_list))
+
         r_list = []
         p_list = []
         signif_list = []
-        print("Looping over "+ str(len(self.series_list)) +" Series in the ensemble")
-        for idx, ts1 in tqdm(enumerate(self.series_list), total=len(self.series_list), disable=mute_pbar):
-            if hasattr(target, 'series_list'):
-                nEns = np.size(target.series_list)
-                if idx < nEns:
-                    value2 = target.series_list[idx].value
-                    time2 = target.series_list[idx].time
-                else:
-                    value2 = target.series_list[idx-nEns].value
-                    time2 = target.series_list[idx-nEns].time
+        if batched:
+            # the members share a time axis: align them with the target once, and draw the target surrogates once
+            ms = MultipleSeries(self.series_list + [Series(time=target.time, value=target.value, verbose=False)])
+            if np.array_equal(time, target.time):
+                values = np.stack([ts.value for ts in ms.series_list], axis=1)
+                ms = AlignedMultipleSeries(time, values, ms.series_list)
             else:
-                value2 = target.value
-                time2 = target.time
-
-            ts2 = Series(time=time2, value=value2, verbose=idx==0)
-            corr_res = ts1.correlation(ts2, timespan=timespan, settings=settings, common_time_kwargs=common_time_kwargs, seed=seed)
-            r_list.append(corr_res.r)
-            signif_list.append(corr_res.signif)
-            p_list.append(corr_res.p)
+                common_time_kwargs = {} if common_time_kwargs is None else common_time_kwargs.copy()
+                ct_args = {'method': 'interp'}
+                ct_args.update(common_time_kwargs)
+                ms = ms.common_time(as_matrix=True, **ct_args)
+
+            if timespan is not None:
+                ms = ms.slice(timespan)
+
+            Y = ms.values
+            corr_res = corrutils.corr_ens_sig(Y[:, :-1], Y[:, -1], seed=seed, **corr_args)
+            r_list, p_list = corr_res['r'], corr_res['p']
+            signif_list = [bool(signif) for signif in corr_res['signif']]
+
+        else:
+            print("Looping over "+ str(len(self.series_list)) +" Series in the ensemble")
+            for idx, ts1 in tqdm(enumerate(self.series_list), total=len(self.series_list), disable=mute_pbar):
+                if hasattr(target, 'series_list'):
+                    nEns = np.size(target.series_list)
+                    if idx < nEns:
+                        value2 = target.series_list[idx].value
+                        time2 = target.series_list[idx].time
+                    else:
+                        value2 = target.series_list[idx-nEns].value
+                        time2 = target.series_list[idx-nEns].time
+                else:
+                    value2 = target.value
+                    time2 = target.time
+
+                ts2 = Series(time=time2, value=value2, verbose=idx==0)
+                corr_res = ts1.correlation(ts2, timespan=timespan, settings=settings, common_time_kwargs=common_time_kwargs, seed=seed)
+                r_list.append(corr_res.r)
+                signif_list.append(corr_res.signif)
+                p_list.append(corr_res.p)
 
         r_list = np.array(r_list)
         p_list = np.array(p_list)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LaggedCorr objects store the result of a lagged correlation calculation between two timeseries,
+i.e. the cross-correlation function over a range of leads and lags, with its significance.
+The class enables a print and plot function to easily visualize the result.
+"""
+
+import numpy as np
+import seaborn as sns
+from matplotlib import pyplot as plt
+from tabulate import tabulate
+from copy import deepcopy
+
+from ..utils import plotting
+from .corr import pval_format
+
+class LaggedCorr:
+    ''' LaggedCorr objects store the result of a lagged correlation calculation
+    between two timeseries. The class enables a print and plot function to easily visualize the result.
+
+    Parameters
+    ----------
+
+    lags: array
+
+        the lags, in units of time; at positive lags, the series lags the target
+
+    r: array
+
+        the correlation at each lag
+
+    p: array
+
+        the p-value at each lag
+
+    signif: array
+
+        the significance at each lag, without FDR
+
+    signif_fdr: array
+
+        the significance at each lag, with FDR
+
+    r_null: array
+
+        the alpha/2 and 1-alpha/2 quantiles of the null correlations at each lag, of shape (2, number of lags)
+
+    alpha : float
+
+        The significance level
+
+    time_unit : str
+
+        The unit of the lags
+
+    p_fmt_td: float
+
+        the threshold for p-value formating (0.01 by default, i.e., if p<0.01, will print "< 0.01" instead of "0")
+
+    p_fmt_style: str
+
+        the style for p-value formating (exponential notation by default)
+
+    See also
+    --------
+
+    pyleoclim.core.series.Series.lagged_correlation : lagged correlation with significance
+
+    pyleoclim.utils.correlation.lagged_corr_sig : Lagged correlation function
+
+    pyleoclim.utils.correlation.fdr : FDR (False Discovery Rate) function
+    '''
+
+    def __init__(self, lags, r, p, signif, signif_fdr, r_null, alpha, time_unit=None, p_fmt_td=0.01, p_fmt_style='exp'):
+        self.lags = lags
+        self.r = r
+        self.p = p
+        self.signif = signif
+        self.signif_fdr = signif_fdr
+        self.r_null = r_null
+        self.alpha = alpha
+        self.time_unit = time_unit
+        self.p_fmt_td = p_fmt_td
+        self.p_fmt_style = p_fmt_style
+
+    def copy(self):
+        '''Copy object
+        '''
+        return deepcopy(self)
+
+    def __str__(self):
+        '''
+        Prints out the lagged correlation results
+        '''
+        pi_list = []
+        for pi in self.p:
+            pi_list.append(pval_format(pi, threshold=self.p_fmt_td, style=self.p_fmt_style))
+
+        table = {
+            'lag': self.lags,
+            'correlation': self.r,
+            'p-value': pi_list,
+            f'signif. w/o FDR (α: {self.alpha})': self.signif,
+            f'signif. w/ FDR (α: {self.alpha})': self.signif_fdr,
+        }
+
+        msg = print(tabulate(table, headers='keys'))
+
+        imax = np.argmax(np.abs(self.r))
+        return f'Maximum |r| at lag {self.lags[imax]}'
+
+    def plot(self, figsize=[10, 4], title=None, ax=None, savefig_settings=None, title_kwargs=None,
+             xlim=None, ylim=None, clr_r='k', clr_signif=sns.xkcd_rgb['teal'],
+             clr_signif_fdr='darkorange', clr_null='silver', plot_legend=True, lgd_kwargs=None):
+        ''' Plot the correlation as a function of lag, with the envelope of the null correlations
+
+        Lags where the correlation is significant are marked, with or without applying the
+        False Discovery Rate (FDR) method.
+
+        Parameters
+        ----------
+
+        figsize : list, optional
+
+            The figure size. The default is [10, 4].
+
+        title : str, optional
+
+            Plot title. The default is None.
+
+        ax : matplotlib.axis, optional
+
+            the axis object from matplotlib
+            See [matplotlib.axes](https://matplotlib.org/api/axes_api.html) for details.
+
+        savefig_settings : dict
+
+            the dictionary of arguments for plt.savefig(); some notes below:
+            - "path" must be specified; it can be any existing or new path,
+              with or without a suffix; if the suffix is not given in "path", it will follow "format"
+            - "format" can be one of {"pdf", "eps", "png", "ps"}
+
+        title_kwargs : dict
+
+            the keyword arguments for ax.set_title()
+
+        xlim : list, optional
+
+            x-axis limits. The default is None.
+
+        ylim : list, optional
+
+            y-axis limits. The default is None.
+
+        plot_legend : bool, optional
+
+            Whether to plot the legend. The default is True.
+
+        lgd_kwargs : dict, optional
+
+            Arguments for the legend. The default is None.
+
+        See also
+        --------
+
+        pyleoclim.core.series.Series.lagged_correlation : lagged correlation with significance
+
+        pyleoclim.utils.plotting.savefig : save figures in Pyleoclim
+        '''
+        savefig_settings = {} if savefig_settings is None else savefig_settings.copy()
+        if ax is None:
+            fig, ax = plt.subplots(figsize=figsize)
+
+        signif = np.array(self.signif, dtype=bool)
+        signif_fdr = np.array(self.signif_fdr, dtype=bool)
+
+        ax.fill_between(self.lags, self.r_null[0], self.r_null[1], color=clr_null, alpha=0.5,
+                        label=f'null {(1-self.alpha)*100:g}% envelope')
+        ax.plot(self.lags, self.r, color=clr_r, label=r'$r$')
+        ax.scatter(np.asarray(self.lags)[signif], np.asarray(self.r)[signif], color=clr_signif, zorder=3,
+                   label=f'p < {self.alpha} (w/o FDR)')
+        ax.scatter(np.asarray(self.lags)[signif_fdr], np.asarray(self.r)[signif_fdr], color=clr_signif_fdr, zorder=4,
+                   label=f'p < {self.alpha} (w/ FDR)')
+        ax.axhline(y=0, color='k', linestyle=':', linewidth=0.8)
+        ax.axvline(x=0, color='k', linestyle=':', linewidth=0.8)
+
+        xlabel = 'lag' if self.time_unit is None else f'lag [{self.time_unit}]'
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(r'$r$')
+
+        if xlim is not None:
+            ax.set_xlim(xlim)
+
+        if ylim is not None:
+            ax.set_ylim(ylim)
+
+        if plot_legend:
+            lgd_kwargs = {} if lgd_kwargs is None else lgd_kwargs.copy()
+            lgd_args = {'frameon': False}
+            lgd_args.update(lgd_kwargs)
+            ax.legend(**lgd_args)
+
+        if title is not None:
+            title_kwargs = {} if title_kwargs is None else title_kwargs.copy()
+            t_args = {'weight': 'bold'}
+            t_args.update(title_kwargs)
+            ax.set_title(title, **t_args)
+
+        if 'fig' in locals():
+            if 'path' in savefig_settings:
+                plotting.savefig(fig, settings=savefig_settings)
+            return fig, ax
+        else:
+            return ax
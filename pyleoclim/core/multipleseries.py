@@ -6,8 +6,11 @@
 
 from ..utils import tsutils, plotting, jsonutils
 from ..utils import correlation as corrutils
+from ..utils import tsmodel
+from ..utils import causality as causalutils
 
 from ..core.correns import CorrEns
+from ..core.causalitymatrix import CausalityMatrix
 from ..core.scalograms import MultipleScalogram
 from ..core.psds import MultiplePSD
 from ..core.multivardecomp import MultivariateDecomp
@@ -280,6 +283,9 @@ def convert_time_unit(self, time_unit=None):
     def filter(self, cutoff_freq=None, cutoff_scale=None, method='butterworth', **kwargs):
         ''' Filtering the timeseries in the MultipleSeries object
 
+        When the series share the same time axis, the Butterworth, FIR and Lanczos filters
+        are designed once and applied to all the series in a single pass along that axis.
+
         Parameters
         ----------
 
@@ -342,12 +348,31 @@ def filter(self, cutoff_freq=None, cutoff_scale=None, method='butterworth', **kw
 
         ms = self.copy()
 
-        new_tslist = []
+        time0 = self.series_list[0].time
+        aligned = all(np.array_equal(ts.time, time0) for ts in self.series_list[1:])
+
+        if method in ['butterworth', 'firwin', 'lanczos'] and aligned:
+            # filter all the series at once, along the shared time axis
+            ts0 = self.series_list[0]
+            if not ts0.is_evenly_spaced():
+                raise ValueError('This  method assumes evenly-spaced timeseries, while the input is not. Use the ".interp()", ".bin()" or ".gkernel()" methods prior to ".filter()".')
+            kwargs = kwargs.copy()
+            keep_log = kwargs.pop('keep_log', False)
+            values = np.stack([ts.value for ts in self.series_list], axis=1)
+            values_f, fs, fc = ts0._filter_values(values, cutoff_freq=cutoff_freq, cutoff_scale=cutoff_scale, method=method, **kwargs)
+            for idx, ts in enumerate(ms.series_list):
+                ts.value = values_f[:, idx]
+                if keep_log == True:
+                    if ts.log is None:
+                        ts.log=()
+                    ts.log += ({len(ts.log): 'filter','method': method, 'args': kwargs, 'fs': fs, 'cutoff_freq': fc},)
+        else:
+            new_tslist = []
 
-        for ts in self.series_list:
-            new_tslist.append(ts.filter(cutoff_freq=cutoff_freq, cutoff_scale=cutoff_scale, method=method, **kwargs))
+            for ts in self.series_list:
+                new_tslist.append(ts.filter(cutoff_freq=cutoff_freq, cutoff_scale=cutoff_scale, method=method, **kwargs))
 
-        ms.series_list = new_tslist
+            ms.series_list = new_tslist
 
         return ms
 
@@ -545,7 +570,7 @@ def increments(self, step_style='median', verbose=False):
 
         return gp
     
-    def common_time(self, method='interp', step = None, start = None, stop = None, step_style = None, time_axis = None, **kwargs):
+    def common_time(self, method='interp', step = None, start = None, stop = None, step_style = None, time_axis = None, as_matrix = False, **kwargs):
         ''' Aligns the time axes of a MultipleSeries object
         
         The alignment is achieved via binning, interpolation, or Gaussian kernel. Alignment is critical for workflows
@@ -590,6 +615,13 @@ def common_time(self, method='interp', step = None, start = None, stop = None, s
         time_axis : array
             Time axis onto which all the series will be aligned. Will override step,start,stop, and step_style if they are passed.
 
+        as_matrix : bool
+        
+            If True, return an AlignedMultipleSeries, which stores the common time axis and an (nt, p) matrix of values,
+            and only creates the member Series (as views into that matrix) when they are accessed.
+            NaNs left by binning or by the Gaussian kernel are kept, so that all members have the same length.
+            Default is False.
+
         kwargs: dict
         
             keyword arguments (dictionary) of the bin, gkernel or interp methods
@@ -597,7 +629,7 @@ def common_time(self, method='interp', step = None, start = None, stop = None, s
         Returns
         -------
 
-        ms : MultipleSeries
+        ms : MultipleSeries or AlignedMultipleSeries
         
             The MultipleSeries objects with all series aligned to the same time axis.
 
@@ -706,39 +738,67 @@ def common_time(self, method='interp', step = None, start = None, stop = None, s
             
             even_axis = tsutils.make_even_axis(start=start,stop=stop,step=common_step)
         
-        ms = self.copy()
+        # apply each method; all of them return values on the same time axis
+        time0 = self.series_list[0].time
+        shared_time = all(np.array_equal(ts.time, time0) for ts in self.series_list)
 
-        # apply each method
         if method == 'bin':
-            for idx,item in enumerate(self.series_list):
-                ts = item.copy()
-                d = tsutils.bin(ts.time, ts.value, bin_edges=even_axis, time_axis=time_axis, no_nans=False, **kwargs)
-                ts.time  = d['bins']
-                ts.value = d['binned_values']
-                ms.series_list[idx] = ts
+            if shared_time:
+                # shared time axis: bin all the series in one call
+                values = np.stack([ts.value for ts in self.series_list], axis=1)
+                d = tsutils.bin(time0, values, bin_edges=even_axis, time_axis=time_axis, no_nans=False, **kwargs)
+                ti, vi = d['bins'], d['binned_values']
+            else:
+                vi = []
+                for ts in self.series_list:
+                    d = tsutils.bin(ts.time, ts.value, bin_edges=even_axis, time_axis=time_axis, no_nans=False, **kwargs)
+                    vi.append(d['binned_values'])
+                ti, vi = d['bins'], np.stack(vi, axis=1)
 
         elif method == 'interp':
 
             if time_axis is None:
                 time_axis = even_axis
-            for idx,item in enumerate(self.series_list):
-                ts = item.copy()
-                ti, vi = tsutils.interp(ts.time, ts.value, time_axis=time_axis, **kwargs)
-                ts.time  = ti
-                ts.value = vi
-                ms.series_list[idx] = ts
+            batched = (kwargs.get('interp_type', 'linear') in ['linear', 'nearest', 'cubic']
+                       and set(kwargs.keys()) <= {'interp_type', 'bounds_error', 'fill_value'}
+                       and np.ndim(kwargs.get('fill_value', np.nan)) == 0)
+            if batched:
+                # interpolate all the series in one call
+                ti, vi = tsutils.interp_batch([ts.time for ts in self.series_list], [ts.value for ts in self.series_list],
+                                              time_axis=time_axis, **kwargs)
+            else:
+                vi = []
+                for ts in self.series_list:
+                    ti, v = tsutils.interp(ts.time, ts.value, time_axis=time_axis, **kwargs)
+                    vi.append(v)
+                vi = np.stack(vi, axis=1)
 
         elif method == 'gkernel':
-            for idx,item in enumerate(self.series_list):
-                ts = item.copy()
-                ti, vi = tsutils.gkernel(ts.time,ts.value,bin_edges=even_axis, time_axis=time_axis, no_nans=False,**kwargs)
-                ts.time  = ti
-                ts.value = vi
-                ms.series_list[idx] = ts.clean() # remove NaNs
+            if shared_time:
+                # shared time axis: coarsen all the series in one call
+                values = np.stack([ts.value for ts in self.series_list], axis=1)
+                ti, vi = tsutils.gkernel(time0,values,bin_edges=even_axis, time_axis=time_axis, no_nans=False,**kwargs)
+            else:
+                vi = []
+                for ts in self.series_list:
+                    ti, v = tsutils.gkernel(ts.time,ts.value,bin_edges=even_axis, time_axis=time_axis, no_nans=False,**kwargs)
+                    vi.append(v)
+                vi = np.stack(vi, axis=1)
 
         else:
             raise NameError('Unknown methods; no action taken')
 
+        if as_matrix:
+            from ..core.alignedmultipleseries import AlignedMultipleSeries
+            return AlignedMultipleSeries(ti, vi, self.series_list, time_unit=self.time_unit, label=self.label)
+
+        ms = self.copy()
+        for idx,item in enumerate(self.series_list):
+            ts = item.copy()
+            ts.time  = ti
+            ts.value = vi[:,idx]
+            ms.series_list[idx] = ts.clean() if method == 'gkernel' else ts # remove NaNs
+
         return ms
 
     def correlation(self, target=None, timespan=None, alpha=0.05, settings=None, 
@@ -870,6 +930,224 @@ def correlation(self, target=None, timespan=None, alpha=0.05, settings=None,
         corr_ens = CorrEns(r_list, p_list, signif_list, signif_fdr_list, alpha)
         return corr_ens
 
+    def correlation_matrix(self, timespan=None, alpha=0.05, settings=None,
+                           fdr_kwargs=None, common_time_kwargs=None, seed=None):
+        ''' Calculate the correlation between all pairs of Series in a MultipleSeries
+
+        The series are placed on a common time axis once, and the surrogates of each series are generated once
+        and shared by all the pairs it belongs to, so the cost of the simulations scales with the number of series
+        rather than with the number of pairs.
+
+        Parameters
+        ----------
+
+        timespan : tuple, optional
+        
+            The time interval over which to perform the calculation
+
+        alpha : float
+        
+            The significance level (0.05 by default)
+
+        settings : dict
+        
+            Parameters for the correlation function, including:
+
+            nsim : int
+                the number of simulations (default: 1000)
+            method : str, {'isopersistent','isospectral' (default)}
+                method for significance testing
+            chunk : int
+                the number of surrogates of each series processed at once, to bound memory usage (default: 100)
+
+        fdr_kwargs : dict
+        
+            Parameters for the FDR function, applied to the p-values of the distinct pairs
+
+        common_time_kwargs : dict
+        
+            Parameters for the method MultipleSeries.common_time(). Will use interpolation by default.
+        
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        
+            random seed for isopersistent and isospectral methods
+
+        Returns
+        -------
+
+        res : dict
+        
+            the result dictionary, containing the symmetric matrices
+
+            - r : correlation coefficients
+            - p : p-values
+            - signif : significance at level alpha
+            - signif_fdr : significance after controlling the false discovery rate
+
+        See also
+        --------
+
+        pyleoclim.utils.correlation.corr_matrix_sig : Correlation matrix function
+
+        pyleoclim.utils.correlation.fdr : FDR function
+
+        pyleoclim.core.multipleseries.MultipleSeries.correlation : Correlation between a MultipleSeries and a target Series
+
+        Examples
+        --------
+
+        .. jupyter-execute::
+
+            import pyleoclim as pyleo
+            from pyleoclim.utils.tsmodel import colored_noise
+            import numpy as np
+
+            nt = 100
+            t0 = np.arange(nt)
+            v0 = colored_noise(alpha=1, t=t0)
+            noise = np.random.normal(loc=0, scale=1, size=nt)
+
+            ts1 = pyleo.Series(time=t0, value=v0+noise, verbose=False)
+            ts2 = pyleo.Series(time=t0, value=v0+2*noise, verbose=False)
+            ts3 = pyleo.Series(time=t0, value=colored_noise(alpha=1, t=t0), verbose=False)
+
+            ms = pyleo.MultipleSeries([ts1, ts2, ts3])
+            res = ms.correlation_matrix(settings={'nsim': 200}, seed=2333)
+            print(res['r'])
+            print(res['signif_fdr'])
+
+        '''
+        settings = {} if settings is None else settings.copy()
+        corr_args = {'alpha': alpha}
+        corr_args.update(settings)
+
+        common_time_kwargs = {} if common_time_kwargs is None else common_time_kwargs.copy()
+        ct_args = {'method': 'interp'}
+        ct_args.update(common_time_kwargs)
+        ms = self.common_time(as_matrix=True, **ct_args)
+
+        if timespan is not None:
+            ms = ms.slice(timespan)
+
+        Y = ms.values
+        res = corrutils.corr_matrix_sig(Y, seed=seed, **corr_args)
+
+        # FDR over the distinct pairs
+        fdr_kwargs = {} if fdr_kwargs is None else fdr_kwargs.copy()
+        iu = np.triu_indices(np.shape(Y)[1], k=1)
+        signif_fdr = np.zeros(np.size(iu[0]), dtype=bool)
+        fdr_res = corrutils.fdr(res['p'][iu], **fdr_kwargs)
+        if fdr_res is not None:
+            signif_fdr[fdr_res] = True
+
+        res['signif_fdr'] = np.eye(np.shape(Y)[1], dtype=bool)
+        res['signif_fdr'][iu] = signif_fdr
+        res['signif_fdr'] = res['signif_fdr'] | res['signif_fdr'].T
+
+        return res
+
+
+    def causality_matrix(self, method='liang', timespan=None, alpha=0.05, settings=None,
+                         common_time_kwargs=None, seed=None, nproc=1):
+        ''' Calculate the causality between all ordered pairs of Series in a MultipleSeries
+
+        The series are placed on a common time axis once. For the Liang method, the information flow of all
+        the ordered pairs is obtained from matrix products of the series and their tendencies, and the
+        significance is assessed with surrogates of each series generated once and shared by all the pairs.
+        For the Granger method, the F tests of all the ordered pairs are carried out at once with batched regressions.
+
+        Parameters
+        ----------
+
+        method : str, {'liang' (default), 'granger'}
+
+            The causality method
+
+        timespan : tuple, optional
+
+            The time interval over which to perform the calculation
+
+        alpha : float
+
+            The significance level (0.05 by default)
+
+        settings : dict
+
+            Parameters for the causality function, see pyleoclim.utils.causality.liang_causality_matrix
+            (e.g. 'npt', 'signif_test', 'nsim') and pyleoclim.utils.causality.granger_causality_matrix
+            (e.g. 'maxlag', 'addconst')
+
+        common_time_kwargs : dict
+
+            Parameters for the method MultipleSeries.common_time(). Will use interpolation by default.
+
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
+
+            random seed for the surrogates of the Liang method
+
+        nproc : int
+
+            the number of processes for the significance test of the Liang method; if 1 (default), the computation is serial
+
+        Returns
+        -------
+
+        cmat : CausalityMatrix
+
+            the result object, where entry [i, j] of each matrix pertains to the influence of series j on series i
+
+        See also
+        --------
+
+        pyleoclim.utils.causality.liang_causality_matrix : Liang-Kleeman information flow between all ordered pairs
+
+        pyleoclim.utils.causality.granger_causality_matrix : Granger causality tests between all ordered pairs
+
+        pyleoclim.core.causalitymatrix.CausalityMatrix : the causality matrix object
+
+        pyleoclim.core.series.Series.causality : causality between two series
+
+        Examples
+        --------
+
+        .. jupyter-execute::
+
+            import pyleoclim as pyleo
+
+            soi = pyleo.utils.load_dataset('SOI')
+            nino = pyleo.utils.load_dataset('NINO3')
+            ms = soi & nino
+            cmat = ms.causality_matrix(settings={'nsim': 200}, seed=2333)
+            cmat.to_pandas()
+
+        '''
+        settings = {} if settings is None else settings.copy()
+        args = {'alpha': alpha}
+        if method == 'liang':
+            args.update({'seed': seed, 'nproc': nproc})
+        args.update(settings)
+
+        common_time_kwargs = {} if common_time_kwargs is None else common_time_kwargs.copy()
+        ct_args = {'method': 'interp'}
+        ct_args.update(common_time_kwargs)
+        ms = MultipleSeries([ts.sort() for ts in self.series_list]).common_time(as_matrix=True, **ct_args)
+
+        if timespan is not None:
+            ms = ms.slice(timespan)
+
+        Y = ms.values
+        labels = [ts.label if ts.label is not None else f'series {idx}' for idx, ts in enumerate(self.series_list)]
+
+        if method == 'liang':
+            res = causalutils.liang_causality_matrix(Y, **args)
+            cmat = CausalityMatrix(method, labels, res['p'], res['signif'], args['alpha'], T21=res['T21'], tau21=res['tau21'])
+        elif method == 'granger':
+            res = causalutils.granger_causality_matrix(Y, **args)
+            cmat = CausalityMatrix(method, labels, res['p'], res['signif'], args['alpha'], F=res['F'])
+        else:
+            raise ValueError(f'Unknown method: {method}. Available methods are "liang" and "granger"')
+
+        return cmat
 
     def equal_lengths(self):
         ''' Test whether all series in object have equal length
@@ -920,7 +1198,8 @@ def pca(self,weights=None, name=None, missing='fill-em',tol_em=5e-03, max_em_ite
         Decomposition of MultipleSeries in terms of orthogonal basis functions.
         Tolerant to missing values, infilled by an EM algorithm.
 
-        Do make sure the time axes are aligned, however! (e.g. use `common_time()`)
+        Do make sure the time axes are aligned, however! (e.g. use `common_time()`; with `as_matrix=True`,
+        the aligned data matrix is used as is, without restacking the Series)
 
         Algorithm from statsmodels: https://www.statsmodels.org/stable/generated/statsmodels.multivariate.pca.PCA.html
 
@@ -985,16 +1264,25 @@ def pca(self,weights=None, name=None, missing='fill-em',tol_em=5e-03, max_em_ite
             fig2, ax2 = res.modeplot() # plot the first mode
 
         '''
-        flag, lengths = self.equal_lengths()
+        from ..core.alignedmultipleseries import AlignedMultipleSeries
+
+        aligned = isinstance(self, AlignedMultipleSeries)
+        if aligned:
+            flag = True
+        else:
+            flag, lengths = self.equal_lengths()
 
         if flag==False:
             print('All Time Series should be of same length. Apply common_time() first')
         else: # if all series have equal length
-            p = len(lengths)
-            n = lengths[0]
-            ys = np.empty((n,p))
-            for j in range(p):
-                ys[:,j] = self.series_list[j].value  # fill in data matrix
+            if aligned:
+                ys = self.values # the data matrix is already there
+            else:
+                p = len(lengths)
+                n = lengths[0]
+                ys = np.empty((n,p))
+                for j in range(p):
+                    ys[:,j] = self.series_list[j].value  # fill in data matrix
 
             #nc = min(ys.shape) # number of components to return
 
@@ -1294,11 +1582,19 @@ def detrend(self,method='emd',**kwargs):
         pyleoclim.utils.tsutils.detrend : Detrending function
         '''
         ms=self.copy()
-        for idx,item in enumerate(ms.series_list):
-            s=item.copy()
-            v_mod, _=tsutils.detrend(item.value,x=item.time,method=method,**kwargs)
-            s.value=v_mod
-            ms.series_list[idx]=s
+        if method == 'emd' and set(kwargs.keys()) <= {'n', 'preserve_mean'}:
+            # decompose all the series at once
+            v_mods, _ = tsutils.detrend_emd_batch([item.value for item in ms.series_list], **kwargs)
+            for idx,item in enumerate(ms.series_list):
+                s=item.copy()
+                s.value=v_mods[idx]
+                ms.series_list[idx]=s
+        else:
+            for idx,item in enumerate(ms.series_list):
+                s=item.copy()
+                v_mod, _=tsutils.detrend(item.value,x=item.time,method=method,**kwargs)
+                s.value=v_mod
+                ms.series_list[idx]=s
         return ms
 
     def spectral(self, method='lomb_scargle', settings=None, mute_pbar=False, freq_method='log', 
@@ -2335,6 +2631,43 @@ def resolution(self, statistic='median'):
             raise ValueError('Unknown statistic',stacklevel=2)
             
         return np.array(res)
+
+    def ar1_fit(self):
+        '''
+        Estimates the persistence of each series in the object, all at once.
+
+        For evenly-spaced series, returns the lag-1 autocorrelation of the maximum-likelihood fit of
+        a linear trend with AR(1) errors, the model of pyleoclim.utils.tsmodel.ar1_fit_evenly;
+        for unevenly-spaced series, returns the persistence time scale tau estimated by the method
+        of Mudelsee (2002). The estimation is vectorized across series, which is much faster than
+        looping over them for large collections. The results agree with those of
+        pyleoclim.utils.tsmodel.ar1_fit applied to each series up to the tolerance of the optimizers.
+
+        Returns
+        -------
+        g: NumPy array
+            array containing the lag-1 autocorrelation (evenly-spaced series)
+            or the persistence (unevenly-spaced series) of all series.
+
+        See also
+        --------
+
+        pyleoclim.utils.tsmodel.ar1_fit_batch : Return the lag-1 autocorrelation or persistence of many series at once
+
+        Examples
+        --------
+        .. jupyter-execute::
+
+            co2ts = pyleo.utils.load_dataset('AACO2')
+            edc = pyleo.utils.load_dataset('EDC-dD')
+            ms = edc & co2ts # create MS object
+            ms.ar1_fit()
+
+        '''
+        ys = [ts.value for ts in self.series_list]
+        ts = [ts.time for ts in self.series_list]
+
+        return tsmodel.ar1_fit_batch(ys, ts)
     
     def to_json(self, path=None):
         '''
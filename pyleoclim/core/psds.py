@@ -1,6 +1,8 @@
 from ..utils import plotting
 from ..utils import wavelet as waveutils
 from ..utils import spectral as specutils
+from ..utils import cache as cacheutils
+from ..utils import mcutils
 #from ..utils import tsbase
 
 #from ..core.multiplepsd import *
@@ -168,20 +170,26 @@ def __str__(self):
         return f'Length: {np.size(self.frequency)}'
 
     def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
-                    settings=None, scalogram = None):
+                    settings=None, scalogram = None, cache_dir=None, cache_maxsize=None, mc_kwargs=None):
         '''
 
 
         Parameters
         ----------
 
-        number : int, optional
+        number : int or 'auto', optional
 
             Number of surrogate series to generate for significance testing. The default is None.
+            If 'auto', surrogates are drawn in batches until the quantiles stabilize (see `mc_kwargs`),
+            and the convergence diagnostics are stored in the `signif_diagnostics` attribute of the result.
+            Saved scalograms are not reused in that case.
 
         method : str; {'ar1asym','ar1sim'}
 
-            Method to generate surrogates. AR1sim uses simulated timeseries with similar persistence. AR1asymp represents the closed form solution. The default is AR1sim
+            Method to generate surrogates. AR1sim uses simulated timeseries with similar persistence. AR1asymp represents the closed form solution. The default is AR1sim.
+            For the Lomb-Scargle and WWZ methods, the closed form solution scales the theoretical spectrum of an AR(1) process with the same persistence
+            to the area under the PSD (as in REDFIT), with chi-square levels whose effective degrees of freedom derive from the WOSA segments (Lomb-Scargle)
+            or the width of the WWZ window (WWZ).
 
         seed : int, optional
 
@@ -193,13 +201,33 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
 
         settings : dict, optional
 
-            Parameters for the specific significance test. The default is None. Note that the default value for the asymptotic solution is `time-average`
+            Parameters for the specific significance test. The default is None. Note that the default value for the asymptotic solution is `time-average`.
+            For the Lomb-Scargle and WWZ methods, the asymptotic solution accepts a 'dof' key to override the effective degrees of freedom.
 
         scalogram : pyleoclim.Scalogram object, optional
 
             Scalogram containing signif_scals exported during significance testing of scalogram.
             If number is None and signif_scals are present, will use length of scalogram list as number of significance tests
 
+        cache_dir : str, optional
+
+            Path to a directory where the significance quantiles obtained with 'ar1sim' are cached.
+            Entries are keyed on the time axis, the fitted persistence, the spectral method and its settings, `number`, `seed` and `qs`,
+            so that a subsequent call on an equivalent record skips the Monte Carlo simulations altogether.
+            The cache is bypassed when the realizations of a scalogram (signif_scals) are used.
+            The default is None (no caching).
+
+        cache_maxsize : int, optional
+
+            Maximum size of the cache directory in bytes. The least recently used entries are evicted beyond that size.
+            The default is None, which uses 500 MB.
+
+        mc_kwargs : dict, optional
+
+            Settings of the adaptive Monte Carlo procedure used when number is 'auto':
+            'batch_size' (default: 50), 'min_number' (default: 100), 'max_number' (default: 2000)
+            and 'tol', the tolerance on the relative change of the quantiles between batches (default: 0.02).
+
         Returns
         -------
 
@@ -236,6 +264,13 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
             psd_asym = psd.signif_test(method='ar1asym',qs=[0.90, 0.95])
             fig, ax = psd_asym.plot()
 
+        The closed-form solution is also available for the Lomb-Scargle and WWZ methods, which is much faster than simulations on unevenly-spaced records:
+
+        .. jupyter-execute::
+
+            psd_ls = soi.standardize().spectral('lomb_scargle')
+            fig, ax = psd_ls.signif_test(method='ar1asym').plot()
+
         If significance tests from a comparable scalogram have been saved, they can be passed here to speed up the generation of noise realizations for significance testing.
         Setting export_scal to True saves the noise realizations generated during significance testing for future use:
             
@@ -257,6 +292,22 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
                 
             fig, ax = psd.signif_test(scalogram=scalogram).plot()
 
+        When the same test is run repeatedly (e.g. in a notebook or dashboard), the quantiles may be cached on disk:
+
+        .. jupyter-execute::
+
+            import tempfile
+            cache_dir = tempfile.mkdtemp()
+            psd_c1 = psd.signif_test(number=20, seed=42, cache_dir=cache_dir) # runs the simulations
+            psd_c2 = psd.signif_test(number=20, seed=42, cache_dir=cache_dir) # reads them from disk
+
+        Rather than fixing the number of simulations, one may let them run until the quantiles stabilize:
+
+        .. jupyter-execute::
+
+            psd_auto = psd.signif_test(number='auto', mc_kwargs={'tol': 0.05, 'max_number': 200})
+            print(psd_auto.signif_diagnostics['number'], psd_auto.signif_diagnostics['converged'])
+
         See also
         --------
 
@@ -274,12 +325,6 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
 
         '''
 
-        if self.spec_method == 'wwz' and method == 'ar1asym':
-            raise ValueError('Asymptotic solution is not supported for the wwz method')
-
-        if self.spec_method == 'lomb_scargle' and method == 'ar1asym':
-            raise ValueError('Asymptotic solution is not supported for the Lomb-Scargle method')
-
         if method not in ['ar1sim', 'ar1asym']:
                 raise ValueError("The available methods are 'ar1sim' and 'ar1asym'")
 
@@ -292,7 +337,9 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
                     return ValueError('Could not find signif_scals in passed object, make sure this is a scalogram with signif_scals that were saved during significance testing')
 
 
-            if number is None and signif_scals:
+            if number == 'auto':
+                signif_scals = None
+            elif number is None and signif_scals:
                 number = len(signif_scals.scalogram_list)
             elif number is None and signif_scals is None:
                 number = 200
@@ -300,55 +347,104 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
                 return self
 
             new = self.copy()
-            surr = self.timeseries.surrogates(
-                number=number, seed=seed, method=method, settings=settings
-            )
 
-            if signif_scals:
-                surr_psd = surr.spectral(
-                    method=self.spec_method, settings=self.spec_args, scalogram_list=signif_scals
-                )
+            # realizations passed via the scalogram are not part of the key
+            use_cache = cache_dir is not None and not signif_scals
+            if use_cache:
+                cache_key = cacheutils.signif_cache_key(self.timeseries.value, self.timeseries.time,
+                                                        obj='PSD', method=method, number=number, seed=seed, qs=qs,
+                                                        settings=settings, spec_method=self.spec_method,
+                                                        spec_args=self.spec_args, mc_kwargs=mc_kwargs)
+                signif_qs = cacheutils.signif_cache_load(cache_dir, cache_key)
+                if signif_qs is not None:
+                    if number == 'auto':
+                        signif_qs, new.signif_diagnostics = signif_qs
+                    new.signif_qs = signif_qs
+                    new.signif_method = method
+                    return new
+
+            if number == 'auto':
+                def draw(n, batch_seed):
+                    surr = self.timeseries.surrogates(number=n, seed=batch_seed, method=method, settings=settings)
+                    return surr.spectral(method=self.spec_method, settings=self.spec_args).psd_list
+
+                def stat(psd_list):
+                    return np.array([psd.amplitude for psd in MultiplePSD(psd_list).quantiles(qs=qs).psd_list])
+
+                psd_list, new.signif_diagnostics = mcutils.mc_adaptive_quantiles(draw, stat, seed=seed, mc_kwargs=mc_kwargs)
+                surr_psd = MultiplePSD(psd_list)
             else:
-                surr_psd = surr.spectral(method=self.spec_method, settings=self.spec_args)
+                surr = self.timeseries.surrogates(
+                    number=number, seed=seed, method=method, settings=settings
+                )
+
+                if signif_scals:
+                    surr_psd = surr.spectral(
+                        method=self.spec_method, settings=self.spec_args, scalogram_list=signif_scals
+                    )
+                else:
+                    surr_psd = surr.spectral(method=self.spec_method, settings=self.spec_args)
             new.signif_qs = surr_psd.quantiles(qs=qs)
             new.signif_method = method
 
+            if use_cache:
+                cache_obj = (new.signif_qs, new.signif_diagnostics) if number == 'auto' else new.signif_qs
+                cacheutils.signif_cache_save(cache_dir, cache_key, cache_obj, maxsize=cache_maxsize)
+
         elif method == 'ar1asym':
-            std = self.timeseries.stats()['std'] # assess standard deviation 
-            if np.abs(std-1) > 0.1: 
-                warnings.warn("Asymptotics are only defined for a standard deviation of unity. Please apply to a standardized series only")
-            
             new=self.copy()
 
             if type(qs) is not list:
                 raise TypeError('qs should be a list')
 
-            settings = {'sigtest':'time-average'} if settings is None else settings.copy()
-
-            if self.spec_method=='cwt':
-                if 'dof' not in settings.keys():
-                    dof = len(self.timeseries.value) - self.spec_args['scale']
-                    settings.update({'dof':dof})
-                signif_levels=waveutils.tc_wave_signif(self.timeseries.value,
-                                                       self.timeseries.time,
-                                                       self.spec_args['scale'],
-                                                       self.spec_args['mother'],
-                                                       self.spec_args['param'],
-                                                       qs=qs, **settings)
+            if self.spec_method in ['lomb_scargle', 'wwz']:
+                # theoretical AR(1) spectrum scaled to the PSD, with chi-square levels (REDFIT)
+                settings = {} if settings is None else settings.copy()
+                spec_args = {} if self.spec_args is None else self.spec_args
+                if 'dof' in settings.keys():
+                    dof = settings['dof']
+                elif self.spec_method == 'lomb_scargle':
+                    dof = specutils.lomb_scargle_dof(len(self.timeseries.time),
+                                                     n50=spec_args.get('n50', 3),
+                                                     window=spec_args.get('window', 'hann'))
+                else:
+                    dof = specutils.wwz_dof(self.frequency, self.timeseries.time,
+                                            c=spec_args.get('c', 1e-3))
+
+                signif_levels = specutils.ar1_psd_signif(self.amplitude, self.frequency,
+                                                         self.timeseries.value, self.timeseries.time,
+                                                         dof, qs=qs)
             else:
-                # hard code Mortlet values to obtain the spectrum
-                param = 6
-                fourier_factor = 4 * np.pi / (param + np.sqrt(2 + param**2))
-                scale = 1/(fourier_factor*self.frequency)
-                if 'dof' not in settings.keys():
-                    dof = len(self.timeseries.value) - scale
-                    settings.update({'dof':dof})
-                signif_levels=waveutils.tc_wave_signif(self.timeseries.value,
-                                                       self.timeseries.time,
-                                                       scale,
-                                                       'MORLET',
-                                                       param,
-                                                       qs=qs, **settings)
+                std = self.timeseries.stats()['std'] # assess standard deviation 
+                if np.abs(std-1) > 0.1: 
+                    warnings.warn("Asymptotics are only defined for a standard deviation of unity. Please apply to a standardized series only")
+
+                settings = {'sigtest':'time-average'} if settings is None else settings.copy()
+
+                if self.spec_method=='cwt':
+                    if 'dof' not in settings.keys():
+                        dof = len(self.timeseries.value) - self.spec_args['scale']
+                        settings.update({'dof':dof})
+                    signif_levels=waveutils.tc_wave_signif(self.timeseries.value,
+                                                           self.timeseries.time,
+                                                           self.spec_args['scale'],
+                                                           self.spec_args['mother'],
+                                                           self.spec_args['param'],
+                                                           qs=qs, **settings)
+                else:
+                    # hard code Mortlet values to obtain the spectrum
+                    param = 6
+                    fourier_factor = 4 * np.pi / (param + np.sqrt(2 + param**2))
+                    scale = 1/(fourier_factor*self.frequency)
+                    if 'dof' not in settings.keys():
+                        dof = len(self.timeseries.value) - scale
+                        settings.update({'dof':dof})
+                    signif_levels=waveutils.tc_wave_signif(self.timeseries.value,
+                                                           self.timeseries.time,
+                                                           scale,
+                                                           'MORLET',
+                                                           param,
+                                                           qs=qs, **settings)
 
             # get it back into the object
             new.signif_method = method
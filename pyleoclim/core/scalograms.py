@@ -3,6 +3,8 @@
 
 from ..utils import plotting, lipdutils, tsutils
 from ..utils import wavelet as waveutils
+from ..utils import cache as cacheutils
+from ..utils import mcutils
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -428,7 +430,7 @@ def plot(self, variable = 'amplitude', in_scale=True, xlabel=None, ylabel=None,
             return ax
 
     def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
-                    settings=None, export_scal = False):
+                    settings=None, export_scal = False, cache_dir=None, cache_maxsize=None, mc_kwargs=None):
         ''' Significance test for scalograms
 
         Parameters
@@ -439,10 +441,13 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
             Method to use to generate the surrogates.  ar1sim uses simulated timeseries with similar persistence. 
             ar1asym represents the theoretical, closed-form solution. The default is ar1sim
             
-        number : int 
+        number : int or 'auto'
        
             Number of surrogates to generate for significance analysis based on simulations. 
             The default is 200.
+            If 'auto', surrogates are drawn in batches until the quantiles stabilize (see `mc_kwargs`),
+            starting from the saved noise realizations if any, and the convergence diagnostics
+            are stored in the `signif_diagnostics` attribute of the result.
 
         seed : int, optional
 
@@ -461,6 +466,25 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
             Whether or not to export the scalograms used in the noise realizations. Note: For the wwz method, the scalograms used for wavelet analysis are slightly different
             than those used for spectral analysis (different decay constant). As such, this functionality should be used only to expedite exploratory analysis.
 
+        cache_dir : str, optional
+
+            Path to a directory where the significance quantiles obtained with 'ar1sim' are cached.
+            Entries are keyed on the time axis, the fitted persistence, the wavelet method and its settings, `number`, `seed` and `qs`.
+            The cache is bypassed when export_scal is True, since the noise realizations themselves are then required,
+            and when precomputed realizations (signif_scals) are used, since they are not part of the key.
+            The default is None (no caching).
+
+        cache_maxsize : int, optional
+
+            Maximum size of the cache directory in bytes. The least recently used entries are evicted beyond that size.
+            The default is None, which uses 500 MB.
+
+        mc_kwargs : dict, optional
+
+            Settings of the adaptive Monte Carlo procedure used when number is 'auto':
+            'batch_size' (default: 50), 'min_number' (default: 100), 'max_number' (default: 2000)
+            and 'tol', the tolerance on the relative change of the quantiles between batches (default: 0.02).
+
         Raises
         ------
 
@@ -524,7 +548,36 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
 
             new = self.copy()
 
-            if signif_scals:
+            use_cache = cache_dir is not None and not export_scal and not signif_scals
+            if use_cache:
+                cache_key = cacheutils.signif_cache_key(self.timeseries.value, self.timeseries.time,
+                                                        obj='Scalogram', method=method, number=number, seed=seed, qs=qs,
+                                                        settings=settings, wave_method=self.wave_method,
+                                                        wave_args=self.wave_args, mc_kwargs=mc_kwargs)
+                signif_qs = cacheutils.signif_cache_load(cache_dir, cache_key)
+                if signif_qs is not None:
+                    if number == 'auto':
+                        signif_qs, new.signif_diagnostics = signif_qs
+                    new.signif_qs = signif_qs
+                    new.signif_method = method
+                    new.qs = qs
+                    return new
+
+            if number == 'auto':
+                def draw(n, batch_seed):
+                    surr = self.timeseries.surrogates(number=n, seed=batch_seed,
+                                                      method=method, settings=settings)
+                    return surr.wavelet(method=self.wave_method, settings=self.wave_args).scalogram_list
+
+                def stat(scalogram_list):
+                    return np.array([scal.amplitude for scal in MultipleScalogram(scalogram_list=scalogram_list).quantiles(qs=qs).scalogram_list])
+
+                realizations = signif_scals.scalogram_list if signif_scals else None
+                scalogram_list, new.signif_diagnostics = mcutils.mc_adaptive_quantiles(draw, stat, seed=seed,
+                                                                                      realizations=realizations,
+                                                                                      mc_kwargs=mc_kwargs)
+                surr_scal = MultipleScalogram(scalogram_list=scalogram_list)
+            elif signif_scals:
                 scalogram_list = signif_scals.scalogram_list
                 #If signif_scals already in scalogram object are more than those requested for significance testing, use as many of them as required
                 if len(scalogram_list) > number:
@@ -552,6 +605,10 @@ def signif_test(self, method='ar1sim', number=None, seed=None, qs=[0.95],
 
             new.signif_qs = surr_scal.quantiles(qs=qs)
 
+            if use_cache:
+                cache_obj = (new.signif_qs, new.signif_diagnostics) if number == 'auto' else new.signif_qs
+                cacheutils.signif_cache_save(cache_dir, cache_key, cache_obj, maxsize=cache_maxsize)
+
             if export_scal == True:
                 new.signif_scals = surr_scal
 
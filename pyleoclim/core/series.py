@@ -25,6 +25,7 @@
 from ..core.scalograms import Scalogram
 from ..core.coherence import Coherence
 from ..core.corr import Corr
+from ..core.laggedcorr import LaggedCorr
 from ..core.surrogateseries import SurrogateSeries
 from ..core.resolution import Resolution
 
@@ -1430,9 +1431,34 @@ def filter(self, cutoff_freq=None, cutoff_scale=None, method='butterworth', keep
             raise ValueError('This  method assumes evenly-spaced timeseries, while the input is not. Use the ".interp()", ".bin()" or ".gkernel()" methods prior to ".filter()".')
 
         new = self.copy()
+        new.value, fs, cutoff_freq = self._filter_values(self.value, cutoff_freq=cutoff_freq, cutoff_scale=cutoff_scale,
+                                                         method=method, **kwargs)
 
-        mu = np.mean(self.value) # extract the mean
-        y = self.value - mu
+        if keep_log == True:
+            if new.log is None:
+                new.log=()
+            new.log += ({len(new.log): 'filter','method': method, 'args': kwargs, 'fs': fs, 'cutoff_freq': cutoff_freq},)
+        return new
+
+    def _filter_values(self, values, cutoff_freq=None, cutoff_scale=None, method='butterworth', **kwargs):
+        ''' Filter values defined on the time axis of the Series
+
+        values may be the values of the Series, or a 2D array of values sharing its time axis,
+        filtered along the first axis. See Series.filter for the parameters.
+
+        Returns
+        -------
+
+        values : array
+            the filtered values
+        fs : float
+            the sampling frequency
+        cutoff_freq : float or list
+            the cutoff frequency
+
+        '''
+        mu = np.mean(values, axis=0) # extract the mean
+        y = values - mu
 
         fs = 1/np.mean(np.diff(self.time))
 
@@ -1481,13 +1507,8 @@ def filter(self, cutoff_freq=None, cutoff_scale=None, method='butterworth', keep
             args[method].update(kwargs)
 
         new_val = method_func[method](y, **args[method])
-        new.value = new_val + mu # restore the mean
 
-        if keep_log == True:
-            if new.log is None:
-                new.log=()
-            new.log += ({len(new.log): 'filter','method': method, 'args': kwargs, 'fs': fs, 'cutoff_freq': cutoff_freq},)
-        return new
+        return new_val + mu, fs, cutoff_freq # restore the mean
 
     def histplot(self, figsize=[10, 4], title=None, savefig_settings=None,
                   ax=None, ylabel='KDE', vertical=False, edgecolor='w', **plot_kwargs):
@@ -3303,15 +3324,20 @@ def correlation(self, target_series, timespan=None, alpha=0.05, settings=None, c
         settings : dict
             Parameters for the correlation function, including:
 
-            nsim : int
-                the number of simulations (default: 1000)
+            nsim : int or 'auto'
+                the number of simulations (default: 1000). If 'auto', simulations are drawn
+                in batches until the p-value is settled (see pyleoclim.utils.correlation.corr_sig)
             method : str, {'ttest','isopersistent','isospectral' (default)}
                 method for significance testing
+            mc_kwargs : dict
+                settings of the adaptive Monte Carlo procedure used when nsim is 'auto'
+            pval_method : str, {'kde' (default), 'empirical'}
+                how the p-value of the isopersistent method is computed from the simulations
 
         common_time_kwargs : dict
             Parameters for the method `MultipleSeries.common_time()`. Will use interpolation by default.
 
-        seed : float or int
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
             random seed for isopersistent and isospectral methods
 
         Returns
@@ -3385,15 +3411,241 @@ def correlation(self, target_series, timespan=None, alpha=0.05, settings=None, c
             value2 = ms.series_list[1].slice(timespan).value
 
 
-        if seed is not None:
-            np.random.seed(seed)
-
-        corr_res = corrutils.corr_sig(value1, value2, **corr_args)
+        corr_res = corrutils.corr_sig(value1, value2, seed=seed, **corr_args)
         signif = True if corr_res['signif'] == 1 else False
         corr = Corr(corr_res['r'], corr_res['p'], signif, alpha)
 
         return corr
 
+    def lagged_correlation(self, target_series, max_lag, timespan=None, alpha=0.05, settings=None,
+                           fdr_kwargs=None, common_time_kwargs=None, seed=None):
+        ''' Estimates the Pearson's correlation between two series over a range of leads and lags, and its significance
+
+        The series are placed on a common, evenly-spaced time axis once, and the whole cross-correlation function
+        is computed via FFT. The significance at each lag is assessed against a single set of surrogates of the target,
+        reused across all lags, and the False Discovery Rate is controlled across lags.
+
+        Parameters
+        ----------
+
+        target_series : Series
+            A pyleoclim Series object
+
+        max_lag : float
+            The maximum lead or lag, in units of time_unit. At positive lags, the series lags the target.
+
+        timespan : tuple
+            The time interval over which to perform the calculation
+
+        alpha : float
+            The significance level (default: 0.05)
+
+        settings : dict
+            Parameters for the correlation function, including:
+
+            nsim : int
+                the number of simulations (default: 1000)
+            method : str, {'isopersistent','isospectral' (default)}
+                method for generating the surrogates of the target
+
+        fdr_kwargs : dict
+            Parameters for the FDR function
+
+        common_time_kwargs : dict
+            Parameters for the method `MultipleSeries.common_time()`. Will use interpolation by default.
+
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
+            random seed for the surrogates
+
+        Returns
+        -------
+
+        lcorr : pyleoclim.LaggedCorr
+            the result object, see pyleoclim.LaggedCorr
+
+        See also
+        --------
+
+        pyleoclim.utils.correlation.lagged_corr_sig : Lagged correlation function
+
+        pyleoclim.utils.correlation.fdr : FDR function
+
+        pyleoclim.core.laggedcorr.LaggedCorr : The lagged correlation object
+
+        Examples
+        --------
+
+        .. jupyter-execute::
+
+            import pyleoclim as pyleo
+            import numpy as np
+            from pyleoclim.utils.tsmodel import colored_noise
+
+            t = np.arange(500)
+            v = colored_noise(alpha=1, t=t, seed=2333)
+            ts1 = pyleo.Series(time=t[10:], value=v[:-10], verbose=False)
+            ts2 = pyleo.Series(time=t, value=v, verbose=False)
+
+            lcorr = ts1.lagged_correlation(ts2, max_lag=30, settings={'nsim': 200}, seed=2333)
+            fig, ax = lcorr.plot()
+
+        '''
+        settings = {} if settings is None else settings.copy()
+        corr_args = {'alpha': alpha}
+        corr_args.update(settings)
+
+        ms = MultipleSeries([self, target_series])
+        if list(self.time) != list(target_series.time) or not tsbase.is_evenly_spaced(self.time):
+            common_time_kwargs = {} if common_time_kwargs is None else common_time_kwargs.copy()
+            ct_args = {'method': 'interp'}
+            ct_args.update(common_time_kwargs)
+            ms = ms.common_time(**ct_args)
+
+        if timespan is None:
+            ts1, ts2 = ms.series_list[0], ms.series_list[1]
+        else:
+            ts1, ts2 = ms.series_list[0].slice(timespan), ms.series_list[1].slice(timespan)
+
+        dt = np.mean(np.diff(ts1.time))
+        corr_res = corrutils.lagged_corr_sig(ts1.value, ts2.value, int(np.round(max_lag/dt)), seed=seed, **corr_args)
+
+        fdr_kwargs = {} if fdr_kwargs is None else fdr_kwargs.copy()
+        signif_fdr = np.zeros(np.size(corr_res['p']), dtype=bool)
+        fdr_res = corrutils.fdr(corr_res['p'], **fdr_kwargs)
+        if fdr_res is not None:
+            signif_fdr[fdr_res] = True
+
+        lcorr = LaggedCorr(corr_res['lags']*dt, corr_res['r'], corr_res['p'], corr_res['signif'], signif_fdr,
+                           corr_res['r_null'], alpha, time_unit=ts1.time_unit)
+
+        return lcorr
+
+    def running_correlation(self, target_series, window, step=None, timespan=None, alpha=0.05, settings=None,
+                            common_time_kwargs=None, seed=None):
+        ''' Estimates the Pearson's correlation between two series over sliding time windows
+
+        The series are placed on a common, evenly-spaced time axis once, and the correlations in all the windows
+        are obtained from cumulative sums, at a cost independent of the width of the window.
+        Optionally, a single set of surrogates of the target is used to compute, in batch, the band
+        of correlations expected by chance in each window.
+
+        Parameters
+        ----------
+
+        target_series : Series
+            A pyleoclim Series object
+
+        window : float
+            The width of the windows, in units of time_unit
+
+        step : float
+            The spacing between consecutive windows, in units of time_unit. The default is None, for one window per time step.
+
+        timespan : tuple
+            The time interval over which to perform the calculation
+
+        alpha : float
+            The significance level of the bands (default: 0.05)
+
+        settings : dict
+            Parameters for the correlation function, including:
+
+            nsim : int
+                the number of simulations (default: 1000). If 0, the bands are not computed.
+                The adaptive nsim='auto' of Series.correlation is not available.
+            method : str, {'isopersistent','isospectral' (default)}
+                method for generating the surrogates of the target
+
+        common_time_kwargs : dict
+            Parameters for the method `MultipleSeries.common_time()`. Will use interpolation by default.
+
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
+            random seed for the surrogates
+
+        Returns
+        -------
+
+        r : pyleoclim.Series
+            the correlation in each window, at the center of the window
+
+        bands : pyleoclim.MultipleSeries
+            the alpha/2 and 1-alpha/2 quantiles of the correlations of the series with the surrogates of the target,
+            in each window. None if nsim is 0.
+
+        See also
+        --------
+
+        pyleoclim.utils.correlation.running_corr_sig : Running correlation function
+
+        pyleoclim.core.series.Series.correlation : Correlation over the whole series
+
+        Examples
+        --------
+
+        .. jupyter-execute::
+
+            import pyleoclim as pyleo
+            import numpy as np
+
+            nt = 500
+            t = np.arange(nt)
+            v = np.random.default_rng(2333).standard_normal(nt)
+            noise = np.random.default_rng(2334).standard_normal(nt)
+            ts1 = pyleo.Series(time=t, value=v, verbose=False)
+            ts2 = pyleo.Series(time=t, value=v + np.linspace(0.5, 3, nt)*noise, verbose=False)
+
+            r, bands = ts1.running_correlation(ts2, window=50, settings={'nsim': 200}, seed=2333)
+            fig, ax = r.plot()
+            bands.plot(ax=ax, colors=['gray', 'gray'])
+
+        '''
+        settings = {} if settings is None else settings.copy()
+        corr_args = {'alpha': alpha, 'nsim': 1000}
+        corr_args.update(settings)
+
+        ms = MultipleSeries([self, target_series])
+        if list(self.time) != list(target_series.time) or not tsbase.is_evenly_spaced(self.time):
+            common_time_kwargs = {} if common_time_kwargs is None else common_time_kwargs.copy()
+            ct_args = {'method': 'interp'}
+            ct_args.update(common_time_kwargs)
+            ms = ms.common_time(**ct_args)
+
+        if timespan is None:
+            ts1, ts2 = ms.series_list[0], ms.series_list[1]
+        else:
+            ts1, ts2 = ms.series_list[0].slice(timespan), ms.series_list[1].slice(timespan)
+
+        dt = np.mean(np.diff(ts1.time))
+        nwin = int(np.round(window/dt))
+        nstep = 1 if step is None else max(int(np.round(step/dt)), 1)
+
+        if corr_args['nsim'] != 0:
+            corr_res = corrutils.running_corr_sig(ts1.value, ts2.value, nwin, step=nstep, seed=seed, **corr_args)
+        else:
+            idx, r = corrutils.running_corr(ts1.value, ts2.value, nwin, step=nstep)
+            corr_res = {'idx': idx, 'r': r}
+
+        time = ts1.time[0] + corr_res['idx']*dt
+
+        r = ts1.copy()
+        r.time = time
+        r.value = corr_res['r']
+        r.value_name = 'r'
+        r.value_unit = None
+        r.label = f'running correlation ({window:g} {ts1.time_unit} windows)' if ts1.time_unit is not None else 'running correlation'
+
+        bands = None
+        if 'r_null' in corr_res:
+            band_list = []
+            for q, r_null in zip([alpha/2, 1-alpha/2], corr_res['r_null']):
+                band = r.copy()
+                band.value = r_null
+                band.label = f'{q*100:g}% null quantile'
+                band_list.append(band)
+            bands = MultipleSeries(band_list)
+
+        return r, bands
+
     def causality(self, target_series, method='liang', timespan=None, settings=None, common_time_kwargs=None):
         ''' Perform causality analysis with the target timeseries. Specifically, whether there is information in the target series that influenced the original series.
             If the two series have different time axes, they are first placed on a common timescale (in ascending order).
@@ -3508,8 +3760,9 @@ def surrogates(self, method='ar1sim', number=1, length=None, seed=None, settings
         length : int
             Length of the series
 
-        seed : int
-            Control seed option for reproducibility
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator
+            Control seed option for reproducibility. All the surrogates are drawn from a single
+            random number generator built from it, without altering NumPy's global random state.
 
         settings : dict
             Parameters for surogate generator. See individual methods for details.
@@ -3532,10 +3785,7 @@ def surrogates(self, method='ar1sim', number=1, length=None, seed=None, settings
         args['ar1sim'] = {'t': self.time}
         args[method].update(settings)
 
-        if seed is not None:
-            np.random.seed(seed)
-
-        surr_res = surrogate_func[method](self.value, number, **args[method])
+        surr_res = surrogate_func[method](self.value, number, seed=seed, **args[method])
         if len(np.shape(surr_res)) == 1:
             surr_res = surr_res[:, np.newaxis]
 
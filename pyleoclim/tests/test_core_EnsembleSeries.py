@@ -152,6 +152,50 @@ def test_correlation_t3(self):
 
         assert np.size(corr_res.p) == np.size(ts_list1)
 
+    @pytest.mark.parametrize('method', ['isospectral', 'isopersistent'])
+    def test_correlation_t4(self, method):
+        '''Test for EnsembleSeries.correlation() with a target on a different time axis (batched computation)
+        '''
+        nt = 100
+        t0, v0 = gen_colored_noise(nt=nt, seed=42)
+        v0 = (v0 - np.mean(v0)) / np.std(v0)
+        noise = 0.5*np.random.default_rng(14).normal(size=(nt, 20))
+
+        ts_target = pyleo.Series(time=t0[::2] + 0.5, value=v0[::2], verbose=False)
+        ts_ens = pyleo.EnsembleSeries([pyleo.Series(time=t0, value=v0+noise[:, i], verbose=False) for i in range(20)])
+
+        corr_res = ts_ens.correlation(ts_target, settings={'nsim': 200, 'method': method}, seed=2333, mute_pbar=True)
+        assert np.size(corr_res.r) == 20
+        assert np.all(np.asarray(corr_res.r) > 0.5)
+        for signif in corr_res.signif:
+            assert signif is True
+
+    @pytest.mark.parametrize('method', ['isospectral', 'isopersistent'])
+    def test_correlation_t5(self, method):
+        '''Test that the batched EnsembleSeries.correlation() agrees with the loop over the members
+        '''
+        nt = 100
+        t0, v0 = gen_colored_noise(nt=nt, seed=42)
+        v0 = (v0 - np.mean(v0)) / np.std(v0)
+        noise = np.random.default_rng(14).normal(size=(nt, 10)) * np.linspace(0.5, 5, 10)
+
+        ts_target = pyleo.Series(time=t0, value=v0, verbose=False)
+        ts_ens = pyleo.EnsembleSeries([pyleo.Series(time=t0, value=v0+noise[:, i], verbose=False) for i in range(10)])
+
+        settings = {'nsim': 500, 'method': method}
+        corr_batch = ts_ens.correlation(ts_target, settings=settings, seed=2333, mute_pbar=True)
+        # an EnsembleSeries target forces the loop
+        corr_loop = ts_ens.correlation(pyleo.EnsembleSeries([ts_target]*10), settings=settings, seed=2333, mute_pbar=True)
+
+        np.testing.assert_allclose(corr_batch.r, corr_loop.r)
+        if method == 'isospectral':
+            # same null and same surrogates
+            np.testing.assert_allclose(corr_batch.p, corr_loop.p)
+            assert list(corr_batch.signif) == list(corr_loop.signif)
+        else:
+            # same null and same innovations; the AR(1) fits differ by the tolerance of the optimizers
+            np.testing.assert_allclose(corr_batch.p, corr_loop.p, atol=0.02)
+
     def test_plot_envelope_t0(self):
         ''' Test EnsembleSeries.plot_envelope() on a list of colored noise
         '''
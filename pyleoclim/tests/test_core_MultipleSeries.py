@@ -181,6 +181,36 @@ def test_standardize(self):
         assert max(v_0) > max(y_axis_0)
         assert max(v_1) > max(y_axis_1)
 
+class TestMultipleSeriesFilter:
+    '''Test for MultipleSeries.filter()
+
+    Series sharing a time axis are filtered together; the result should match filtering each Series'''
+
+    @pytest.mark.parametrize('method, cutoff_freq', [('butterworth', [1/50, 1/10]), ('firwin', [1/50, 1/10]), ('lanczos', 1/20)])
+    def test_filter_t0(self, method, cutoff_freq):
+        t = np.arange(500)
+        serieslist = [pyleo.Series(time=t, value=gen_colored_noise(nt=500, seed=j)[1], verbose=False) for j in range(3)]
+        ms = pyleo.MultipleSeries(serieslist)
+
+        ms_filter = ms.filter(cutoff_freq=cutoff_freq, method=method)
+
+        for ts, ts_filter in zip(serieslist, ms_filter.series_list):
+            assert_allclose(ts_filter.value, ts.filter(cutoff_freq=cutoff_freq, method=method).value, atol=1e-10)
+
+    @pytest.mark.parametrize('aligned', [True, False])
+    def test_filter_t1(self, aligned):
+        serieslist = []
+        for j in range(2):
+            t = np.arange(500) if aligned else np.arange(500) + j
+            serieslist.append(pyleo.Series(time=t, value=gen_colored_noise(nt=500, seed=j)[1], verbose=False))
+        ms = pyleo.MultipleSeries(serieslist)
+
+        ms_filter = ms.filter(cutoff_freq=0.1, keep_log=True)
+
+        for ts, ts_filter in zip(serieslist, ms_filter.series_list):
+            log_ref = ts.filter(cutoff_freq=0.1, keep_log=True).log
+            assert ts_filter.log == log_ref
+
 class TestMultipleSeriesBin:
     '''Test for MultipleSeries.bin()
 
@@ -453,6 +483,47 @@ def test_common_time_t2(self):
         
         assert_array_equal(new_time,ms1.series_list[0].time)
         
+    @pytest.mark.parametrize('method', ['bin', 'interp', 'gkernel'])
+    def test_common_time_t3(self, method):
+        ''' Check that the matrix output matches the list of Series
+        '''
+        rng = np.random.default_rng(7)
+        serieslist = []
+        for j in range(3):
+            t = np.sort(rng.uniform(0, 200, 150))
+            serieslist.append(pyleo.Series(time=t, value=rng.normal(size=150), label=f's{j}', verbose=False))
+        ms = pyleo.MultipleSeries(serieslist)
+
+        msa = ms.common_time(method=method, as_matrix=True)
+        assert isinstance(msa, pyleo.AlignedMultipleSeries)
+        assert len(msa) == 3
+        assert np.shape(msa.values) == (np.size(msa.time), 3)
+
+        msc = ms.common_time(method=method)
+        for j, ts in enumerate(msc.series_list):
+            mask = np.isin(msa.time, ts.time)
+            assert_allclose(msa.values[mask, j], ts.value)
+
+        # lazy views share the memory of the matrix
+        values = msa.values
+        assert np.shares_memory(msa.series_list[1].value, values)
+        assert [ts.label for ts in msa.series_list] == ['s0', 's1', 's2']
+        assert_allclose(msa.values, values, equal_nan=True)
+
+    def test_common_time_t4(self):
+        ''' Check slicing and PCA on the matrix output
+        '''
+        t = np.arange(300)
+        serieslist = [pyleo.Series(time=t, value=colored_noise(alpha=1, t=t, seed=j), verbose=False) for j in range(4)]
+        ms = pyleo.MultipleSeries(serieslist)
+
+        msa = ms.common_time(as_matrix=True).slice([50, 149])
+        assert np.shape(msa.values) == (100, 4)
+
+        res = msa.pca()
+        res_ref = pyleo.MultipleSeries([ts.slice([50, 149]) for ts in serieslist]).pca()
+        assert_allclose(res.eigvals, res_ref.eigvals)
+
 class TestMultipleSeriesStackPlot():
     ''' Test for MultipleSeries.Stackplot
     '''
@@ -496,6 +567,71 @@ def test_spectral_t0(self,spec_method):
         scals = ms.wavelet(method=spec_method)
         ms.spectral(method=spec_method,scalogram_list=scals)
  
+class TestMultipleSeriesCorrelationMatrix():
+    ''' Test for MultipleSeries.correlation_matrix
+    '''
+    def test_correlation_matrix_t0(self):
+        nt = 100
+        t0 = np.arange(nt)
+        v0 = colored_noise(alpha=1, t=t0, seed=42)
+        noise = np.random.default_rng(13).normal(size=(3, nt))
+        ms = pyleo.MultipleSeries([pyleo.Series(t0, v0 + noise[i], verbose=False) for i in range(3)])
+        res = ms.correlation_matrix(settings={'nsim': 50}, seed=2333)
+        for key in ['r', 'p', 'signif', 'signif_fdr']:
+            assert np.shape(res[key]) == (3, 3)
+        assert_allclose(res['r'], res['r'].T)
+        assert np.all(res['signif_fdr'] == res['signif_fdr'].T)
+
+class TestMultipleSeriesCausalityMatrix():
+    ''' Test for MultipleSeries.causality_matrix
+    '''
+    @pytest.mark.parametrize('method', ['liang', 'granger'])
+    def test_causality_matrix_t0(self, method):
+        soi = pyleo.utils.load_dataset('SOI')
+        nino = pyleo.utils.load_dataset('NINO3')
+        ms = soi & nino
+        cmat = ms.causality_matrix(method=method, settings={'nsim': 50} if method == 'liang' else None, seed=2333)
+        assert np.shape(cmat.p) == (2, 2)
+        df = cmat.to_pandas()
+        assert len(df) == 2
+        assert set(df['source']) == set(df['target'])
+
+    def test_causality_matrix_t1(self):
+        soi = pyleo.utils.load_dataset('SOI')
+        nino = pyleo.utils.load_dataset('NINO3')
+        ms = soi & nino
+        cmat = ms.causality_matrix(method='granger', settings={'alpha': 0.1})
+        assert cmat.alpha == 0.1
+        assert np.array_equal(cmat.signif, cmat.p < 0.1)
+
+class TestMultipleSeriesAr1fit():
+    ''' Test for MultipleSeries.ar1_fit
+    '''
+    def test_ar1_fit_t0(self):
+        ''' Compare the batched estimates to the series-by-series ones for uneven series
+        '''
+        rng = np.random.default_rng(7)
+        series_list = []
+        for n in (100, 200, 300):
+            t = np.cumsum(rng.uniform(0.5, 1.5, n))
+            series_list.append(pyleo.Series(t, pyleo.utils.tsmodel.ar1_sim_unevenly(t, 1, 5, seed=n)[:, 0], verbose=False))
+        ms = pyleo.MultipleSeries(series_list)
+        tau = ms.ar1_fit()
+        tau_ref = [pyleo.utils.tsmodel.tau_estimation(ts.value, ts.time) for ts in series_list]
+        assert_allclose(tau, tau_ref, rtol=1e-3)
+
+    def test_ar1_fit_t1(self):
+        ''' Compare the batched estimates to the series-by-series ones for even series
+        '''
+        series_list = []
+        for n, g in zip((100, 200, 300), (0.2, 0.5, 0.9)):
+            t = np.arange(n)
+            series_list.append(pyleo.Series(t, pyleo.utils.tsmodel.ar1_sim_evenly(n, 1, g, seed=n)[:, 0], verbose=False))
+        ms = pyleo.MultipleSeries(series_list)
+        g_est = ms.ar1_fit()
+        g_ref = [pyleo.utils.tsmodel.ar1_fit(ts.value, ts.time) for ts in series_list]
+        assert_allclose(g_est, g_ref, atol=5e-3)
+
 class TestToCSV:
     def test_to_csv_default(self):
         soi = pyleo.utils.load_dataset('SOI')
@@ -58,4 +58,60 @@ def test_signif_test_t0(self):
         psd = ts.spectral(method='mtm')
         psd_signif = psd.signif_test(number=10)
         fig, ax = psd_signif.plot()
-        pyleo.closefig(fig)
\ No newline at end of file
+        pyleo.closefig(fig)
+
+    def test_signif_test_t1(self, tmp_path):
+        ''' Test PSD.signif_test() with an on-disk cache
+        '''
+        ts = gen_ts(nt=500)
+        psd = ts.spectral(method='mtm')
+        psd_signif1 = psd.signif_test(number=10, seed=42, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob('*.pkl'))) == 1
+        psd_signif2 = psd.signif_test(number=10, seed=42, cache_dir=tmp_path)
+        assert np.array_equal(psd_signif1.signif_qs.psd_list[0].amplitude,
+                              psd_signif2.signif_qs.psd_list[0].amplitude, equal_nan=True)
+        psd_signif3 = psd.signif_test(number=10, seed=42, qs=[0.9], cache_dir=tmp_path)
+        assert len(list(tmp_path.glob('*.pkl'))) == 2
+
+    def test_signif_test_t2(self, tmp_path):
+        ''' Test the eviction of PSD.signif_test() cache entries
+        '''
+        ts = gen_ts(nt=500)
+        psd = ts.spectral(method='mtm')
+        psd.signif_test(number=2, seed=1, cache_dir=tmp_path, cache_maxsize=1)
+        psd.signif_test(number=2, seed=2, cache_dir=tmp_path, cache_maxsize=1)
+        assert len(list(tmp_path.glob('*.pkl'))) == 1
+
+    def test_signif_test_t3(self):
+        ''' Test PSD.signif_test() with an adaptive number of simulations
+        '''
+        ts = gen_ts(nt=500)
+        psd = ts.spectral(method='mtm')
+        psd_signif = psd.signif_test(number='auto', seed=42, mc_kwargs={'batch_size': 10, 'min_number': 20, 'max_number': 50})
+        diagnostics = psd_signif.signif_diagnostics
+        assert 20 <= diagnostics['number'] <= 50
+        assert diagnostics['converged'] or diagnostics['number'] == 50
+
+    @pytest.mark.parametrize('spec_method', ['lomb_scargle', 'wwz'])
+    def test_signif_test_t4(self, spec_method):
+        ''' Test PSD.signif_test() with the asymptotic solution for unevenly-spaced methods
+        '''
+        ts = gen_ts(nt=200)
+        psd = ts.spectral(method=spec_method)
+        psd_signif = psd.signif_test(method='ar1asym', qs=[0.90, 0.95])
+        assert len(psd_signif.signif_qs.psd_list) == 2
+        diff = psd_signif.signif_qs.psd_list[1].amplitude - psd_signif.signif_qs.psd_list[0].amplitude
+        assert np.nanmin(diff) >= 0
+        fig, ax = psd_signif.plot()
+        pyleo.closefig(fig)
+
+    def test_signif_test_t5(self, tmp_path):
+        ''' Test that PSD.signif_test() does not cache results obtained from the realizations of a scalogram
+        '''
+        ts = gen_ts(nt=100)
+        scal = ts.wavelet(method='wwz').signif_test(number=2, export_scal=True)
+        psd = ts.spectral(method='wwz', scalogram=scal)
+        psd.signif_test(number=2, seed=42, scalogram=scal, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob('*.pkl'))) == 0
+        psd.signif_test(number=2, seed=42, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob('*.pkl'))) == 1
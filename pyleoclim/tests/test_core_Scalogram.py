@@ -47,3 +47,23 @@ def test_signif_test_t1(self,ar1_method):
         ts = gen_ts(model='colored_noise',nt=500)
         scal = ts.wavelet(method='cwt')
         scal_signif = scal.signif_test(method=ar1_method,number=1)
+
+    def test_signif_test_t2(self, tmp_path):
+        ''' Test scalogram.signif_test() with an on-disk cache
+        '''
+        ts = gen_ts(model='colored_noise',nt=200)
+        scal = ts.wavelet(method='cwt')
+        scal_signif1 = scal.signif_test(number=2, seed=42, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob('*.pkl'))) == 1
+        scal_signif2 = scal.signif_test(number=2, seed=42, cache_dir=tmp_path)
+        assert (scal_signif1.signif_qs.scalogram_list[0].amplitude ==
+                scal_signif2.signif_qs.scalogram_list[0].amplitude).all()
+
+    def test_signif_test_t3(self):
+        ''' Test scalogram.signif_test() with an adaptive number of simulations
+        '''
+        ts = gen_ts(model='colored_noise',nt=200)
+        scal = ts.wavelet(method='cwt')
+        scal_signif = scal.signif_test(number='auto', mc_kwargs={'batch_size': 5, 'min_number': 10, 'max_number': 20})
+        assert scal_signif.signif_diagnostics['number'] <= 20
+
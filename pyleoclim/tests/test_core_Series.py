@@ -198,11 +198,14 @@ class TestUISeriesSpectral:
     [parametrizing tests](https://docs.pytest.org/en/stable/example/parametrize.html).
     '''
 
-    @pytest.mark.parametrize('spec_method', ['wwz', 'mtm', 'lomb_scargle', 'welch', 'periodogram','cwt'])
-    def test_spectral_t0(self, pinkseries, spec_method, eps=0.5):
+    @pytest.mark.parametrize(('spec_method', 'eps'), [('wwz', 0.5), ('mtm', 0.5), ('lomb_scargle', 0.8), ('welch', 0.5), ('periodogram', 0.5), ('cwt', 0.5)])
+    def test_spectral_t0(self, pinkseries, spec_method, eps):
         ''' Test Series.spectral() with available methods using default arguments
 
         We will estimate the scaling slope of an ideal colored noise to make sure the result is reasonable.
+        With default arguments, the Lomb-Scargle slope is fitted to 10 frequencies only: over 200 realizations
+        of this 100-point pink noise, its estimates have a mean of 1.18 and a standard deviation of 0.21,
+        and range from 0.60 to 1.77 (0.5 and 99.5 percentiles), hence the wider tolerance.
         '''
         ts = pinkseries # has slope 1/f
         psd = ts.spectral(method=spec_method)
@@ -267,16 +270,18 @@ def test_spectral_t5(self, pinkseries, eps=0.6):
         assert_array_equal(psd.frequency, freq)
         assert np.abs(beta-1.0) < eps
 
-    @pytest.mark.parametrize('spec_method', ['wwz', 'lomb_scargle'])
-    def test_spectral_t6(self, pinkseries, spec_method, eps=0.3):
+    @pytest.mark.parametrize(('spec_method', 'eps'), [('wwz', 0.3), ('lomb_scargle', 0.8)])
+    def test_spectral_t6(self, pinkseries, spec_method, eps):
         ''' Test Series.spectral() with WWZ and Lomb Scargle on unevenly-spaced data with default arguments
 
         We will estimate the scaling slope of an ideal colored noise to make sure the result is reasonable.
+        The tolerance of the Lomb-Scargle slope is that of test_spectral_t0: with 3 points removed, over 100 realizations,
+        its estimates have a mean of 1.16 and a standard deviation of 0.23, and range from 0.64 to 1.66 (0.5 and 99.5 percentiles).
         '''
         ts = pinkseries
         # randomly remove some data pts
         n_del = 3
-        deleted_idx = np.random.choice(range(np.size(ts.time)), n_del, replace=False)
+        deleted_idx = np.random.default_rng(2333).choice(range(np.size(ts.time)), n_del, replace=False)
         t_unevenly =  np.delete(ts.time, deleted_idx)
         v_unevenly =  np.delete(ts.value, deleted_idx)
 
@@ -296,6 +301,17 @@ def test_spectral_t7(self, pinkseries, spec_method):
         sig_psd = ts.spectral(method=spec_method,scalogram=scal)
         sig_psd.signif_test(number=2,scalogram=signif).plot()
 
+    def test_spectral_t8(self):
+        '''Test the Lomb-Scargle periodogram at the Nyquist frequency of evenly-spaced data, where only the cosine term is defined
+        '''
+        t = np.arange(101.)
+        v = np.random.default_rng(3).standard_normal(101)
+        ts = pyleo.Series(time=t, value=v, verbose=False)
+        psd = ts.spectral(method='lomb_scargle', settings={'freq': np.array([0.1, 0.25, 0.5]), 'n50': 1, 'window': 'boxcar'})
+        y = (v - np.mean(v)) / np.std(v)
+        c = np.cos(np.pi*t)
+        assert np.isclose(psd.amplitude[-1], np.sum(y*c)**2 / np.sum(c**2))
+
 class TestUISeriesBin:
     ''' Tests for Series.bin()
 
@@ -548,6 +564,18 @@ def test_surrogates_t0(self, eps=0.2):
             g_surr = ar1_fit(ts_surr.value)
             assert np.abs(g_surr-g) < eps
 
+    def test_surrogates_t1(self):
+        ''' Test that surrogates are reproducible given a seed and do not alter the global random state
+        '''
+        ts = gen_ts(nt=200)
+        state = np.random.get_state()[1].copy()
+        surr1 = ts.surrogates(number=3, seed=42)
+        surr2 = ts.surrogates(number=3, seed=42)
+        assert np.array_equal(state, np.random.get_state()[1])
+        for s1, s2 in zip(surr1.series_list, surr2.series_list):
+            assert np.array_equal(s1.value, s2.value)
+        assert not np.array_equal(surr1.series_list[0].value, surr1.series_list[1].value)
+
 class TestUISeriesSummaryPlot:
     ''' Test Series.summary_plot()
     '''
@@ -659,6 +687,71 @@ def test_correlation_t2(self, corr_method, eps=1):
         r = corr_res.r
         assert np.abs(r-r_evenly) < eps
 
+    @pytest.mark.parametrize('corr_method', ['isopersistent', 'isospectral'])
+    def test_correlation_t3(self, corr_method):
+        ''' Test correlation with an adaptive number of simulations
+        '''
+        nt = 100
+        ts = gen_ts(nt=nt, alpha=1)
+        v1 = ts.value + np.random.normal(loc=0, scale=1, size=nt)
+        v2 = ts.value + np.random.normal(loc=0, scale=2, size=nt)
+
+        ts1 = pyleo.Series(time=ts.time, value=v1)
+        ts2 = pyleo.Series(time=ts.time, value=v2)
+
+        corr_res = ts1.correlation(ts2, settings={'method': corr_method, 'nsim': 'auto',
+                                                  'mc_kwargs': {'max_number': 300}})
+        assert 0 <= corr_res.p <= 1
+
+class TestUISeriesLaggedCorrelation:
+    ''' Test Series.lagged_correlation()
+    '''
+    @pytest.mark.parametrize('corr_method', ['isopersistent', 'isospectral'])
+    def test_lagged_correlation_t0(self, corr_method):
+        ''' Test that the maximum correlation is found at the imposed lag
+        '''
+        t = np.arange(400)
+        v = np.random.default_rng(17).standard_normal(400)
+        ts1 = pyleo.Series(time=t[10:], value=v[:-10], verbose=False)
+        ts2 = pyleo.Series(time=t, value=v, verbose=False)
+
+        lcorr = ts1.lagged_correlation(ts2, max_lag=30, settings={'method': corr_method, 'nsim': 200}, seed=2333)
+        imax = np.argmax(lcorr.r)
+        assert lcorr.lags[imax] == 10
+        assert lcorr.signif_fdr[imax]
+        fig, ax = lcorr.plot()
+        pyleo.closefig(fig)
+
+class TestUISeriesRunningCorrelation:
+    ''' Test Series.running_correlation()
+    '''
+    @pytest.mark.parametrize('nsim', [0, 100])
+    def test_running_correlation_t0(self, nsim):
+        t = np.arange(300)
+        v = np.random.default_rng(20).standard_normal(300)
+        ts1 = pyleo.Series(time=t, value=v, verbose=False)
+        ts2 = pyleo.Series(time=t, value=v + np.random.default_rng(21).standard_normal(300), verbose=False)
+
+        r, bands = ts1.running_correlation(ts2, window=50, step=10, settings={'nsim': nsim}, seed=2333)
+        assert np.size(r.value) == 26
+        assert np.allclose(r.time, np.arange(0, 251, 10) + 24.5)
+        r0, _ = ts1.running_correlation(ts2, window=50, step=10, settings={'nsim': 0})
+        assert np.allclose(r.value, r0.value)
+        if nsim == 0:
+            assert bands is None
+        else:
+            assert len(bands.series_list) == 2
+            assert np.size(bands.series_list[0].value) == 26
+            assert not np.any(np.isnan(bands.series_list[0].value))
+
+    def test_running_correlation_t1(self):
+        ''' The adaptive number of simulations is not available '''
+        t = np.arange(100)
+        ts1 = pyleo.Series(time=t, value=np.random.default_rng(20).standard_normal(100), verbose=False)
+        ts2 = pyleo.Series(time=t, value=np.random.default_rng(21).standard_normal(100), verbose=False)
+        with pytest.raises(ValueError, match='auto'):
+            ts1.running_correlation(ts2, window=30, settings={'nsim': 'auto'})
+
 class TestUISeriesCausality:
     ''' Test Series.causality()
     '''
@@ -0,0 +1,92 @@
+import pytest
+from pyleoclim.utils import causality
+import numpy as np
+from scipy import stats
+
+
+@pytest.mark.parametrize('npt', [1, 2])
+def test_liang_batch(npt):
+    rng = np.random.default_rng(22)
+    Y1, Y2 = rng.standard_normal((2, 200, 10))
+    Y1 = np.cumsum(Y1, axis=0) + 0.5*Y2
+    res = causality.liang_batch(Y1, Y2, npt=npt)
+    for i in range(10):
+        res_ref = causality.liang(Y1[:, i], Y2[:, i], npt=npt)
+        for key in ['T21', 'tau21', 'Z', 'dH1_star', 'dH1_noise']:
+            assert np.isclose(res[key][i], res_ref[key])
+
+
+def test_liang_matrix():
+    rng = np.random.default_rng(23)
+    Y = np.cumsum(rng.standard_normal((300, 4)), axis=0)
+    res = causality.liang_matrix(Y)
+    for i in range(4):
+        for j in range(4):
+            if i == j:
+                assert np.isnan(res['T21'][i, j])
+                continue
+            res_ref = causality.liang(Y[:, i], Y[:, j])
+            for key in ['T21', 'tau21', 'Z', 'dH1_star', 'dH1_noise']:
+                assert np.isclose(res[key][i, j], res_ref[key])
+
+
+@pytest.mark.parametrize('signif_test', ['isospec', 'isopersist'])
+def test_liang_causality_matrix(signif_test):
+    rng = np.random.default_rng(24)
+    Y = rng.standard_normal((201, 3))
+    res = causality.liang_causality_matrix(Y, signif_test=signif_test, nsim=150, chunk=40, seed=42)
+    assert np.shape(res['p']) == (3, 3)
+    off = ~np.eye(3, dtype=bool)
+    assert np.all((res['p'][off] >= 0) & (res['p'][off] <= 1))
+    res2 = causality.liang_causality_matrix(Y, signif_test=signif_test, nsim=150, chunk=150, seed=42)
+    assert np.array_equal(res['p'], res2['p'], equal_nan=True)
+    res3 = causality.liang_causality_matrix(Y, signif_test=signif_test, nsim=150, chunk=40, seed=42, nproc=2)
+    assert np.array_equal(res['p'], res3['p'], equal_nan=True)
+
+
+@pytest.mark.parametrize('addconst', [True, False])
+def test_granger_batch(addconst):
+    rng = np.random.default_rng(25)
+    Y2 = rng.standard_normal((200, 3))
+    Y1 = 0.3*np.roll(Y2, 1, axis=0) + rng.standard_normal((200, 3))
+    res = causality.granger_batch(Y1, Y2, maxlag=3, addconst=addconst)
+    assert np.shape(res['F']) == (3, 3)
+    for i in range(3):
+        for lag in range(1, 4):
+            # restricted and unrestricted regressions, fitted directly
+            y = Y1[lag:, i]
+            lags1 = np.stack([Y1[lag-l:200-l, i] for l in range(1, lag+1)], axis=1)
+            lags2 = np.stack([Y2[lag-l:200-l, i] for l in range(1, lag+1)], axis=1)
+            const = np.ones((200-lag, 1)) if addconst else np.zeros((200-lag, 0))
+            X_r = np.hstack([const, lags1])
+            X_u = np.hstack([const, lags1, lags2])
+            ssr_r = np.sum((y - X_r @ np.linalg.lstsq(X_r, y, rcond=None)[0])**2)
+            ssr_u = np.sum((y - X_u @ np.linalg.lstsq(X_u, y, rcond=None)[0])**2)
+            df_u = np.size(y) - np.shape(X_u)[1]
+            F_ref = (ssr_r - ssr_u) / lag / (ssr_u / df_u)
+            assert np.isclose(res['F'][lag-1, i], F_ref)
+            assert np.isclose(res['p'][lag-1, i], stats.f.sf(F_ref, lag, df_u))
+        if addconst:
+            ref = causality.granger_causality(Y1[:, i], Y2[:, i], maxlag=3, addconst=addconst, verbose=False)
+            for lag in range(1, 4):
+                F_ref, p_ref = ref[lag][0]['ssr_ftest'][:2]
+                assert np.isclose(res['F'][lag-1, i], F_ref)
+                assert np.isclose(res['p'][lag-1, i], p_ref)
+    res2 = causality.granger_batch(Y1, Y2, maxlag=[3, 1], addconst=addconst)
+    assert np.array_equal(res2['lags'], [3, 1])
+    assert np.allclose(res2['F'], res['F'][[2, 0]])
+    assert np.allclose(res2['p'], res['p'][[2, 0]])
+
+
+def test_granger_causality_matrix():
+    rng = np.random.default_rng(26)
+    Y = rng.standard_normal((150, 3))
+    res = causality.granger_causality_matrix(Y, maxlag=2)
+    for i in range(3):
+        for j in range(3):
+            if i == j:
+                assert np.isnan(res['p'][i, j])
+            else:
+                ref = causality.granger_batch(Y[:, i], Y[:, j], maxlag=2)
+                assert np.isclose(res['F'][i, j], ref['F'][-1])
+                assert np.isclose(res['p'][i, j], ref['p'][-1])
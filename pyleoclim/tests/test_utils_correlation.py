@@ -0,0 +1,181 @@
+import pytest
+from pyleoclim.utils import correlation
+import numpy as np
+from scipy.stats import gaussian_kde
+
+
+def phaseran_loop(recblk, nsurr, seed=None):
+    ''' Reference implementation, one complex FFT per surrogate
+    '''
+    nfrms = recblk.shape[0]
+    if nfrms % 2 == 0:
+        nfrms = nfrms-1
+        recblk = recblk[0:nfrms]
+    len_ser = int((nfrms-1)/2)
+    interv1 = np.arange(1, len_ser+1)
+    interv2 = np.arange(len_ser+1, nfrms)
+    fft_recblk = np.fft.fft(recblk)
+    surrblk = np.zeros((nfrms, nsurr))
+    rng = np.random.default_rng(seed)
+    for k in range(nsurr):
+        ph_interv1 = np.exp(2*np.pi*1j*rng.random(len_ser))
+        fft_recblk_surr = np.copy(fft_recblk)
+        fft_recblk_surr[interv1] = fft_recblk[interv1] * ph_interv1
+        fft_recblk_surr[interv2] = fft_recblk[interv2] * np.conj(np.flipud(ph_interv1))
+        surrblk[:, k] = np.real(np.fft.ifft(fft_recblk_surr))
+    return surrblk
+
+
+@pytest.mark.parametrize('nt', [200, 201])
+@pytest.mark.parametrize('chunk', [None, 7])
+def test_phaseran(nt, chunk):
+    y = np.random.default_rng(8).standard_normal(nt)
+    surr = correlation.phaseran(y, 30, seed=42, chunk=chunk)
+    assert np.allclose(surr, phaseran_loop(y, 30, seed=42))
+
+
+def test_phaseran_2d():
+    y = np.random.default_rng(9).standard_normal((201, 3))
+    surr = correlation.phaseran(y, 10, seed=42)
+    assert np.shape(surr) == (201, 3, 10)
+    for j in range(3):
+        assert np.allclose(surr[:, j], phaseran_loop(y[:, j], 10, seed=42))
+
+
+def test_colwise_corr():
+    rng = np.random.default_rng(10)
+    X, Y = rng.standard_normal((2, 100, 20))
+    r_ref = [np.corrcoef(X[:, i], Y[:, i])[0, 1] for i in range(20)]
+    assert np.allclose(correlation.colwise_corr(X, Y), r_ref)
+
+
+@pytest.mark.parametrize('pval_method', ['kde', 'empirical'])
+def test_corr_isopersist(pval_method):
+    rng = np.random.default_rng(11)
+    y1 = rng.standard_normal(200)
+    y2 = y1 + rng.standard_normal(200)
+    r, signif, pval = correlation.corr_isopersist(y1, y2, nsim=2000, seed=42, pval_method=pval_method)
+    assert signif
+    assert 0 <= pval < 0.05
+
+
+@pytest.mark.parametrize('nt', [200, 201])
+@pytest.mark.parametrize('method', ['isospectral', 'isopersistent'])
+def test_corr_ens_sig(nt, method):
+    rng = np.random.default_rng(13)
+    y = np.cumsum(rng.standard_normal(nt))
+    Y = y[:, np.newaxis] + 10*rng.standard_normal((nt, 6))*np.linspace(0.2, 2, 6)
+    res = correlation.corr_ens_sig(Y, y, nsim=300, method=method, seed=42)
+    ref = [correlation.corr_sig(Y[:, j], y, nsim=300, method=method, seed=42) for j in range(6)]
+    assert np.allclose(res['r'], [d['r'] for d in ref])
+    if method == 'isospectral':
+        assert np.allclose(res['p'], [d['p'] for d in ref])
+    else:
+        # the AR(1) fits differ by the tolerance of the optimizers
+        assert np.allclose(res['p'], [d['p'] for d in ref], atol=0.02)
+
+
+def test_isopersist_pval():
+    rng = np.random.default_rng(14)
+    rsa = np.abs(rng.normal(0, 0.2, (5, 500)))
+    ra = rng.uniform(0, 0.6, 5)
+    pval = correlation.isopersist_pval(rsa, ra)
+    for i in range(5):
+        # integral of scipy's kernel density estimate above the observed value
+        xi = np.linspace(0, 1.1*max(ra[i], np.max(rsa[i])), 200)
+        pos = np.argmin(np.abs(ra[i] - xi))
+        pval_ref = np.trapz(gaussian_kde(rsa[i])(xi)[pos:], xi[pos:])
+        assert np.isclose(pval[i], pval_ref)
+        assert np.isclose(correlation.isopersist_pval(rsa[i], ra[i]), pval_ref)
+
+
+@pytest.mark.parametrize('method', ['isospectral', 'isopersistent'])
+def test_corr_matrix_sig(method):
+    rng = np.random.default_rng(12)
+    y0 = rng.standard_normal(201)
+    Y = np.stack([y0, y0 + rng.standard_normal(201), rng.standard_normal(201)], axis=1)
+    res = correlation.corr_matrix_sig(Y, nsim=500, method=method, seed=42)
+    assert np.allclose(res['r'], np.corrcoef(Y.T))
+    assert np.allclose(res['p'], res['p'].T)
+    assert res['signif'][0, 1]
+    assert not res['signif'][0, 2]
+
+
+def test_corr_matrix_sig_chunk():
+    rng = np.random.default_rng(12)
+    Y = np.cumsum(rng.standard_normal((201, 4)), axis=0)
+    res = correlation.corr_matrix_sig(Y, nsim=50, seed=42, chunk=50)
+    res_chunk = correlation.corr_matrix_sig(Y, nsim=50, seed=42, chunk=7)
+    assert np.array_equal(res['p'], res_chunk['p'])
+
+
+def test_lagged_corr():
+    rng = np.random.default_rng(15)
+    y1, y2 = rng.standard_normal((2, 150))
+    lags, r = correlation.lagged_corr(y1, y2, 20)
+    z1 = (y1 - np.mean(y1)) / np.std(y1)
+    z2 = (y2 - np.mean(y2)) / np.std(y2)
+    for k, rk in zip(lags, r):
+        r_ref = np.sum(z1[k:]*z2[:150-k]) / 150 if k >= 0 else np.sum(z1[:150+k]*z2[-k:]) / 150
+        assert np.isclose(rk, r_ref)
+
+
+def test_lagged_corr_sig():
+    rng = np.random.default_rng(16)
+    y = rng.standard_normal(310)
+    res = correlation.lagged_corr_sig(y[:300], y[5:305], 10, nsim=200, seed=42)
+    assert res['lags'][np.argmax(res['r'])] == 5
+    assert res['signif'][np.argmax(res['r'])]
+    assert np.shape(res['r_null']) == (2, 21)
+
+
+@pytest.mark.parametrize('step', [1, 7])
+def test_running_corr(step):
+    rng = np.random.default_rng(18)
+    y1, y2 = rng.standard_normal((2, 120)) + 100
+    idx, r = correlation.running_corr(y1, y2, 30, step=step)
+    r_ref = [np.corrcoef(y1[i:i+30], y2[i:i+30])[0, 1] for i in range(0, 91, step)]
+    assert np.allclose(r, r_ref)
+    assert np.allclose(idx, np.arange(0, 91, step) + 14.5)
+
+
+def test_running_corr_sig():
+    rng = np.random.default_rng(19)
+    y = rng.standard_normal(201)
+    res = correlation.running_corr_sig(y, y + rng.standard_normal(201), 40, nsim=200, seed=42)
+    assert np.all(res['r_null'][0] < res['r_null'][1])
+    assert np.mean(res['signif']) > 0.9
+
+
+@pytest.mark.parametrize('method', ['isospectral', 'isopersistent'])
+def test_running_corr_sig_even(method):
+    rng = np.random.default_rng(20)
+    y1, y2 = rng.standard_normal((2, 300))
+    idx, r = correlation.running_corr(y1, y2, 31)
+    res = correlation.running_corr_sig(y1, y2, 31, nsim=50, method=method, seed=42)
+    assert np.size(res['r']) == 270
+    assert np.allclose(res['r'], r)
+    assert np.allclose(res['idx'], idx)
+    assert np.shape(res['r_null']) == (2, 270)
+    assert not np.any(np.isnan(res['p']))
+    assert not np.any(np.isnan(res['r_null']))
+
+
+def test_running_corr_sig_last_window():
+    ''' With an even length, the last window gets its null from the surrogates of y2[1:] '''
+    rng = np.random.default_rng(21)
+    y1, y2 = rng.standard_normal((2, 200))
+    res = correlation.running_corr_sig(y1, y2, 50, step=50, nsim=100, seed=42)
+    y2surr = correlation.phaseran(y2[1:], 100, seed=42)
+    _, r_last = correlation.running_corr(y1[150:], y2surr[-50:], 50)
+    assert np.isclose(res['p'][-1], np.mean(np.abs(r_last[0]) >= np.abs(res['r'][-1])))
+    # the other windows keep the surrogates of y2[:-1]
+    y2surr = correlation.phaseran(y2, 100, seed=42)
+    _, r_sim = correlation.running_corr(y1[:199], y2surr, 50, step=50)
+    assert np.allclose(res['p'][:-1], np.mean(np.abs(r_sim) >= np.abs(res['r'][:-1])[:, np.newaxis], axis=1))
+
+
+def test_running_corr_sig_auto():
+    y1, y2 = np.random.default_rng(22).standard_normal((2, 100))
+    with pytest.raises(ValueError, match='auto'):
+        correlation.running_corr_sig(y1, y2, 30, nsim='auto')
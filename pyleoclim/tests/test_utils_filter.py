@@ -0,0 +1,16 @@
+import pytest
+from pyleoclim.utils import filter as filterutils
+import numpy as np
+
+
+@pytest.mark.parametrize(('kwargs', 'kwargs_ref'), [
+    ({'window': ('kaiser', np.array([8.]))}, {'window': ('kaiser', 8.)}),
+    ({'width': np.array([0.02])}, {'width': 0.02}),
+])
+def test_firwin_unhashable(kwargs, kwargs_ref):
+    ''' Unhashable parameters bypass the cache of filter designs '''
+    t = np.linspace(0, 1, 1000)
+    y = np.sin(2*np.pi*10*t) + np.sin(2*np.pi*20*t)
+    yf = filterutils.firwin(y, 15, fs=1000, **kwargs)
+    yf_ref = filterutils.firwin(y, 15, fs=1000, **kwargs_ref)
+    assert np.allclose(yf, yf_ref)
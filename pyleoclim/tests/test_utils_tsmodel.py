@@ -0,0 +1,93 @@
+import pytest
+from pyleoclim.utils import tsmodel
+import numpy as np
+
+
+@pytest.mark.parametrize('g', [0.2, 0.8])
+def test_ar1_sim_evenly(g, eps=0.05):
+    y = tsmodel.ar1_sim_evenly(1000, 50, g, seed=42)
+    assert np.shape(y) == (1000, 50)
+    g_est = np.mean([tsmodel.ar1_fit_evenly(y[:, i]) for i in range(50)])
+    assert np.abs(g_est - g) < eps
+    assert np.array_equal(y, tsmodel.ar1_sim_evenly(1000, 50, g, seed=42))
+
+
+def test_ar1_sim_unevenly():
+    t = np.cumsum(np.random.default_rng(1).uniform(0.5, 1.5, 500))
+    y = tsmodel.ar1_sim_unevenly(t, 20, 5, output_sigma=2, seed=42)
+    assert np.shape(y) == (500, 20)
+    assert np.abs(np.std(y[100:]) - 2) < 0.5
+    assert np.array_equal(y, tsmodel.ar1_sim_unevenly(t, 20, 5, output_sigma=2, seed=42))
+
+
+@pytest.mark.parametrize('evenly', [True, False])
+def test_ar1_sim_float32(evenly):
+    t = np.arange(200) if evenly else np.cumsum(np.random.default_rng(1).uniform(0.5, 1.5, 200))
+    y = tsmodel.ar1_sim(np.random.default_rng(2).standard_normal(200), 10, t=t, seed=42, dtype=np.float32)
+    assert y.dtype == np.float32
+    assert np.shape(y) == (200, 10)
+
+
+@pytest.mark.parametrize('t', [np.arange(300), np.arange(300)*0.5 + 10, np.sort(np.random.default_rng(3).uniform(0, 300, 300))])
+def test_sum_sinusoids(t):
+    ''' Compare the FFT and blockwise paths to the direct sum over waves
+    '''
+    f0, m = 1/300, 150
+    coeff = (np.arange(m) + 1.)**-0.5
+    theta = np.random.default_rng(4).uniform(0, 2*np.pi, (m, 3))
+    y = tsmodel._sum_sinusoids(t, f0, coeff, theta)
+    k = np.arange(m) + 1
+    for i in range(3):
+        y_ref = [np.sum(coeff*np.sin(2*np.pi*k*f0*tj + theta[:, i])) for tj in t]
+        assert np.allclose(y[:, i], y_ref)
+
+
+def test_colored_noise_ensemble():
+    t = np.arange(1000)
+    y = tsmodel.colored_noise(1, t, seed=42, p=5)
+    assert np.shape(y) == (1000, 5)
+    y2 = tsmodel.colored_noise_2regimes(0.5, 2, 1/20, t, seed=42, p=5)
+    assert np.shape(y2) == (1000, 5)
+
+
+def test_tau_estimation_batch():
+    rng = np.random.default_rng(5)
+    ts = [np.cumsum(rng.uniform(0.5, 1.5, n)) for n in (100, 250, 400)]
+    ys = [tsmodel.ar1_sim_unevenly(t, 1, 5, seed=i)[:, 0] for i, t in enumerate(ts)]
+    tau = tsmodel.tau_estimation_batch(ys, ts)
+    tau_ref = [tsmodel.tau_estimation(y, t) for y, t in zip(ys, ts)]
+    assert np.allclose(tau, tau_ref, rtol=1e-3)
+
+
+def test_tau_estimation_batch_bound():
+    # white noise: the minimum lies on the lower bound of the lag-1 coefficient
+    rng = np.random.default_rng(7)
+    ts = [np.sort(rng.uniform(0, n, n)) for n in (200, 150, 250)]
+    ys = [rng.standard_normal(n) for n in (200, 150, 250)]
+    tau = tsmodel.tau_estimation_batch(ys, ts)
+    tau_ref = [tsmodel.tau_estimation(y, t) for y, t in zip(ys, ts)]
+    assert np.allclose(tau, tau_ref, rtol=1e-6)
+
+
+def test_ar1_fit_batch():
+    g = 0.6
+    ys = [tsmodel.ar1_sim_evenly(n, 1, g, seed=42)[:, 0] for n in (500, 1000)]
+    t_uneven = np.cumsum(np.random.default_rng(6).uniform(0.5, 1.5, 300))
+    ys.append(tsmodel.ar1_sim_unevenly(t_uneven, 1, 5, seed=42)[:, 0])
+    ts = [np.arange(500), np.arange(1000), t_uneven]
+    res = tsmodel.ar1_fit_batch(ys, ts)
+    assert np.all(np.abs(res[:2] - g) < 0.1)
+    assert np.isclose(res[2], tsmodel.tau_estimation(ys[2], t_uneven), rtol=1e-3)
+
+
+def test_ar1_fit_evenly_batch():
+    # same model as ar1_fit_evenly; the estimates only differ by the tolerance of the statsmodels optimizer
+    rng = np.random.default_rng(8)
+    ns = (60, 150, 300, 500)
+    gs = (-0.4, 0.3, 0.7, 0.95)
+    ys = [100 + 0.01*np.arange(n) + tsmodel.ar1_sim_evenly(n, 1, g, seed=i)[:, 0]
+          for i, (n, g) in enumerate(zip(ns, gs))]
+    ys.append(rng.standard_normal(200))
+    g = tsmodel.ar1_fit_evenly_batch(ys)
+    g_ref = [tsmodel.ar1_fit_evenly(y) for y in ys]
+    assert np.allclose(g, g_ref, atol=5e-3)
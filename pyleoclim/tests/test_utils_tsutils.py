@@ -2,6 +2,7 @@
 import pytest
 
 import numpy as np
+from sklearn.metrics import silhouette_score
 
 from pyleoclim.utils import tsutils, tsbase
 from numpy.testing import assert_array_equal
@@ -42,6 +43,20 @@ def test_bin_t4(unevenly_spaced_series,statistic):
 def test_bin_t5(unevenly_spaced_series,start,stop,bin_size,step_style,no_nans):
     tsutils.bin(unevenly_spaced_series.time,unevenly_spaced_series.value,start=start,stop=stop,bin_size=bin_size,step_style=step_style,no_nans=no_nans)
 
+@pytest.mark.parametrize('statistic',['mean','std','median','count','sum','min','max'])
+def test_bin_t6(unevenly_spaced_series,statistic):
+    ''' Compare the single-pass statistics to scipy.stats.binned_statistic, for 1d and 2d values
+    '''
+    from scipy import stats
+    x, y = unevenly_spaced_series.time, unevenly_spaced_series.value
+    bin_edges = np.linspace(np.min(x), np.max(x), 25)
+    res_dict = tsutils.bin(x,y,bin_edges=bin_edges,statistic=statistic)
+    ref = stats.binned_statistic(x,y,bins=bin_edges,statistic=statistic).statistic
+    np.testing.assert_allclose(res_dict['binned_values'], ref, equal_nan=True)
+    res_dict2 = tsutils.bin(x,np.stack([y,-y],axis=1),bin_edges=bin_edges,statistic=statistic)
+    np.testing.assert_allclose(res_dict2['binned_values'][:,0], ref, equal_nan=True)
+    assert_array_equal(res_dict2['n'][:,1], res_dict['n'])
+
 def test_gkernel_t0(unevenly_spaced_series):
     t,v = tsutils.gkernel(unevenly_spaced_series.time,unevenly_spaced_series.value)
     assert isinstance(t,np.ndarray)
@@ -56,6 +71,22 @@ def test_gkernel_t2(unevenly_spaced_series):
     t,v = tsutils.gkernel(unevenly_spaced_series.time,unevenly_spaced_series.value,bin_edges=bin_edges)
     assert_array_equal(t,(bin_edges[1:]+bin_edges[:-1])/2)
 
+def test_gkernel_t3(unevenly_spaced_series):
+    ''' Compare to the kernel-weighted mean computed bin by bin, for 1d and 2d values
+    '''
+    t0, v0 = unevenly_spaced_series.time, unevenly_spaced_series.value
+    bin_edges = np.linspace(np.min(t0), np.max(t0), 15)
+    t,v = tsutils.gkernel(t0,v0,bin_edges=bin_edges,h=3)
+    for i in range(len(t)):
+        mask = (t0>=bin_edges[i])&(t0<bin_edges[i+1])
+        if np.any(mask):
+            w = np.exp(-0.5*((t0[mask]-t[i])/3)**2)
+            assert np.isclose(v[i], np.sum(w*v0[mask])/np.sum(w))
+        else:
+            assert np.isnan(v[i])
+    t2,v2 = tsutils.gkernel(t0,np.stack([v0,2*v0],axis=1),bin_edges=bin_edges,h=3)
+    assert np.allclose(v2[:,1], 2*v, equal_nan=True)
+
 def test_interp_t0(unevenly_spaced_series):
     t,v = tsutils.interp(unevenly_spaced_series.time,unevenly_spaced_series.value)
     assert isinstance(t,np.ndarray)
@@ -71,4 +102,109 @@ def test_interp_t1(unevenly_spaced_series):
 @pytest.mark.parametrize('step',[None,20])
 @pytest.mark.parametrize('step_style',[None,'median'])
 def test_interp_t2(unevenly_spaced_series,start,stop,step,step_style):
-    tsutils.interp(unevenly_spaced_series.time,unevenly_spaced_series.value,start=start,stop=stop,step=step,step_style=step_style)
\ No newline at end of file
+    tsutils.interp(unevenly_spaced_series.time,unevenly_spaced_series.value,start=start,stop=stop,step=step,step_style=step_style)
+@pytest.mark.parametrize('interp_type',['linear','nearest','cubic'])
+@pytest.mark.parametrize('fill_value',[np.nan,'extrapolate'])
+def test_interp_batch_t0(interp_type,fill_value):
+    ''' Compare to interp for a ragged set of series, with unsorted times and NaNs
+    '''
+    rng = np.random.default_rng(8)
+    xs = [rng.permutation(np.cumsum(rng.uniform(0.5,1.5,n))) for n in (40,60,85)]
+    ys = [rng.normal(size=np.size(x)) for x in xs]
+    ys[1][5] = np.nan
+    time_axis = np.linspace(-2,50,30)
+    xi,yi = tsutils.interp_batch(xs,ys,time_axis,interp_type=interp_type,bounds_error=False,fill_value=fill_value)
+    assert np.shape(yi) == (30,3)
+    for j in range(3):
+        _,y_ref = tsutils.interp(xs[j],ys[j],interp_type=interp_type,time_axis=time_axis,
+                                 bounds_error=False,fill_value=fill_value)
+        assert np.allclose(yi[:,j],y_ref,equal_nan=True)
+
+def test_interp_batch_t1():
+    xs = [np.arange(10.), np.arange(5.)]
+    ys = [np.arange(10.), np.arange(5.)]
+    with pytest.raises(ValueError):
+        tsutils.interp_batch(xs,ys,time_axis=np.arange(8))
+
+def test_emd_t0():
+    t = np.linspace(0,1,1000)
+    y = np.sin(2*np.pi*5*t) + np.sin(2*np.pi*40*t) + t
+    imfs = tsutils.emd(y)
+    assert np.shape(imfs)[1] == 1000
+    assert np.allclose(np.sum(imfs,axis=0), y)
+    # the fastest mode comes first
+    assert np.abs(np.corrcoef(imfs[0], np.sin(2*np.pi*40*t))[0,1]) > 0.9
+
+def test_emd_batch_t0():
+    rng = np.random.default_rng(9)
+    ys = [np.cumsum(rng.normal(size=n)) for n in (200,350,500)]
+    imfs_list = tsutils.emd_batch(ys)
+    for y, imfs in zip(ys, imfs_list):
+        assert np.allclose(imfs, tsutils.emd(y))
+    ys_d, trends = tsutils.detrend_emd_batch(ys, n=2)
+    for y, yd in zip(ys, ys_d):
+        assert np.allclose(yd, tsutils.detrend(y, method='emd', n=2)[0])
+
+def test_emd_t1():
+    # IMFs of pyhht.emd.EMD(y).decompose() (pyhht 0.1.0), rounded to 8 decimals
+    t = np.arange(40)
+    y = np.sin(2*np.pi*t/5) + 0.8*np.sin(2*np.pi*t/17) + 0.05*t
+    imfs_ref = np.array([[-0.51444348,  0.74400205,  0.58185382, -0.49906937, -0.85431862,  0.05000456,  0.94180134,
+          0.54805446, -0.63189520, -0.98236584, -0.00844662,  0.96220654,  0.60219875, -0.57585311,
+         -0.94197220,  0.00219589,  0.94749596,  0.58119889, -0.59522156, -0.95694228, -0.00030102,
+          0.95638991,  0.59858118, -0.57913882, -0.95101386, -0.00590249,  0.94390400,  0.58536791,
+         -0.57982609, -0.93484327,  0.01032280,  0.94483231,  0.55749080, -0.63244678, -0.98619734,
+          0.00336485,  1.01174426,  0.71066422, -0.42290967, -0.78161578],
+        [ 0.31606169,  0.34659971,  0.43964100,  0.56149731,  0.66825081,  0.71702637,  0.66919208,
+          0.50135937,  0.24585499, -0.05108356, -0.34233653, -0.57725498, -0.71313270, -0.74251847,
+         -0.66660430, -0.49200890, -0.24725858,  0.03286368,  0.31045714,  0.54684163,  0.70719914,
+          0.77216047,  0.73164734,  0.59724495,  0.38576125,  0.11764219, -0.17190818, -0.44425812,
+         -0.66182321, -0.78728086, -0.79074109, -0.67204573, -0.44526375, -0.15162081,  0.16086860,
+          0.44800622,  0.68085869,  0.83954507,  0.92512899,  0.94391027],
+        [ 0.19838178,  0.19944808,  0.20524695,  0.21591744,  0.23159863,  0.25242958,  0.27847688,
+          0.30951715,  0.34525457,  0.38539327,  0.42963743,  0.47769118,  0.52925869,  0.58399899,
+          0.64138935,  0.70085649,  0.76182581,  0.82372268,  0.88597250,  0.94800065,  1.00923251,
+          1.06909347,  1.12701725,  1.18252240,  1.23534182,  1.28525991,  1.33206108,  1.37552973,
+          1.41545027,  1.45160710,  1.48383095,  1.51213931,  1.53660168,  1.55728900,  1.57427222,
+          1.58762227,  1.59741008,  1.60370660,  1.60658276,  1.60610951]])
+    assert np.allclose(tsutils.emd(y), imfs_ref, rtol=0, atol=1e-8)
+    assert np.allclose(tsutils.emd_batch([y, y[:30]])[0], imfs_ref, rtol=0, atol=1e-8)
+    _, trend = tsutils.detrend(y, method='emd', n=1)
+    assert np.allclose(trend, imfs_ref[-1], rtol=0, atol=1e-8)
+
+def test_detect_outliers_DBSCAN_t0():
+    rng = np.random.default_rng(3)
+    y = np.concatenate([rng.normal(0,1,100), rng.normal(6,0.5,30), [-9,15]])
+    eps = list(np.linspace(0.05,1,5))
+    min_samples = [2,5,10]
+    idx, res = tsutils.detect_outliers_DBSCAN(y, eps=eps, min_samples=min_samples)
+    idx_ref, res_ref = tsutils.detect_outliers_DBSCAN(y, eps=eps, min_samples=min_samples, sweep=False)
+    assert np.array_equal(np.sort(idx), np.sort(idx_ref))
+    for l, l_ref in zip(res['clusters'], res_ref['clusters']):
+        assert np.array_equal(l, l_ref)
+    assert np.allclose(res['silhouette score'], res_ref['silhouette score'], equal_nan=True)
+
+def test_detect_outliers_DBSCAN_t1():
+    # rounded data, with eps values equal to differences of the (standardized) data
+    rng = np.random.default_rng(5)
+    y = np.round(np.concatenate([rng.normal(0,1,100), rng.normal(6,0.5,30), [-9,15]]), 1)
+    v = np.sort(tsutils.standardize(y)[0])
+    d = np.unique(np.concatenate([v[k:]-v[:-k] for k in (1,3,6)]))
+    eps = list(rng.choice(d[d > 0], 10, replace=False))
+    min_samples = [2,3,5,10]
+    idx, res = tsutils.detect_outliers_DBSCAN(y, eps=eps, min_samples=min_samples)
+    idx_ref, res_ref = tsutils.detect_outliers_DBSCAN(y, eps=eps, min_samples=min_samples, sweep=False)
+    assert np.array_equal(np.sort(idx), np.sort(idx_ref))
+    for l, l_ref in zip(res['clusters'], res_ref['clusters']):
+        assert np.array_equal(l, l_ref)
+    assert np.allclose(res['silhouette score'], res_ref['silhouette score'], equal_nan=True)
+
+def test_detect_outliers_kmeans_t0():
+    rng = np.random.default_rng(4)
+    y = np.concatenate([rng.normal(0,1,150), rng.normal(6,0.5,50), [-9,15]])
+    idx, res = tsutils.detect_outliers_kmeans(y, max_cluster=5)
+    idx_ref, res_ref = tsutils.detect_outliers_kmeans(y, max_cluster=5, optimal=False)
+    assert np.array_equal(np.sort(idx), np.sort(idx_ref))
+    ys = tsutils.standardize(y)[0]
+    for labels, sil in zip(res['clusters'], res['silhouette score']):
+        assert np.isclose(sil, silhouette_score(ys.reshape(-1,1), labels))
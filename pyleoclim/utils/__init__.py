@@ -22,4 +22,6 @@
 from .wavelet import *
 from .jsonutils import *
 from .tsbase import *
-from .datasets import *
\ No newline at end of file
+from .datasets import *
+from .cache import *
+from .mcutils import *
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilities to cache the outcome of Monte Carlo significance tests on disk.
+
+The quantiles of a surrogate distribution only depend on the time axis, the fitted
+persistence and the settings of the test, so they can be safely reused across sessions.
+Entries are content-addressed (the file name is a hash of these inputs) and the
+directory is kept below a maximum size by evicting the least recently used entries.
+"""
+
+__all__ = [
+    'signif_cache_key',
+    'signif_cache_load',
+    'signif_cache_save',
+    'signif_cache_clear',
+]
+
+import os
+import glob
+import pickle
+import hashlib
+import numpy as np
+
+from .tsmodel import ar1_fit
+
+# default maximum size of the cache directory, in bytes
+CACHE_MAXSIZE = 500 * 1024**2
+
+
+def _update_hash(h, obj):
+    ''' Feed a (possibly nested) object into a hash in a deterministic way
+
+    Parameters
+    ----------
+
+    h : hashlib hash object
+        The hash to update
+
+    obj : any
+        Arrays, scalars, strings, lists, tuples or dictionaries thereof
+
+    '''
+    if isinstance(obj, dict):
+        h.update(b'{')
+        for k in sorted(obj.keys(), key=str):
+            _update_hash(h, str(k))
+            _update_hash(h, obj[k])
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for item in obj:
+            _update_hash(h, item)
+        h.update(b']')
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(str(arr.dtype).encode())
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    else:
+        h.update(repr(obj).encode())
+
+
+def signif_cache_key(y, t, digits=3, **kwargs):
+    ''' Compute the content-addressed key of a significance test
+
+    The key depends on the time axis, on the persistence of the series (rounded to
+    `digits` significant digits), on its standard deviation (rounded likewise)
+    and on any additional parameter describing the test.
+
+    Parameters
+    ----------
+
+    y : array
+        The values of the timeseries under test
+
+    t : array
+        The time axis of the timeseries under test
+
+    digits : int
+        Number of significant digits retained for the persistence and standard deviation. Default is 3.
+
+    kwargs : dict
+        Any other argument that determines the outcome of the test (e.g. method, number, qs, seed, settings)
+
+    Returns
+    -------
+
+    key : str
+        Hexadecimal digest identifying the test
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.ar1_fit : Return lag-1 autocorrelation
+
+    '''
+    y = np.asarray(y, dtype=float)
+    t = np.asarray(t, dtype=float)
+    g = ar1_fit(y, t)
+    fmt = f'{{:.{digits}g}}'
+
+    h = hashlib.sha256()
+    _update_hash(h, t)
+    _update_hash(h, fmt.format(g))
+    _update_hash(h, fmt.format(np.std(y)))
+    _update_hash(h, kwargs)
+
+    return h.hexdigest()
+
+
+def signif_cache_load(cache_dir, key):
+    ''' Load a cached significance test result
+
+    Parameters
+    ----------
+
+    cache_dir : str
+        Path to the cache directory
+
+    key : str
+        Key of the entry, as returned by signif_cache_key
+
+    Returns
+    -------
+
+    res : object or None
+        The cached object, or None if the entry does not exist or cannot be read
+
+    '''
+    path = os.path.join(cache_dir, f'{key}.pkl')
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            res = pickle.load(f)
+    except Exception:
+        return None
+
+    # mark the entry as recently used
+    os.utime(path)
+
+    return res
+
+
+def signif_cache_save(cache_dir, key, obj, maxsize=None):
+    ''' Store a significance test result and evict old entries if needed
+
+    Parameters
+    ----------
+
+    cache_dir : str
+        Path to the cache directory. Created if it does not exist.
+
+    key : str
+        Key of the entry, as returned by signif_cache_key
+
+    obj : object
+        The object to store (typically the signif_qs of a PSD or Scalogram)
+
+    maxsize : int, optional
+        Maximum size of the cache directory in bytes.
+        The least recently used entries are deleted until the directory fits.
+        The default is None, which uses 500 MB.
+
+    '''
+    maxsize = CACHE_MAXSIZE if maxsize is None else maxsize
+    os.makedirs(cache_dir, exist_ok=True)
+
+    path = os.path.join(cache_dir, f'{key}.pkl')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    entries = []
+    for p in glob.glob(os.path.join(cache_dir, '*.pkl')):
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(e[1] for e in entries)
+    for mtime, size, p in sorted(entries):
+        if total <= maxsize:
+            break
+        if p == path:
+            continue
+        try:
+            os.remove(p)
+        except OSError:
+            continue
+        total -= size
+
+
+def signif_cache_clear(cache_dir):
+    ''' Remove all entries from a cache directory
+
+    Parameters
+    ----------
+
+    cache_dir : str
+        Path to the cache directory
+
+    '''
+    for p in glob.glob(os.path.join(cache_dir, '*.pkl')):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
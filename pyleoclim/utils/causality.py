@@ -6,15 +6,21 @@
 
 __all__ = [
     'liang_causality',
-    'granger_causality'
+    'granger_causality',
+    'granger_batch',
+    'liang_causality_matrix',
+    'granger_causality_matrix',
 ]
 
 import numpy as np
 from statsmodels.tsa.stattools import grangercausalitytests
-from tqdm import tqdm
 from .tsmodel import ar1_fit_evenly
 from .correlation import sm_ar1_sim, phaseran
+from .mcutils import spawn_rngs
 from scipy.stats.mstats import mquantiles
+from scipy.stats import f as fdist
+from numpy.lib.stride_tricks import sliding_window_view
+from pathos.multiprocessing import ProcessingPool as Pool
 
 #-------
 #Main functions
@@ -87,7 +93,7 @@ def granger_causality(y1, y2, maxlag=1,addconst=True,verbose=True):
     return res
 
 def liang_causality(y1, y2, npt=1, signif_test='isospec', nsim=1000,
-                    qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995]):
+                    qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995], seed=None):
     '''Liang-Kleeman information flow
     
     Estimate the Liang information transfer from series y2 to series y1 with 
@@ -115,6 +121,9 @@ def liang_causality(y1, y2, npt=1, signif_test='isospec', nsim=1000,
     qs : list
         the quantiles for significance test
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of y1 and y2 use independent streams spawned from it
+
     Returns
     -------
 
@@ -232,7 +241,7 @@ def liang_causality(y1, y2, npt=1, signif_test='isospec', nsim=1000,
             'isospec': signif_isospec,
         }
     
-    signif_dict = signif_test_func[signif_test](y1, y2, method='liang', nsim=nsim, qs=qs, npt=npt)
+    signif_dict = signif_test_func[signif_test](y1, y2, method='liang', nsim=nsim, qs=qs, npt=npt, seed=seed)
     T21_noise_qs = signif_dict['T21_noise_qs']
     tau21_noise_qs = signif_dict['tau21_noise_qs']
 
@@ -380,8 +389,474 @@ def liang(y1, y2, npt=1):
 
     return res
 
+def liang_batch(Y1, Y2, npt=1):
+    '''
+    Estimate the Liang information transfer from series Y2 to series Y1, for many pairs of series at once
+
+    Same estimator as pyleoclim.utils.causality.liang, with all the sums over time carried out
+    as column-wise reductions, so that the information flow of many pairs (e.g. surrogates)
+    is obtained without a Python loop.
+
+    Parameters
+    ----------
+
+    Y1, Y2 : array
+        2D arrays (Row: time sample. Column: series) of (real) numbers with identical shapes, no NaNs allowed.
+        The columns of Y1 and Y2 are paired. Vectors are treated as a single series.
+
+    npt : int  >=1
+        Time advance in performing Euler forward differencing,
+        e.g., 1, 2. Unless the series are generated with a highly chaotic deterministic system,
+        npt=1 should be used
+
+    Returns
+    -------
+
+    res : dict
+
+        A dictionary of arrays with one element per pair, including:
+
+            - T21 : array
+                information flow from Y2 to Y1 (Note: not Y1 -> Y2!)
+            - tau21 : array
+                the standardized information flow from Y2 to Y1
+            - Z : array
+                the total information flow from Y2 to Y1
+            - dH1_star : array
+                dH*/dt (Liang, 2016)
+            - dH1_noise : array
+
+    See also
+    --------
+
+    pyleoclim.utils.causality.liang : Estimate the Liang information transfer from series y2 to series y1
+
+    '''
+    dt = 1
+    Y1 = np.array(Y1, dtype=float)
+    Y2 = np.array(Y2, dtype=float)
+    if Y1.ndim == 1:
+        Y1 = Y1[:, np.newaxis]
+    if Y2.ndim == 1:
+        Y2 = Y2[:, np.newaxis]
+    nm = np.shape(Y1)[0]
+
+    grad1 = (Y1[npt:] - Y1[:-npt]) / npt
+    grad2 = (Y2[npt:] - Y2[:-npt]) / npt
+
+    Y1 = Y1[:-npt]
+    Y2 = Y2[:-npt]
+
+    N = nm - npt
+    m1, m2, mg1 = np.mean(Y1, axis=0), np.mean(Y2, axis=0), np.mean(grad1, axis=0)
+    A1, A2, Ag1 = Y1 - m1, Y2 - m2, grad1 - mg1
+
+    # covariances, and covariances with the tendency of Y1
+    C11 = np.sum(A1*A1, axis=0) / (N-1)
+    C12 = np.sum(A1*A2, axis=0) / (N-1)
+    C22 = np.sum(A2*A2, axis=0) / (N-1)
+    detC = C11*C22 - C12**2
+
+    dC11 = np.sum(A1*Ag1, axis=0) / (N-1)
+    dC21 = np.sum(A2*Ag1, axis=0) / (N-1)
+
+    a11 = (C22*dC11 - C12*dC21) / detC
+    a12 = (-C12*dC11 + C11*dC21) / detC
+
+    f1 = mg1 - a11*m1 - a12*m2
+    R1 = grad1 - (f1 + a11*Y1 + a12*Y2)
+    Q1 = np.sum(R1*R1, axis=0)
+    b1 = np.sqrt(Q1*dt/N)
+
+    T21 = C12/C11 * (-C12*dC11 + C11*dC21) / detC
+
+    dH1_star = a11
+    dH1_noise = b1**2 / (2*C11)
+
+    Z = np.abs(T21) + np.abs(dH1_star) + np.abs(dH1_noise)
+
+    tau21 = T21 / Z
+    dH1_star = dH1_star / Z
+    dH1_noise = dH1_noise / Z
+
+    res = {
+        'T21': T21,
+        'tau21': tau21,
+        'Z': Z,
+        'dH1_star': dH1_star,
+        'dH1_noise': dH1_noise,
+    }
+
+    return res
+
+def liang_matrix(Y, npt=1):
+    '''
+    Estimate the Liang information transfer between all ordered pairs of columns of an array
+
+    Same estimator as pyleoclim.utils.causality.liang. The covariances of all pairs of series,
+    and of all series with all tendencies, are computed at once as matrix products, and the
+    information flow of every ordered pair follows from element-wise algebra on these matrices.
+
+    Parameters
+    ----------
+
+    Y : array
+        2D array (Row: time sample. Column: series) of (real) numbers, no NaNs allowed.
+        A 3D array (time sample, series, realization) is processed one realization at a time,
+        the realizations being stacked along the last axis of the outputs.
+
+    npt : int  >=1
+        Time advance in performing Euler forward differencing,
+        e.g., 1, 2. Unless the series are generated with a highly chaotic deterministic system,
+        npt=1 should be used
+
+    Returns
+    -------
+
+    res : dict
+
+        A dictionary of matrices, where entry [i, j] pertains to the flow from series j to series i
+        (NaN on the diagonal), including:
+
+            - T21 : array
+                information flow
+            - tau21 : array
+                the standardized information flow
+            - Z : array
+                the total information flow
+            - dH1_star : array
+                dH*/dt (Liang, 2016)
+            - dH1_noise : array
+
+    See also
+    --------
+
+    pyleoclim.utils.causality.liang : Estimate the Liang information transfer from series y2 to series y1
+
+    '''
+    dt = 1
+    Y = np.array(Y, dtype=float)
+    squeeze = Y.ndim == 2
+    if squeeze:
+        Y = Y[:, :, np.newaxis]
+    nm = np.shape(Y)[0]
+
+    grad = (Y[npt:] - Y[:-npt]) / npt
+    Y = Y[:-npt]
+    N = nm - npt
+
+    A = Y - np.mean(Y, axis=0)
+    Ag = grad - np.mean(grad, axis=0)
+
+    # C[i, j] = cov(y_i, y_j), D[j, i] = cov(y_j, dy_i/dt), stacked along the realizations
+    C = np.einsum('tik,tjk->ijk', A, A) / (N-1)
+    D = np.einsum('tjk,tik->jik', A, Ag) / (N-1)
+    Gv = np.sum(Ag*Ag, axis=0) / (N-1)
+
+    Cii = np.diagonal(C).T[:, np.newaxis, :]
+    Cjj = np.diagonal(C).T[np.newaxis, :, :]
+    Dii = np.diagonal(D).T[:, np.newaxis, :]
+    Dji = np.transpose(D, (1, 0, 2))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        detC = Cii*Cjj - C**2
+        a11 = (Cjj*Dii - C*Dji) / detC
+        a12 = (-C*Dii + Cii*Dji) / detC
+
+        # sum of squared residuals of the linear model of dy_i/dt, from the second moments
+        Q1 = (Gv[:, np.newaxis, :] + a11**2*Cii + a12**2*Cjj
+              - 2*a11*Dii - 2*a12*Dji + 2*a11*a12*C) * (N-1)
+        b1 = np.sqrt(np.fmax(Q1, 0)*dt/N)
+
+        T21 = C/Cii * a12
+
+        dH1_star = a11
+        dH1_noise = b1**2 / (2*Cii)
+
+        Z = np.abs(T21) + np.abs(dH1_star) + np.abs(dH1_noise)
+
+        tau21 = T21 / Z
+        dH1_star = dH1_star / Z
+        dH1_noise = dH1_noise / Z
+
+    res = {
+        'T21': T21,
+        'tau21': tau21,
+        'Z': Z,
+        'dH1_star': dH1_star,
+        'dH1_noise': dH1_noise,
+    }
+
+    diag = np.arange(np.shape(C)[0])
+    for key in res:
+        res[key][diag, diag] = np.nan
+        if squeeze:
+            res[key] = res[key][:, :, 0]
+
+    return res
+
+def liang_causality_matrix(Y, npt=1, signif_test='isospec', nsim=1000, alpha=0.05, seed=None, nproc=1, chunk=100):
+    '''Liang-Kleeman information flow between all ordered pairs of columns of an array
+
+    The information flow of all ordered pairs is computed with pyleoclim.utils.causality.liang_matrix.
+    For the significance test, the surrogates of each series are generated once and shared by all the pairs
+    it belongs to; the information flow between the k-th surrogates of all series is computed for every k,
+    by chunks of surrogates that may be spread across processes.
+
+    Parameters
+    ----------
+
+    Y : array
+        2D array (Row: time sample. Column: series) of (real) numbers, no NaNs allowed
+
+    npt : int >=1
+        time advance in performing Euler forward differencing
+
+    signif_test : str; {'isopersist', 'isospec'}
+        the method for generating the surrogates, as in signif_isopersist and signif_isospec
+
+    nsim : int
+        the number of surrogates for significance test
+
+    alpha : float
+        significance level [default: 0.05]
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; each series uses an independent stream spawned from it
+
+    nproc : int
+        the number of processes; if 1, the computation is serial [default: 1]
+
+    chunk : int
+        the number of surrogates processed at once [default: 100]
+
+    Returns
+    -------
+
+    res : dict
+
+        A dictionary of matrices, where entry [i, j] pertains to the flow from series j to series i, including
+        T21, tau21, Z, dH1_star and dH1_noise as in pyleoclim.utils.causality.liang_matrix, and
+
+            - p : array
+                the fraction of surrogate |tau21| at least as large as the observed one
+            - signif : array
+                true where p < alpha
+
+    See also
+    --------
+
+    pyleoclim.utils.causality.liang_matrix : Estimate the Liang information transfer between all ordered pairs of columns of an array
+
+    pyleoclim.utils.causality.liang_causality : Liang-Kleeman information flow
+
+    '''
+    Y = np.array(Y, dtype=float)
+    n, ns = np.shape(Y)
+    res = liang_matrix(Y, npt=npt)
+
+    rngs = spawn_rngs(seed, ns)
+    surr = []
+    for j in range(ns):
+        if signif_test == 'isospec':
+            surr.append(phaseran(Y[:, j], nsim, seed=rngs[j]))
+        elif signif_test == 'isopersist':
+            surr.append(sm_ar1_sim(n, nsim, ar1_fit_evenly(Y[:, j]), np.std(Y[:, j]), seed=rngs[j]))
+        else:
+            raise KeyError(f'{signif_test} is not a valid significance test')
+    surr = np.stack(surr, axis=1)
+
+    def null_tau21(surr_chunk):
+        return liang_matrix(surr_chunk, npt=npt)['tau21']
+
+    # each worker only receives its own chunk of surrogates
+    surr_chunks = [surr[:, :, start:start+chunk] for start in range(0, nsim, chunk)]
+    if nproc >= 2:
+        with Pool(nproc) as pool:
+            tau21_noise = pool.map(null_tau21, surr_chunks)
+    else:
+        tau21_noise = [null_tau21(surr_chunk) for surr_chunk in surr_chunks]
+    tau21_noise = np.concatenate(tau21_noise, axis=2)
+
+    with np.errstate(invalid='ignore'):
+        p = np.sum(np.abs(tau21_noise) >= np.abs(res['tau21'])[:, :, np.newaxis], axis=2) / nsim
+    diag = np.arange(ns)
+    p[diag, diag] = np.nan
+
+    res['p'] = p
+    res['signif'] = p < alpha
+
+    return res
+
+def granger_batch(y1, y2, maxlag=1, addconst=True):
+    '''Granger causality F tests for many pairs of series and all lags at once
+
+    Vectorized counterpart of the 'ssr_ftest' of pyleoclim.utils.causality.granger_causality.
+    The lagged values of the series are gathered once with a strided view. For each requested lag, the unrestricted
+    design matrices of all pairs, ordered as [constant, lags of y1, lags of y2], are factorized with a single
+    batched QR decomposition; as the restricted design is made of their leading columns, the same factorization
+    yields the sums of squared residuals of both regressions.
+    As in statsmodels, the test at lag L uses the observations from index L onwards.
+
+    Parameters
+    ----------
+
+    y1, y2 : array
+        vectors or 2D arrays (Row: time sample. Column: series) of (real) numbers with identical shapes, no NaNs allowed.
+        The columns of y1 and y2 are paired.
+
+    maxlag : int or int iterable
+        If an integer, computes the tests for all lags up to maxlag. If an iterable, computes the tests only for the lags in maxlag.
+
+    addconst : bool, optional
+        Include a constant in the model.
+
+    Returns
+    -------
+
+    res : dict
+
+        A dictionary including:
+
+            - lags : array
+                the lags of the tests
+            - F : array
+                the F statistics, of shape (number of lags,) or (number of lags, number of pairs)
+            - p : array
+                the p-values, of the same shape as F
+
+    Notes
+    -----
+
+    The null hypothesis is that y2 does NOT Granger cause y1.
+
+    See also
+    --------
+
+    pyleoclim.utils.causality.granger_causality : Granger causality tests
+
+    '''
+    y1 = np.array(y1, dtype=float)
+    y2 = np.array(y2, dtype=float)
+    if np.shape(y1) != np.shape(y2):
+        raise ValueError('Timeseries must be of same length')
+
+    squeeze = y1.ndim == 1
+    if squeeze:
+        y1 = y1[:, np.newaxis]
+        y2 = y2[:, np.newaxis]
+    n, npair = np.shape(y1)
+
+    if np.ndim(maxlag) == 0:
+        lags = np.arange(1, int(maxlag)+1)
+    else:
+        lags = np.array(maxlag, dtype=int)
+    maxlag = int(np.max(lags))
+
+    def lagged(Y):
+        # lagged(Y)[t, :, l-1] = Y[t-l], undefined (NaN) for t < l
+        pad = np.full((maxlag, npair), np.nan)
+        W = sliding_window_view(np.concatenate([pad, Y]), maxlag+1, axis=0)
+        return W[:, :, maxlag-1::-1]
+
+    lag1, lag2 = lagged(y1), lagged(y2)
+    nconst = 1 if addconst else 0
+
+    F = np.zeros((np.size(lags), npair))
+    p = np.zeros((np.size(lags), npair))
+    for k, L in enumerate(lags):
+        nobs = n - L
+        cols = [np.ones((nobs, npair, nconst)), lag1[L:, :, :L], lag2[L:, :, :L]]
+        X = np.transpose(np.concatenate(cols, axis=2), (1, 0, 2))  # (pair, obs, regressor)
+        y = y1[L:].T
+
+        Q, _ = np.linalg.qr(X)
+        proj = np.einsum('pnk,pn->pk', Q, y)
+        kr = nconst + L
+        ssr_u = np.sum((y - np.einsum('pnk,pk->pn', Q, proj))**2, axis=1)
+        ssr_r = ssr_u + np.sum(proj[:, kr:]**2, axis=1)
+
+        df_u = nobs - 2*L - nconst
+        F[k] = (ssr_r - ssr_u) / L / (ssr_u / df_u)
+        p[k] = fdist.sf(F[k], L, df_u)
+
+    if squeeze:
+        F, p = F[:, 0], p[:, 0]
+
+    res = {
+        'lags': lags,
+        'F': F,
+        'p': p,
+    }
+
+    return res
+
+def granger_causality_matrix(Y, maxlag=1, addconst=True, alpha=0.05):
+    '''Granger causality tests between all ordered pairs of columns of an array
+
+    The F test on the sum of squared residuals (ssr_ftest) is carried out for all the ordered pairs at once,
+    with pyleoclim.utils.causality.granger_batch, at the single lag `maxlag`: the model includes the lags 1 to maxlag
+    of both series, and the tests at smaller lags are not computed.
+
+    Parameters
+    ----------
+
+    Y : array
+        2D array (Row: time sample. Column: series) of (real) numbers, no NaNs allowed
+
+    maxlag : int
+        the number of lags of the test; only the test at this lag is computed and returned
+
+    addconst : bool, optional
+        Include a constant in the model.
+
+    alpha : float
+        significance level [default: 0.05]
+
+    Returns
+    -------
+
+    res : dict
+
+        A dictionary of matrices, where entry [i, j] pertains to the test that series j Granger-causes series i
+        (NaN on the diagonal), including:
+
+            - F : array
+                the F statistic
+            - p : array
+                the p-value
+            - signif : array
+                true where p < alpha
+
+    See also
+    --------
+
+    pyleoclim.utils.causality.granger_causality : Granger causality tests
+
+    pyleoclim.utils.causality.granger_batch : Granger causality F tests for many pairs of series and all lags at once
+
+    '''
+    Y = np.array(Y, dtype=float)
+    ns = np.shape(Y)[1]
+    i, j = np.nonzero(~np.eye(ns, dtype=bool))
+
+    tests = granger_batch(Y[:, i], Y[:, j], maxlag=[maxlag], addconst=addconst)
+
+    F = np.full((ns, ns), np.nan)
+    p = np.full((ns, ns), np.nan)
+    F[i, j] = tests['F'][0]
+    p[i, j] = tests['p'][0]
+
+    res = {
+        'F': F,
+        'p': p,
+        'signif': p < alpha,
+    }
+
+    return res
+
 def signif_isopersist(y1, y2, method,
-                      nsim=1000, qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995],
+                      nsim=1000, qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995], seed=None,
                       **kwargs):
     ''' significance test with AR(1) with same persistence
 
@@ -400,6 +875,9 @@ def signif_isopersist(y1, y2, method,
     qs : list
         the quantiles for significance test
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of y1 and y2 use independent streams spawned from it
+
     Returns
     -------
 
@@ -425,19 +903,15 @@ def signif_isopersist(y1, y2, method,
     sig1 = np.std(y1)
     sig2 = np.std(y2)
     n = np.size(y1)
-    noise1 = sm_ar1_sim(n, nsim, g1, sig1)
-    noise2 = sm_ar1_sim(n, nsim, g2, sig2)
+    rng1, rng2 = spawn_rngs(seed, 2)
+    noise1 = sm_ar1_sim(n, nsim, g1, sig1, seed=rng1)
+    noise2 = sm_ar1_sim(n, nsim, g2, sig2, seed=rng2)
 
     if method == 'liang':
         npt = kwargs['npt'] if 'npt' in kwargs else 1
-        T21_noise = []
-        tau21_noise = []
-        for i in tqdm(range(nsim), desc='Calculating causality between surrogates'):
-            res_noise = liang(noise1[:, i], noise2[:, i], npt=npt)
-            tau21_noise.append(res_noise['tau21'])
-            T21_noise.append(res_noise['T21'])
-        tau21_noise = np.array(tau21_noise)
-        T21_noise = np.array(T21_noise)
+        res_noise = liang_batch(noise1, noise2, npt=npt)
+        tau21_noise = res_noise['tau21']
+        T21_noise = res_noise['T21']
         tau21_noise_qs = mquantiles(tau21_noise, qs)
         T21_noise_qs = mquantiles(T21_noise, qs)
 
@@ -452,7 +926,7 @@ def signif_isopersist(y1, y2, method,
     return res_dict
 
 def signif_isospec(y1, y2, method,
-                   nsim=1000, qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995],
+                   nsim=1000, qs=[0.005, 0.025, 0.05, 0.95, 0.975, 0.995], seed=None,
                    **kwargs):
     ''' significance test with surrogates with randomized phases
 
@@ -467,6 +941,8 @@ def signif_isospec(y1, y2, method,
         the number of surrogates for significance test
     qs : list
         the quantiles for significance test
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of y1 and y2 use independent streams spawned from it
     kwargs : dict
         keyword arguments for the causality method (e.g. npt for Liang-Kleeman)
 
@@ -491,19 +967,15 @@ def signif_isospec(y1, y2, method,
     
     '''
     
-    noise1 = phaseran(y1, nsim)
-    noise2 = phaseran(y2, nsim)
+    rng1, rng2 = spawn_rngs(seed, 2)
+    noise1 = phaseran(y1, nsim, seed=rng1)
+    noise2 = phaseran(y2, nsim, seed=rng2)
 
     if method == 'liang':
         npt = kwargs['npt'] if 'npt' in kwargs else 1
-        T21_noise = []
-        tau21_noise = []
-        for i in tqdm(range(nsim), desc='Calculating causality between surrogates'):
-            res_noise = liang(noise1[:, i], noise2[:, i], npt=npt)
-            tau21_noise.append(res_noise['tau21'])
-            T21_noise.append(res_noise['T21'])
-        tau21_noise = np.array(tau21_noise)
-        T21_noise = np.array(T21_noise)
+        res_noise = liang_batch(noise1, noise2, npt=npt)
+        tau21_noise = res_noise['tau21']
+        T21_noise = res_noise['T21']
         tau21_noise_qs = mquantiles(tau21_noise, qs)
         T21_noise_qs = mquantiles(T21_noise, qs)
 
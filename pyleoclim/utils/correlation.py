@@ -6,20 +6,28 @@
 
 __all__ = [
     'corr_sig',
+    'corr_matrix_sig',
+    'corr_ens_sig',
+    'lagged_corr',
+    'lagged_corr_sig',
+    'running_corr',
+    'running_corr_sig',
     'fdr',
 ]
 
 import numpy as np
+import numba as nb
 from scipy.stats import pearsonr
 from scipy.stats.mstats import gmean
 from scipy.stats import t as stu
 from scipy.stats import gaussian_kde
-import statsmodels.api as sm
+from scipy.fft import rfft, irfft, next_fast_len
 from sklearn import preprocessing
-from .tsmodel import ar1_fit_evenly
+from .tsmodel import ar1_fit_evenly, ar1_fit_evenly_batch, ar1_sim_evenly
+from .mcutils import mc_adaptive_pvalue, spawn_rngs
 
 
-def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
+def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05, mc_kwargs=None, seed=None, pval_method='kde'):
     """ Estimates the Pearson's correlation and associated significance between two non IID time series
     
     The significance of the correlation is assessed using one of the following methods:
@@ -35,6 +43,7 @@ def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
         
     For 2 and 3, computational requirements scale with nsim.
     When possible, nsim should be at least 1000. 
+    Alternatively, nsim='auto' draws simulations in batches until the p-value is settled.
 
     Parameters
     ----------
@@ -45,8 +54,10 @@ def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
     y2 : array
         vector of (real) numbers of same length as y1, no NaNs allowed
         
-    nsim : int
+    nsim : int or 'auto'
         the number of simulations [default: 1000]
+        If 'auto', simulations are drawn in batches until the confidence interval of the p-value
+        is narrower than the tolerance, or lies on one side of alpha (see `mc_kwargs`).
         
     method : str; {'ttest','isopersistent','isospectral' (default)}
         method for significance testing
@@ -54,6 +65,19 @@ def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
     alpha : float
         significance level for critical value estimation [default: 0.05]
 
+    mc_kwargs : dict
+        settings of the adaptive Monte Carlo procedure used when nsim is 'auto':
+        'batch_size' (default: 50), 'min_number' (default: 100), 'max_number' (default: 2000),
+        'tol', the tolerance on the half-width of the confidence interval of the p-value (default: 0.02)
+        and 'level', the confidence level of that interval (default: 0.95)
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator for the 'isopersistent' and 'isospectral' methods [default: None]
+
+    pval_method : str; {'kde' (default), 'empirical'}
+        how the p-value of the 'isopersistent' method is computed from the simulated correlations,
+        see pyleoclim.utils.correlation.corr_isopersist
+
     Returns
     -------
     res : dict 
@@ -66,6 +90,8 @@ def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
         - signif : bool
             true if significant; false otherwise
             Note that signif = True if and only if p <= alpha.
+        - signif_diagnostics : dict
+            the convergence diagnostics of the simulations, only if nsim is 'auto'
          
     See also
     --------
@@ -81,17 +107,562 @@ def corr_sig(y1, y2, nsim=1000, method='isospectral', alpha=0.05):
 
     assert np.size(y1) == np.size(y2), 'The size of X and the size of Y should be the same!'
 
+    diagnostics = None
     if method == 'ttest':
         (r, signif, p) = corr_ttest(y1, y2, alpha=alpha)
     elif method == 'isopersistent':
-        (r, signif, p) = corr_isopersist(y1, y2, alpha=alpha, nsim=nsim)
+        if nsim == 'auto':
+            (r, signif, p, diagnostics) = corr_isopersist(y1, y2, alpha=alpha, nsim=nsim, mc_kwargs=mc_kwargs, seed=seed, pval_method=pval_method)
+        else:
+            (r, signif, p) = corr_isopersist(y1, y2, alpha=alpha, nsim=nsim, seed=seed, pval_method=pval_method)
     elif method == 'isospectral':
-        (r, signif, p) = corr_isospec(y1, y2, alpha=alpha, nsim=nsim)
+        if nsim == 'auto':
+            (r, signif, p, diagnostics) = corr_isospec(y1, y2, alpha=alpha, nsim=nsim, mc_kwargs=mc_kwargs, seed=seed)
+        else:
+            (r, signif, p) = corr_isospec(y1, y2, alpha=alpha, nsim=nsim, seed=seed)
 
     res={'r':r,'signif':signif,'p':p}    
+    if diagnostics is not None:
+        res['signif_diagnostics'] = diagnostics
     
     return res
 
+def corr_matrix_sig(Y, nsim=1000, method='isospectral', alpha=0.05, seed=None, chunk=100):
+    """ Estimates the Pearson's correlation and associated significance between all pairs of columns of an array
+
+    Each column is simulated only once, with phase-randomized ('isospectral') or AR(1) ('isopersistent') surrogates,
+    and the null distributions of all pairs are obtained from these shared surrogates by matrix products.
+    The cost of the simulations therefore scales with the number of columns, not with the number of pairs.
+    The surrogates are generated and compared by chunks, so that the memory footprint is bounded by
+    the number of columns times the length of the series times chunk.
+
+    Parameters
+    ----------
+
+    Y : array
+        2D array of (real) numbers, Row: time sample. Column: series. No NaNs allowed.
+
+    nsim : int
+        the number of simulations [default: 1000]
+
+    method : str; {'isopersistent','isospectral' (default)}
+        method for significance testing
+
+    alpha : float
+        significance level [default: 0.05]
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of each column are drawn from an independent stream spawned from it,
+        all the surrogates of a column from the same stream [default: None]
+
+    chunk : int
+        the number of surrogates of each column processed at once [default: 100].
+        With the 'isospectral' method, the results do not depend on it.
+
+    Returns
+    -------
+    res : dict
+        the result dictionary, containing
+
+        - r : array
+            matrix of correlation coefficients
+        - p : array
+            matrix of p-values, the fraction of simulated |r| at least as large as the observed one
+        - signif : array
+            true where significant; false otherwise
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.corr_sig : Estimates the Pearson's correlation and associated significance between two non IID time series
+    pyleoclim.utils.correlation.fdr : Determine significance based on the false discovery rate
+
+    """
+    Y = np.array(Y, dtype=float)
+    n, ns = np.shape(Y)
+
+    def unit_columns(X):
+        X = X - np.mean(X, axis=0)
+        return X / np.sqrt(np.sum(X**2, axis=0))
+
+    Z = unit_columns(Y)
+    r = Z.T @ Z
+
+    if method == 'isopersistent':
+        g = ar1_fit_evenly_batch([Y[:, j] for j in range(ns)])
+        sig = np.std(Y, axis=0, ddof=1)
+    elif method != 'isospectral':
+        raise ValueError(f'Unknown method: {method}. Available methods are "isospectral" and "isopersistent"')
+
+    rngs = spawn_rngs(seed, ns)
+    count = np.zeros((ns, ns))
+    for start in range(0, nsim, max(int(chunk), 1)):
+        m = min(int(chunk), nsim-start)
+
+        # the next m surrogates of each series, with unit-norm columns, stacked as (ns, nt, m)
+        surr = []
+        for j in range(ns):
+            if method == 'isospectral':
+                Ysurr = phaseran(Y[:, j], m, seed=rngs[j])
+            else:
+                Ysurr = sm_ar1_sim(n, m, g[j], sig[j], seed=rngs[j])
+            surr.append(unit_columns(Ysurr))
+        surr = np.stack(surr)
+
+        # the k-th simulated correlation of each pair pairs the k-th surrogates of the two series
+        for i in range(ns):
+            r_sim = np.einsum('tk,jtk->jk', surr[i], surr)
+            count[i] += np.sum(np.abs(r_sim) >= np.abs(r[i])[:, np.newaxis], axis=1)
+
+    p = count / nsim
+    np.fill_diagonal(p, 0)
+
+    signif = p < alpha
+
+    res = {'r': r, 'p': p, 'signif': signif}
+
+    return res
+
+def corr_ens_sig(Y, y, nsim=1000, method='isospectral', alpha=0.05, seed=None, pval_method='kde'):
+    """ Estimates the Pearson's correlation and associated significance between each column of an array and a target series
+
+    The null distributions are those of pyleoclim.utils.correlation.corr_sig applied to each column and the target
+    with the same seed: both series are replaced by phase-randomized ('isospectral') or AR(1) ('isopersistent') surrogates.
+    With a common seed, the surrogates of all the columns share their random phases, or their random innovations,
+    which allows computing them for all the columns at once:
+
+    - 'isospectral': by Parseval's theorem, the correlations of the surrogates of all the columns with those of the target
+      are obtained from the Fourier transforms of the series with a single matrix product, without forming the surrogates.
+    - 'isopersistent': the AR(1) parameters of all the series are fitted at once
+      (see pyleoclim.utils.tsmodel.ar1_fit_evenly_batch) and the AR(1) recursion is run for all the columns
+      and all the simulations together, accumulating the correlations with the surrogates of the target on the fly.
+
+    The memory footprint scales with the number of columns times nsim, not with the length of the series.
+
+    Parameters
+    ----------
+
+    Y : array
+        2D array of (real) numbers, Row: time sample. Column: series (e.g. ensemble members). No NaNs allowed.
+
+    y : array
+        the target, a vector of (real) numbers with as many elements as Y has rows. No NaNs allowed.
+
+    nsim : int
+        the number of simulations [default: 1000]
+
+    method : str; {'isopersistent','isospectral' (default)}
+        method for significance testing
+
+    alpha : float
+        significance level [default: 0.05]
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
+
+    pval_method : str; {'kde' (default), 'empirical'}
+        how the p-values of the 'isopersistent' method are computed from the simulated correlations,
+        see pyleoclim.utils.correlation.corr_isopersist
+
+    Returns
+    -------
+    res : dict
+        the result dictionary, containing
+
+        - r : array
+            correlation coefficients of the columns with the target
+        - p : array
+            p-values, computed as in pyleoclim.utils.correlation.corr_isospec or pyleoclim.utils.correlation.corr_isopersist
+        - signif : array
+            true where significant; false otherwise
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.corr_sig : Estimates the Pearson's correlation and associated significance between two non IID time series
+    pyleoclim.utils.correlation.corr_matrix_sig : Estimates the Pearson's correlation and associated significance between all pairs of columns of an array
+
+    """
+    Y = np.array(Y, dtype=float)
+    y = np.array(y, dtype=float)
+    n = np.size(y)
+
+    def unit_columns(X):
+        X = X - np.mean(X, axis=0)
+        return X / np.sqrt(np.sum(X**2, axis=0))
+
+    r = unit_columns(Y).T @ unit_columns(y[:, np.newaxis])[:, 0]
+
+    # same streams as corr_sig(Y[:, j], y, seed=seed): the first for the column, the second for the target
+    rng1, rng2 = spawn_rngs(seed, 2)
+    ns = np.shape(Y)[1]
+
+    if method == 'isospectral':
+        # phaseran drops the last sample of series of even length
+        nt = n if n % 2 == 1 else n-1
+        nf = (nt-1) // 2
+        Yc = Y[:nt] - np.mean(Y[:nt], axis=0)
+        yc = y[:nt] - np.mean(y[:nt])
+
+        # the random phases phaseran draws for each column and for the target
+        ph = rng1.random((nsim, nf)) - rng2.random((nsim, nf))
+
+        # sum over time of the products of the surrogates, from the positive frequencies (the means are zero)
+        cross = (np.fft.rfft(Yc, axis=0)[1:] * np.conj(np.fft.rfft(yc)[1:, np.newaxis])).T
+        r_sim = 2/nt * np.real(cross @ np.exp(2*np.pi*1j*ph).T)
+        # phase randomization preserves the norm of the series
+        r_sim /= np.sqrt(np.sum(Yc**2, axis=0))[:, np.newaxis] * np.sqrt(np.sum(yc**2))
+
+        p = np.sum(np.abs(r_sim) >= np.abs(r)[:, np.newaxis], axis=1) / nsim
+        signif = p < alpha
+    elif method == 'isopersistent':
+        g = ar1_fit_evenly_batch([Y[:, j] for j in range(ns)] + [y])
+        ysurr = unit_columns(sm_ar1_sim(n, nsim, g[-1], np.std(y, ddof=1), seed=rng2))
+
+        # the innovations sm_ar1_sim draws for each column; the correlations do not depend on their scale
+        burnin = 50
+        eta = rng1.standard_normal(size=(n+burnin, nsim))
+        rsa = np.abs(_ar1_corr(g[:-1], eta, ysurr, burnin))
+
+        ra = np.abs(r)
+        p = isopersist_pval(rsa, ra, pval_method=pval_method)
+        signif = ra >= np.percentile(rsa, 100*(1-alpha), axis=1)
+    else:
+        raise ValueError(f'Unknown method: {method}. Available methods are "isospectral" and "isopersistent"')
+
+    res = {'r': r, 'p': p, 'signif': signif}
+
+    return res
+
+@nb.jit(nopython=True, parallel=True, cache=True)
+def _ar1_corr(g, eta, u, burnin):
+    ''' Correlations of AR(1) series driven by the innovations eta with the unit-norm, centered columns of u
+
+    Entry [j, k] pairs the series of lag-1 autocorrelation g[j] driven by eta[:, k], after dropping its first
+    burnin values, with u[:, k]. The series are never stored: their sums are accumulated during the recursion.
+    '''
+    ns = g.shape[0]
+    n, nsim = u.shape
+    r = np.zeros((ns, nsim))
+    for j in nb.prange(ns):
+        x = np.zeros(nsim)
+        sx = np.zeros(nsim)
+        sxx = np.zeros(nsim)
+        sxy = np.zeros(nsim)
+        for i in range(n+burnin):
+            for k in range(nsim):
+                x[k] = g[j]*x[k] + eta[i, k]
+                if i >= burnin:
+                    sx[k] += x[k]
+                    sxx[k] += x[k]*x[k]
+                    sxy[k] += x[k]*u[i-burnin, k]
+        for k in range(nsim):
+            r[j, k] = sxy[k] / np.sqrt(sxx[k] - sx[k]*sx[k]/n)
+
+    return r
+
+def lagged_corr(y1, y2, max_lag):
+    """ Pearson's cross-correlation function of two evenly-spaced series, computed via FFT
+
+    The correlation at lag k is that of y1[t+k] with y2[t]: at positive lags, y1 lags y2.
+    The series are standardized, and the products are normalized by the length of the series
+    (the usual biased estimator of the cross-correlation function).
+
+    Parameters
+    ----------
+
+    y1 : array
+        vector or 2D array (Row: time sample. Column: series) of (real) numbers, no NaNs allowed
+
+    y2 : array
+        vector or 2D array of (real) numbers with the same number of rows as y1, no NaNs allowed.
+        If both y1 and y2 are 2D arrays, their columns are paired.
+
+    max_lag : int
+        the maximum lag, in number of samples
+
+    Returns
+    -------
+
+    lags : array
+        the lags, from -max_lag to max_lag
+
+    r : array
+        the correlation at each lag, along the first axis
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.lagged_corr_sig : Cross-correlation function and its significance
+
+    """
+    y1 = np.array(y1, dtype=float)
+    y2 = np.array(y2, dtype=float)
+    n = np.shape(y1)[0]
+    max_lag = int(min(max_lag, n-1))
+
+    z1 = (y1 - np.mean(y1, axis=0)) / np.std(y1, axis=0)
+    z2 = (y2 - np.mean(y2, axis=0)) / np.std(y2, axis=0)
+    if z1.ndim == 1 and z2.ndim > 1:
+        z1 = z1[:, np.newaxis]
+    if z2.ndim == 1 and z1.ndim > 1:
+        z2 = z2[:, np.newaxis]
+
+    nfft = next_fast_len(2*n-1)
+    cc = irfft(rfft(z1, nfft, axis=0) * np.conj(rfft(z2, nfft, axis=0)), nfft, axis=0) / n
+
+    lags = np.arange(-max_lag, max_lag+1)
+    r = cc[lags % nfft]
+
+    return lags, r
+
+def lagged_corr_sig(y1, y2, max_lag, nsim=1000, method='isospectral', alpha=0.05, seed=None):
+    """ Pearson's cross-correlation function of two evenly-spaced series, and its significance at each lag
+
+    The cross-correlation function is computed via FFT (see pyleoclim.utils.correlation.lagged_corr).
+    A single set of surrogates of y2 is drawn, and the cross-correlation functions of y1 with all of them
+    are computed with one batched FFT, so that the same null simulations are used at every lag.
+
+    Parameters
+    ----------
+
+    y1 : array
+        vector of (real) numbers of same length as y2, no NaNs allowed
+
+    y2 : array
+        vector of (real) numbers of same length as y1, no NaNs allowed
+
+    max_lag : int
+        the maximum lag, in number of samples
+
+    nsim : int
+        the number of simulations [default: 1000]
+
+    method : str; {'isopersistent','isospectral' (default)}
+        method for generating the surrogates of y2
+
+    alpha : float
+        significance level [default: 0.05]
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
+
+    Returns
+    -------
+    res : dict
+        the result dictionary, containing
+
+        - lags : array
+            the lags, from -max_lag to max_lag; at positive lags, y1 lags y2
+        - r : array
+            the correlation at each lag
+        - p : array
+            the p-value at each lag, the fraction of simulated |r| at least as large as the observed one
+        - signif : array
+            true where significant; false otherwise
+        - r_null : array
+            the alpha/2 and 1-alpha/2 quantiles of the simulated correlations at each lag, of shape (2, number of lags)
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.lagged_corr : Pearson's cross-correlation function of two evenly-spaced series, computed via FFT
+    pyleoclim.utils.correlation.fdr : Determine significance based on the false discovery rate
+
+    """
+    if isinstance(nsim, str):
+        raise ValueError(f'nsim should be a number of simulations; got {nsim!r}. The adaptive nsim="auto" is not available for lagged correlations')
+
+    y1 = np.array(y1, dtype=float)
+    y2 = np.array(y2, dtype=float)
+    n = np.size(y2)
+    max_lag = int(min(max_lag, n-2))  # also valid for the surrogates, possibly one sample shorter
+
+    lags, r = lagged_corr(y1, y2, max_lag)
+
+    if method == 'isospectral':
+        y2surr = phaseran(y2, nsim, seed=seed)
+    elif method == 'isopersistent':
+        y2surr = sm_ar1_sim(n, nsim, ar1_fit_evenly(y2), np.std(y2, ddof=1), seed=seed)
+    else:
+        raise ValueError(f'Unknown method: {method}. Available methods are "isospectral" and "isopersistent"')
+
+    # phaseran drops the last sample of series of even length; the observed r uses the full series,
+    # and max_lag is capped above so that the surrogates cover every lag
+    nt = np.shape(y2surr)[0]
+    _, r_sim = lagged_corr(y1[:nt], y2surr, max_lag)
+
+    p = np.sum(np.abs(r_sim) >= np.abs(r)[:, np.newaxis], axis=1) / nsim
+    signif = p < alpha
+    r_null = np.quantile(r_sim, [alpha/2, 1-alpha/2], axis=1)
+
+    res = {'lags': lags, 'r': r, 'p': p, 'signif': signif, 'r_null': r_null}
+
+    return res
+
+def running_corr(y1, y2, window, step=1):
+    """ Pearson's correlation of two evenly-spaced series over sliding windows, computed from cumulative sums
+
+    The sums of y1, y2, y1**2, y2**2 and y1*y2 over every window are differences of cumulative sums,
+    so the cost is O(N) whatever the width of the window.
+
+    Parameters
+    ----------
+
+    y1 : array
+        vector or 2D array (Row: time sample. Column: series) of (real) numbers, no NaNs allowed
+
+    y2 : array
+        vector or 2D array of (real) numbers with the same number of rows as y1, no NaNs allowed.
+        If both y1 and y2 are 2D arrays, their columns are paired.
+
+    window : int
+        the width of the windows, in number of samples
+
+    step : int
+        the spacing between the starts of consecutive windows, in number of samples [default: 1]
+
+    Returns
+    -------
+
+    idx : array
+        the (fractional) index of the center of each window
+
+    r : array
+        the correlation in each window, along the first axis
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.running_corr_sig : Running correlation and its null distribution
+
+    """
+    y1 = np.array(y1, dtype=float)
+    y2 = np.array(y2, dtype=float)
+    if y1.ndim == 1 and y2.ndim > 1:
+        y1 = y1[:, np.newaxis]
+    if y2.ndim == 1 and y1.ndim > 1:
+        y2 = y2[:, np.newaxis]
+
+    n = np.shape(y1)[0]
+    window = int(window)
+    if window < 3 or window > n:
+        raise ValueError(f'The window should contain between 3 and {n} samples; got {window}')
+
+    # remove the global means to limit cancellation errors in the sums
+    y1 = y1 - np.mean(y1, axis=0)
+    y2 = y2 - np.mean(y2, axis=0)
+
+    start = np.arange(0, n-window+1, int(step))
+
+    def window_sums(v):
+        c = np.concatenate([np.zeros((1,) + np.shape(v)[1:]), np.cumsum(v, axis=0)])
+        return c[start+window] - c[start]
+
+    s1, s2 = window_sums(y1), window_sums(y2)
+    s11, s22, s12 = window_sums(y1**2), window_sums(y2**2), window_sums(y1*y2)
+
+    cov = s12 - s1*s2/window
+    var1 = np.fmax(s11 - s1**2/window, 0)
+    var2 = np.fmax(s22 - s2**2/window, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = cov / np.sqrt(var1*var2)
+
+    idx = start + (window-1)/2
+
+    return idx, r
+
+def running_corr_sig(y1, y2, window, step=1, nsim=1000, method='isospectral', alpha=0.05, seed=None):
+    """ Pearson's correlation of two evenly-spaced series over sliding windows, and its null distribution
+
+    The running correlation is computed from cumulative sums (see pyleoclim.utils.correlation.running_corr).
+    A single set of surrogates of y2 is drawn over the whole series, and the running correlations of y1 with all of them
+    are computed at once, which yields the band of correlations expected by chance in each window.
+
+    Parameters
+    ----------
+
+    y1 : array
+        vector of (real) numbers of same length as y2, no NaNs allowed
+
+    y2 : array
+        vector of (real) numbers of same length as y1, no NaNs allowed
+
+    window : int
+        the width of the windows, in number of samples
+
+    step : int
+        the spacing between the starts of consecutive windows, in number of samples [default: 1]
+
+    nsim : int
+        the number of simulations [default: 1000]
+
+    method : str; {'isopersistent','isospectral' (default)}
+        method for generating the surrogates of y2
+
+    alpha : float
+        significance level [default: 0.05]
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
+
+    Returns
+    -------
+    res : dict
+        the result dictionary, containing
+
+        - idx : array
+            the (fractional) index of the center of each window
+        - r : array
+            the correlation in each window
+        - p : array
+            the p-value in each window, the fraction of simulated |r| at least as large as the observed one
+        - signif : array
+            true where significant; false otherwise
+        - r_null : array
+            the alpha/2 and 1-alpha/2 quantiles of the simulated correlations in each window, of shape (2, number of windows)
+
+    See also
+    --------
+
+    pyleoclim.utils.correlation.running_corr : Pearson's correlation of two evenly-spaced series over sliding windows
+
+    """
+    if isinstance(nsim, str):
+        raise ValueError(f'nsim should be a number of simulations; got {nsim!r}. The adaptive nsim="auto" is not available for running correlations')
+
+    y1 = np.array(y1, dtype=float)
+    y2 = np.array(y2, dtype=float)
+    n = np.size(y2)
+
+    idx, r = running_corr(y1, y2, window, step=step)
+
+    if method == 'isospectral':
+        if n % 2 == 0:
+            # phaseran drops the last sample of series of even length: the surrogates of y2[1:], drawn with
+            # the same random phases, cover the last window when the surrogates of y2[:-1] do not
+            y2surr, y2surr_last = np.moveaxis(phaseran(np.column_stack([y2[:-1], y2[1:]]), nsim, seed=seed), 1, 0)
+        else:
+            y2surr = phaseran(y2, nsim, seed=seed)
+    elif method == 'isopersistent':
+        y2surr = sm_ar1_sim(n, nsim, ar1_fit_evenly(y2), np.std(y2, ddof=1), seed=seed)
+    else:
+        raise ValueError(f'Unknown method: {method}. Available methods are "isospectral" and "isopersistent"')
+
+    nt = np.shape(y2surr)[0]
+    _, r_sim = running_corr(y1[:nt], y2surr, window, step=step)
+    if np.shape(r_sim)[0] < np.size(r):
+        _, r_last = running_corr(y1[-window:], y2surr_last[-window:], window)
+        r_sim = np.concatenate([r_sim, r_last])
+
+    p = np.sum(np.abs(r_sim) >= np.abs(r)[:, np.newaxis], axis=1) / nsim
+    signif = p < alpha
+    r_null = np.quantile(r_sim, [alpha/2, 1-alpha/2], axis=1)
+
+    res = {'idx': idx, 'r': r, 'p': p, 'signif': signif, 'r_null': r_null}
+
+    return res
+
 def fdr(pvals, qlevel=0.05, method='original', adj_method=None, adj_args={}):
     ''' Determine significance based on the false discovery rate
     
@@ -239,7 +810,7 @@ def corr_ttest(y1, y2, alpha=0.05):
 
     return r, signif, pval
 
-def corr_isopersist(y1, y2, alpha=0.05, nsim=1000):
+def corr_isopersist(y1, y2, alpha=0.05, nsim=1000, mc_kwargs=None, seed=None, pval_method='kde'):
     ''' Computes the Pearson's correlation between two timeseries, and their significance using Ar(1) modeling.
     
     The significance is gauged via a non-parametric (Monte Carlo) simulation of
@@ -258,8 +829,21 @@ def corr_isopersist(y1, y2, alpha=0.05, nsim=1000):
     alpha : float
         significance level for critical value estimation [default: 0.05]
         
-    nsim : int
+    nsim : int or 'auto'
         number of simulations [default: 1000]
+        If 'auto', simulations are drawn in batches until the p-value is settled.
+
+    mc_kwargs : dict
+        settings of the adaptive Monte Carlo procedure used when nsim is 'auto',
+        see pyleoclim.utils.mcutils.mc_adaptive_pvalue
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of y1 and y2 are drawn from two independent streams spawned from it,
+        all the surrogates of a series from the same stream [default: None]
+
+    pval_method : str; {'kde' (default), 'empirical'}
+        'kde' integrates a Gaussian kernel density estimate of the simulated |r| above the observed one;
+        'empirical' is the fraction of simulated |r| at least as large as the observed one
 
     Returns
     -------
@@ -273,6 +857,9 @@ def corr_isopersist(y1, y2, alpha=0.05, nsim=1000):
     pval : float
         test p-value (the probability of the test statstic exceeding the observed one by chance alone)
 
+    diagnostics : dict
+        the convergence diagnostics of the simulations, only returned if nsim is 'auto'
+
     Notes
     -----
 
@@ -296,31 +883,114 @@ def corr_isopersist(y1, y2, alpha=0.05, nsim=1000):
     r = pearsonr(y1, y2)[0]
     ra = np.abs(r)
 
-    y1_red, g1 = isopersistent_rn(y1, nsim)
-    y2_red, g2 = isopersistent_rn(y2, nsim)
+    rng1, rng2 = spawn_rngs(seed, 2)
 
-    rs = np.zeros(nsim)
-    for i in np.arange(nsim):
-        rs[i] = pearsonr(y1_red[:, i], y2_red[:, i])[0]
+    # fit the AR(1) models once, rather than for every batch of surrogates
+    g1, g2 = ar1_fit_evenly(y1), ar1_fit_evenly(y2)
+    sig1, sig2 = np.std(y1, ddof=1), np.std(y2, ddof=1)
 
-    rsa = np.abs(rs)
+    def draw(n):
+        y1_red = sm_ar1_sim(np.size(y1), n, g1, sig1, seed=rng1)
+        y2_red = sm_ar1_sim(np.size(y2), n, g2, sig2, seed=rng2)
 
-    xi = np.linspace(0, 1.1*np.max([ra, np.max(rsa)]), 200)
-    kde = gaussian_kde(rsa)
-    prob = kde(xi).T
+        return colwise_corr(y1_red, y2_red)
 
-    diff = np.abs(ra - xi)
-    #  min_diff = np.min(diff)
-    pos = np.argmin(diff)
+    if nsim == 'auto':
+        rs, diagnostics = mc_adaptive_pvalue(draw, lambda rs: np.abs(rs) >= ra, alpha=alpha, mc_kwargs=mc_kwargs)
+    else:
+        rs = draw(nsim)
 
-    pval = np.trapz(prob[pos:], xi[pos:])
+    rsa = np.abs(rs)
+
+    pval = isopersist_pval(rsa, ra, pval_method=pval_method)
 
     rcrit = np.percentile(rsa, 100*(1-alpha))
     signif = ra >= rcrit
 
+    if nsim == 'auto':
+        return r, signif, pval, diagnostics
+
     return r, signif, pval
 
-def isopersistent_rn(X, p):
+def isopersist_pval(rsa, ra, pval_method='kde'):
+    ''' p-value of an observed |r| given simulated ones, as used by the 'isopersistent' method
+
+    Parameters
+    ----------
+
+    rsa : numpy array
+        the simulated |r|; a 2D array holds those of several tests, one per row
+
+    ra : float or numpy array
+        the observed |r|, one per row of rsa
+
+    pval_method : str; {'kde' (default), 'empirical'}
+        'kde' integrates a Gaussian kernel density estimate of the simulated |r| above the observed one;
+        'empirical' is the fraction of simulated |r| at least as large as the observed one
+
+    Returns
+    -------
+
+    pval : float or numpy array
+        the p-value(s)
+
+    '''
+    scalar = np.ndim(rsa) == 1
+    rsa = np.atleast_2d(rsa)
+    ra = np.atleast_1d(ra).astype(float)
+
+    if pval_method == 'kde':
+        # same estimate as scipy.stats.gaussian_kde (Scott's rule) integrated by trapezoids on a 200-point grid,
+        # evaluated for a block of rows at a time
+        ntest, nsim = np.shape(rsa)
+        xi = np.linspace(0, 1.1*np.maximum(ra, np.max(rsa, axis=1)), 200, axis=1)
+        bw = np.std(rsa, axis=1, ddof=1) * nsim**(-1/5)
+        pos = np.argmin(np.abs(ra[:, np.newaxis] - xi), axis=1)
+        pval = np.zeros(ntest)
+        block = max(1, int(2e6 // (200*nsim)))
+        for i in range(0, ntest, block):
+            u = (xi[i:i+block, np.newaxis, :] - rsa[i:i+block, :, np.newaxis]) / bw[i:i+block, np.newaxis, np.newaxis]
+            prob = np.mean(np.exp(-u**2/2), axis=1) / (np.sqrt(2*np.pi) * bw[i:i+block, np.newaxis])
+            area = (prob[:, 1:] + prob[:, :-1]) / 2 * np.diff(xi[i:i+block], axis=1)
+            area[np.arange(199) < pos[i:i+block, np.newaxis]] = 0
+            pval[i:i+block] = np.sum(area, axis=1)
+    elif pval_method == 'empirical':
+        pval = np.sum(rsa >= ra[:, np.newaxis], axis=1) / np.shape(rsa)[1]
+    else:
+        raise ValueError(f'Unknown pval_method: {pval_method}. Available methods are "kde" and "empirical"')
+
+    return pval[0] if scalar else pval
+
+def colwise_corr(X, Y):
+    ''' Pearson's correlation between the matching columns of two arrays
+
+    The columns are standardized and correlated with a single dot product, rather than one call
+    to scipy.stats.pearsonr per pair of columns.
+
+    Parameters
+    ----------
+
+    X : numpy array
+        2D array of shape (n, p)
+
+    Y : numpy array
+        2D array of shape (n, p)
+
+    Returns
+    -------
+
+    r : numpy array
+        the p correlations between X[:, i] and Y[:, i]
+
+    '''
+    Xs = X - np.mean(X, axis=0)
+    Ys = Y - np.mean(Y, axis=0)
+    Xs = Xs / np.sqrt(np.sum(Xs**2, axis=0))
+    Ys = Ys / np.sqrt(np.sum(Ys**2, axis=0))
+
+    return np.einsum('ij,ij->j', Xs, Ys)
+
+def isopersistent_rn(X, p, seed=None):
     ''' Generates p realization of a red noise [i.e. AR(1)] process
     with same persistence properties as X (Mean and variance are also preserved).
 
@@ -331,6 +1001,8 @@ def isopersistent_rn(X, p):
         vector of (real) numbers as a time series, no NaNs allowed
     p : int
         number of simulations
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
 
     Returns
     -------
@@ -357,13 +1029,13 @@ def isopersistent_rn(X, p):
 
     g = ar1_fit_evenly(X)
     #  red = red_noise(N, M, g)
-    red = sm_ar1_sim(n, p, g, sig)
+    red = sm_ar1_sim(n, p, g, sig, seed=seed)
 
     return red, g
 
 
-def sm_ar1_sim(n, p, g, sig):
-    ''' Produce p realizations of an AR1 process of length n with lag-1 autocorrelation g using statsmodels
+def sm_ar1_sim(n, p, g, sig, seed=None):
+    ''' Produce p realizations of an AR1 process of length n with lag-1 autocorrelation g
 
     Parameters
     ----------
@@ -379,6 +1051,9 @@ def sm_ar1_sim(n, p, g, sig):
     sig : float
         the standard deviation of the original time series
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
+
     Returns
     -------
 
@@ -390,18 +1065,13 @@ def sm_ar1_sim(n, p, g, sig):
 
     pyleoclim.utils.correlation.corr_sig : Estimates the Pearson's correlation and associated significance between two non IID time series
     pyleoclim.utils.correlation.fdr : Determine significance based on the false discovery rate
+    pyleoclim.utils.tsmodel.ar1_sim_evenly : Simulate several realizations of an evenly-spaced AR(1) process at once
 
     '''
-    # specify model parameters (statsmodel wants lag0 coefficents as unity)
-    ar = np.r_[1, -g]  # AR model parameter
-    ma = np.r_[1, 0.0] # MA model parameters
     sig_n = sig*np.sqrt(1-g**2) # theoretical noise variance for red to achieve the same variance as X
 
-    red = np.empty(shape=(n, p)) # declare array
-
-    # simulate AR(1) model for each column
-    for i in np.arange(p):
-        red[:, i] = sm.tsa.arma_generate_sample(ar=ar, ma=ma, nsample=n, burnin=50, scale=sig_n)
+    # simulate AR(1) model for all columns at once
+    red = ar1_sim_evenly(n, p, g, scale=sig_n, burnin=50, seed=seed)
 
     return red
 
@@ -439,7 +1109,7 @@ def sm_ar1_sim(n, p, g, sig):
 
 #     return red
 
-def corr_isospec(y1, y2, alpha=0.05, nsim=1000):
+def corr_isospec(y1, y2, alpha=0.05, nsim=1000, mc_kwargs=None, seed=None):
     ''' Estimates the significance of the correlation using phase randomization
 
     Estimates the significance of correlations between non IID
@@ -459,8 +1129,17 @@ def corr_isospec(y1, y2, alpha=0.05, nsim=1000):
     alpha : float
         significance level for critical value estimation [default: 0.05]
         
-    nsim : int
+    nsim : int or 'auto'
         number of simulations [default: 1000]
+        If 'auto', simulations are drawn in batches until the p-value is settled.
+
+    mc_kwargs : dict
+        settings of the adaptive Monte Carlo procedure used when nsim is 'auto',
+        see pyleoclim.utils.mcutils.mc_adaptive_pvalue
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator; the surrogates of y1 and y2 are drawn from two independent streams spawned from it,
+        all the surrogates of a series from the same stream [default: None]
 
     Returns
     -------
@@ -474,6 +1153,9 @@ def corr_isospec(y1, y2, alpha=0.05, nsim=1000):
     F : float
         Fraction of time series with higher correlation coefficents than observed (approximates the p-value).
 
+    diagnostics : dict
+        the convergence diagnostics of the simulations, only returned if nsim is 'auto'
+
     See also
     --------
 
@@ -491,27 +1173,37 @@ def corr_isospec(y1, y2, alpha=0.05, nsim=1000):
     '''
     r = pearsonr(y1, y2)[0]
 
-    # generate phase-randomized samples using the Theiler & Prichard method
-    Y1surr = phaseran(y1, nsim)
-    Y2surr = phaseran(y2, nsim)
+    rng1, rng2 = spawn_rngs(seed, 2)
 
-    # compute correlations
-    Y1s = preprocessing.scale(Y1surr)
-    Y2s = preprocessing.scale(Y2surr)
+    def draw(nsurr):
+        # generate phase-randomized samples using the Theiler & Prichard method
+        Y1surr = phaseran(y1, nsurr, seed=rng1)
+        Y2surr = phaseran(y2, nsurr, seed=rng2)
 
-    n = np.size(y1)
-    C = np.dot(np.transpose(Y1s), Y2s) / (n-1)
-    rSim = np.diag(C)
+        # compute correlations
+        Y1s = preprocessing.scale(Y1surr)
+        Y2s = preprocessing.scale(Y2surr)
+
+        # phaseran drops the last sample of series of even length
+        return np.sum(Y1s*Y2s, axis=0) / np.shape(Y1s)[0]
+
+    if nsim == 'auto':
+        rSim, diagnostics = mc_adaptive_pvalue(draw, lambda rSim: np.abs(rSim) >= np.abs(r), alpha=alpha, mc_kwargs=mc_kwargs)
+    else:
+        rSim = draw(nsim)
 
     # compute fraction of values higher than observed
-    F = np.sum(np.abs(rSim) >= np.abs(r)) / nsim
+    F = np.sum(np.abs(rSim) >= np.abs(r)) / np.size(rSim)
 
     # establish significance
     signif = F < alpha  # significant or not?
 
+    if nsim == 'auto':
+        return r, signif, F, diagnostics
+
     return r, signif, F
 
-def phaseran(recblk, nsurr):
+def phaseran(recblk, nsurr, seed=None, chunk=None):
     ''' Simultaneous phase randomization of a set of time series
     
     It creates blocks of surrogate data with the same second order properties as the original
@@ -522,11 +1214,14 @@ def phaseran(recblk, nsurr):
 
     http://www.mathworks.nl/matlabcentral/fileexchange/32621-phase-randomization/content/phaseran.m
 
+    The surrogates are generated in batches: the random phases of a batch are drawn as a single
+    (nsurr, nfreq) matrix and all the surrogates are inverse-transformed with one call to `numpy.fft.irfft`.
+
     Parameters
     ----------
 
     recblk : numpy array
-        2D array , Row: time sample. Column: recording.
+        1D or 2D array , Row: time sample. Column: recording.
         An odd number of time samples (height) is expected.
         If that is not the case, recblock is reduced by 1 sample before the surrogate data is created.
         The class must be double and it must be nonsparse.
@@ -534,11 +1229,18 @@ def phaseran(recblk, nsurr):
     nsurr : int
         is the number of image block surrogates that you want to generate.
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator
+        seed of the random number generator [default: None]
+
+    chunk : int
+        maximum number of surrogates transformed at once, to bound memory usage.
+        If None, all surrogates are transformed at once [default: None]
+
     Returns
     -------
 
     surrblk : numpy array
-        3D multidimensional array image block with the surrogate datasets along the third dimension
+        multidimensional array image block with the surrogate datasets along the last dimension
 
     See also
     --------
@@ -554,6 +1256,7 @@ def phaseran(recblk, nsurr):
     - Carlos Gias (2020). Phase randomization, MATLAB Central File Exchange
     '''
     # Get parameters
+    recblk = np.asarray(recblk, dtype=float)
     nfrms = recblk.shape[0]
 
     if nfrms % 2 == 0:
@@ -561,29 +1264,26 @@ def phaseran(recblk, nsurr):
         recblk = recblk[0:nfrms]
 
     len_ser = int((nfrms-1)/2)
-    interv1 = np.arange(1, len_ser+1)
-    interv2 = np.arange(len_ser+1, nfrms)
-
-    # Fourier transform of the original dataset
-    fft_recblk = np.fft.fft(recblk)
 
-    surrblk = np.zeros((nfrms, nsurr))
+    # Fourier transform of the original dataset; the negative frequencies follow by symmetry
+    fft_recblk = np.fft.rfft(recblk, axis=0)[..., np.newaxis]
+    ph_shape = (len_ser+1,) + (1,)*(recblk.ndim-1)
 
-    #  for k in tqdm(np.arange(nsurr)):
-    for k in np.arange(nsurr):
-        ph_rnd = np.random.rand(len_ser)
+    surrblk = np.zeros(recblk.shape + (nsurr,))
+    rng = np.random.default_rng(seed)
+    chunk = nsurr if chunk is None else int(chunk)
 
-        # Create the random phases for all the time series
-        ph_interv1 = np.exp(2*np.pi*1j*ph_rnd)
-        ph_interv2 = np.conj(np.flipud(ph_interv1))
+    for k in range(0, nsurr, max(chunk, 1)):
+        m = min(chunk, nsurr-k)
+        ph_rnd = rng.random((m, len_ser))
 
-        # Randomize all the time series simultaneously
-        fft_recblk_surr = np.copy(fft_recblk)
-        fft_recblk_surr[interv1] = fft_recblk[interv1] * ph_interv1
-        fft_recblk_surr[interv2] = fft_recblk[interv2] * ph_interv2
+        # Create the random phases for all the time series, leaving the mean untouched
+        ph_interv = np.ones((len_ser+1, m), dtype=complex)
+        ph_interv[1:] = np.exp(2*np.pi*1j*ph_rnd).T
 
-        # Inverse transform
-        surrblk[:, k] = np.real(np.fft.ifft(fft_recblk_surr))
+        # Randomize all the time series simultaneously, then inverse transform
+        fft_recblk_surr = fft_recblk * ph_interv.reshape(ph_shape + (m,))
+        surrblk[..., k:k+m] = np.fft.irfft(fft_recblk_surr, n=nfrms, axis=0)
 
     return surrblk
 
@@ -14,6 +14,7 @@
 import numpy as np
 import statsmodels.api as sm
 from scipy import signal
+from functools import lru_cache
 
 from .tsbase import (
     is_evenly_spaced
@@ -134,7 +135,7 @@ def ts_pad(ys,ts,method = 'reflect', params=(1,0,0), reflect_type = 'odd',padFra
 
     ys : numpy array
 
-        Evenly-spaced timeseries
+        Evenly-spaced timeseries, or 2D array of timeseries sharing the time axis ts, padded along the first axis
 
     ts : numpy array
 
@@ -187,7 +188,10 @@ def ts_pad(ys,ts,method = 'reflect', params=(1,0,0), reflect_type = 'odd',padFra
     #time axis
     tp = np.arange(ts[0]-padLength*dt,ts[-1]+padLength*dt+dt,dt)
     
-    if method == 'ARIMA':
+    if method == 'ARIMA' and np.ndim(ys) > 1:
+        yp = np.stack([ts_pad(y, ts, method=method, params=params, padFrac=padFrac)[0] for y in np.moveaxis(ys, 0, -1)], axis=-1)
+
+    elif method == 'ARIMA':
         # fit ARIMA model
         fwd_mod = sm.tsa.ARIMA(ys,params).fit()  # model with time going forward
         bwd_mod = sm.tsa.ARIMA(np.flip(ys,0),params).fit()  # model with time going backwards
@@ -203,7 +207,8 @@ def ts_pad(ys,ts,method = 'reflect', params=(1,0,0), reflect_type = 'odd',padFra
         yp[len(ts)+padLength:]=yf
 
     elif method == 'reflect':
-        yp = np.pad(ys,(padLength,padLength),mode='reflect',reflect_type=reflect_type)
+        pad_width = [(padLength,padLength)] + [(0,0)]*(np.ndim(ys)-1)
+        yp = np.pad(ys,pad_width,mode='reflect',reflect_type=reflect_type)
 
     else:
         raise ValueError('Not a valid argument. Enter "ARIMA" or "reflect"')
@@ -211,6 +216,38 @@ def ts_pad(ys,ts,method = 'reflect', params=(1,0,0), reflect_type = 'odd',padFra
     return yp, tp
 
 
+@lru_cache(maxsize=32)
+def _butter_design(filter_order, wn, btype):
+    ''' Butterworth filter coefficients (b, a), designed once per set of parameters
+
+    wn must be hashable, i.e. a float or a tuple
+    '''
+    return signal.butter(filter_order, wn, btype=btype)
+
+@lru_cache(maxsize=32)
+def _firwin_design(numtaps, cutoff, window, pass_zero, **kwargs):
+    ''' FIR filter taps, designed once per set of parameters
+
+    cutoff, window and kwargs must be hashable, i.e. floats or tuples; otherwise, call _firwin_design.__wrapped__
+    '''
+    return signal.firwin(numtaps, cutoff, window=window, pass_zero=pass_zero, **kwargs)
+
+@lru_cache(maxsize=32)
+def _lanczos_design(fc, fs, window):
+    ''' Lanczos filter weights, designed once per set of parameters
+    '''
+    order = ((window - 1) // 2 ) + 1
+    nwts = 2 * order + 1
+    w = np.zeros([nwts])
+    n = nwts // 2
+    w[n] = 2 * fc / fs
+    k = np.arange(1., n)
+    sigma = np.sin(np.pi * k / n) * n / (np.pi * k)
+    firstfactor = np.sin(2. * np.pi * fc / fs * k) / (np.pi * k)
+    w[n-1:0:-1] = firstfactor * sigma
+    w[n+1:-1] = firstfactor * sigma
+    return w[1:-1]
+
 def butterworth(ys,fc,fs=1,filter_order=3,pad='reflect',
                 reflect_type='odd',params=(1,0,0),padFrac=0.1):
     '''Applies a Butterworth filter with frequency fc, with padding
@@ -221,7 +258,7 @@ def butterworth(ys,fc,fs=1,filter_order=3,pad='reflect',
 
     ys : numpy array
 
-        Timeseries
+        Timeseries, or 2D array of timeseries sharing the same time axis, filtered along the first axis
 
     fc : float or list
 
@@ -272,10 +309,10 @@ def butterworth(ys,fc,fs=1,filter_order=3,pad='reflect',
     if isinstance(fc, list) and len(fc) == 2:
         fl = fc[0] / nyq
         fh = fc[1] / nyq
-        b, a = signal.butter(filter_order, [fl, fh], btype='bandpass')
+        b, a = _butter_design(filter_order, (fl, fh), 'bandpass')
     else:
         fl = fc / nyq
-        b, a = signal.butter(filter_order, fl , btype='lowpass')
+        b, a = _butter_design(filter_order, fl, 'lowpass')
 
     ts = np.arange(len(ys)) # define time axis
 
@@ -289,7 +326,7 @@ def butterworth(ys,fc,fs=1,filter_order=3,pad='reflect',
     else:
         raise ValueError('Not a valid argument. Enter "ARIMA", "reflect" or None')
 
-    ypf = signal.filtfilt(b, a, yp)
+    ypf = signal.filtfilt(b, a, yp, axis=0)
     yf  = ypf[np.isin(tp,ts)]
 
     return yf
@@ -303,7 +340,7 @@ def lanczos(ys,fc,fs=1,pad='reflect',
 
     ys : numpy array
 
-        Timeseries
+        Timeseries, or 2D array of timeseries sharing the same time axis, filtered along the first axis
 
     fc : float
 
@@ -361,20 +398,12 @@ def lanczos(ys,fc,fs=1,pad='reflect',
         raise ValueError("Not a valid argument. Enter 'ARIMA', 'reflect' or None")
 
     window = max(51,len(yp)//4)  # arbitrary?
+    wgts = _lanczos_design(fc, fs, window)
 
-    order = ((window - 1) // 2 ) + 1
-    nwts = 2 * order + 1
-    w = np.zeros([nwts])
-    n = nwts // 2
-    w[n] = 2 * fc / fs
-    k = np.arange(1., n)
-    sigma = np.sin(np.pi * k / n) * n / (np.pi * k)
-    firstfactor = np.sin(2. * np.pi * fc / fs * k) / (np.pi * k)
-    w[n-1:0:-1] = firstfactor * sigma
-    w[n+1:-1] = firstfactor * sigma
-    wgts = w[1:-1]
-
-    ypf = np.convolve(yp,wgts, 'same')
+    if np.ndim(yp) == 1 or len(yp) < len(wgts):
+        ypf = np.apply_along_axis(np.convolve, 0, yp, wgts, 'same')
+    else:
+        ypf = signal.fftconvolve(yp, wgts.reshape((-1,) + (1,)*(np.ndim(yp)-1)), mode='same', axes=0)
     yf  = ypf[np.isin(tp,ts)]
 
     return yf    
@@ -388,7 +417,7 @@ def firwin(ys, fc, numtaps=None, fs=1, pad='reflect', window='hamming', reflect_
 
     ys : numpy array
 
-        Timeseries
+        Timeseries, or 2D array of timeseries sharing the same time axis, filtered along the first axis
 
     fc : float or list
 
@@ -455,9 +484,16 @@ def firwin(ys, fc, numtaps=None, fs=1, pad='reflect', window='hamming', reflect_
 
     if numtaps is None:
         # use the largest number of taps that the default padding method in scipy.signal.filtfilt allows
-        numtaps = int(np.size(ys)//3)
-
-    taps = signal.firwin(numtaps, fc/nyq, window=window, pass_zero=pass_zero, **kwargs)
+        numtaps = int(np.shape(ys)[0]//3)
+
+    cutoff = fc/nyq if np.isscalar(fc) else tuple(np.asarray(fc)/nyq)
+    try:
+        hash((window, tuple(kwargs.items())))
+    except TypeError:
+        # unhashable parameters (e.g. arrays) cannot be cached: design the filter directly
+        taps = _firwin_design.__wrapped__(numtaps, cutoff, window, pass_zero, **kwargs)
+    else:
+        taps = _firwin_design(numtaps, cutoff, window, pass_zero, **kwargs)
 
     ts = np.arange(len(ys)) # define time axis
 
@@ -471,7 +507,7 @@ def firwin(ys, fc, numtaps=None, fs=1, pad='reflect', window='hamming', reflect_
     else:
         raise ValueError('Not a valid argument. Enter "ARIMA", "reflect" or None')
 
-    ypf = signal.filtfilt(taps, 1, yp)
+    ypf = signal.filtfilt(taps, 1, yp, axis=0)
     yf  = ypf[np.isin(tp,ts)]
 
     return yf
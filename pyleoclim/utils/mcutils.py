@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilities to run Monte Carlo significance tests with an adaptive number of draws.
+
+Surrogates are drawn in batches until the statistic of interest (the quantiles of the
+surrogate distribution, or a p-value) is stable within a tolerance, or until a maximum
+number of draws is reached. The convergence diagnostics are returned alongside the draws.
+
+Random numbers are drawn from numpy.random.Generator objects rather than from the global
+NumPy state. Independent streams (e.g. one per batch, or one per series) are spawned from a
+numpy.random.SeedSequence, so that results are reproducible given a seed, whatever the order
+in which the streams are consumed.
+"""
+
+__all__ = [
+    'mc_adaptive_quantiles',
+    'mc_adaptive_pvalue',
+    'seed_sequence',
+    'spawn_rngs',
+]
+
+import numpy as np
+from scipy.stats import norm
+
+# default settings of the adaptive Monte Carlo procedure
+MC_KWARGS = {
+    'batch_size': 50,
+    'min_number': 100,
+    'max_number': 2000,
+    'tol': 0.02,
+    'level': 0.95,
+}
+
+
+def seed_sequence(seed=None):
+    ''' Return the numpy.random.SeedSequence corresponding to a seed
+
+    Parameters
+    ----------
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        If a Generator, the sequence is seeded by a draw from it, so that it is reproducible
+        given the state of the Generator. The default is None (fresh entropy from the operating system).
+
+    Returns
+    -------
+
+    ss : numpy.random.SeedSequence
+
+    '''
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    elif isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(int(seed.integers(2**63)))
+    else:
+        return np.random.SeedSequence(seed)
+
+
+def spawn_rngs(seed=None, number=1):
+    ''' Spawn independent random number generators from a seed
+
+    Parameters
+    ----------
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        The parent seed. The default is None (fresh entropy from the operating system).
+
+    number : int
+        The number of generators. The default is 1.
+
+    Returns
+    -------
+
+    rngs : list
+        A list of `number` numpy.random.Generator objects with statistically independent streams
+
+    See also
+    --------
+
+    pyleoclim.utils.mcutils.seed_sequence : Return the numpy.random.SeedSequence corresponding to a seed
+
+    '''
+    return [np.random.default_rng(ss) for ss in seed_sequence(seed).spawn(number)]
+
+
+def mc_settings(mc_kwargs=None):
+    ''' Merge user-defined settings of the adaptive Monte Carlo procedure with the defaults
+
+    Parameters
+    ----------
+
+    mc_kwargs : dict, optional
+        Any of 'batch_size', 'min_number', 'max_number', 'tol' and 'level'. The default is None.
+
+    Returns
+    -------
+
+    settings : dict
+        The complete settings
+
+    '''
+    settings = MC_KWARGS.copy()
+    if mc_kwargs is not None:
+        unknown = set(mc_kwargs.keys()) - set(MC_KWARGS.keys())
+        if len(unknown) > 0:
+            raise KeyError(f'Unknown Monte Carlo settings: {sorted(unknown)}. Available settings are {list(MC_KWARGS.keys())}')
+        settings.update(mc_kwargs)
+
+    return settings
+
+
+def _relative_change(q_old, q_new):
+    ''' Largest relative change between two arrays of quantiles, ignoring NaNs
+    '''
+    q_old = np.asarray(q_old, dtype=float)
+    q_new = np.asarray(q_new, dtype=float)
+    scale = np.fmax(np.abs(q_new), np.finfo(float).tiny)
+    with np.errstate(invalid='ignore'):
+        change = np.abs(q_new - q_old) / scale
+
+    if np.all(np.isnan(change)):
+        return 0.
+    return float(np.nanmax(change))
+
+
+def mc_adaptive_quantiles(draw, stat, seed=None, realizations=None, mc_kwargs=None):
+    ''' Draw surrogates in batches until their quantiles stabilize
+
+    After each batch, the quantiles of all realizations so far are compared to those
+    obtained before the batch. The procedure stops once the largest relative change
+    is below `tol` (and at least `min_number` realizations were drawn), or once `max_number`
+    realizations were drawn.
+
+    Parameters
+    ----------
+
+    draw : callable
+        draw(number, seed) returns a list of `number` realizations
+
+    stat : callable
+        stat(realizations) returns the array of quantiles of a list of realizations
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        The parent seed. Each batch is passed an independent child numpy.random.SeedSequence. The default is None.
+
+    realizations : list, optional
+        Realizations available beforehand, used before drawing new ones. The default is None.
+
+    mc_kwargs : dict, optional
+        Settings of the procedure: 'batch_size' (default: 50), 'min_number' (default: 100),
+        'max_number' (default: 2000) and 'tol' (default: 0.02).
+
+    Returns
+    -------
+
+    realizations : list
+        All the realizations
+
+    diagnostics : dict
+        The convergence diagnostics, containing
+
+        - number : int
+            the number of realizations
+        - converged : bool
+            True if the quantiles stabilized before max_number was reached
+        - tol : float
+            the tolerance on the relative change of the quantiles
+        - history : list
+            (number, relative change) after each batch
+
+    '''
+    settings = mc_settings(mc_kwargs)
+    batch_size, max_number = settings['batch_size'], settings['max_number']
+
+    ss = seed_sequence(seed)
+    realizations = [] if realizations is None else list(realizations)[:max_number]
+    history = []
+    converged = False
+    q_prev = stat(realizations) if len(realizations) > 0 else None
+
+    while len(realizations) < max_number:
+        number = min(batch_size, max_number - len(realizations))
+        realizations.extend(draw(number, ss.spawn(1)[0]))
+
+        q = stat(realizations)
+        if q_prev is not None:
+            change = _relative_change(q_prev, q)
+            history.append((len(realizations), change))
+            if len(realizations) >= settings['min_number'] and change <= settings['tol']:
+                converged = True
+                break
+        q_prev = q
+
+    diagnostics = {
+        'number': len(realizations),
+        'converged': converged,
+        'tol': settings['tol'],
+        'history': history,
+    }
+
+    return realizations, diagnostics
+
+
+def mc_adaptive_pvalue(draw, exceed, alpha=0.05, mc_kwargs=None):
+    ''' Draw surrogates in batches until a Monte Carlo p-value is settled
+
+    The p-value is the fraction of surrogate statistics at least as extreme as the observed one.
+    The procedure stops once the Wilson confidence interval of that fraction is narrower than
+    2*`tol`, or lies entirely on one side of `alpha` (the outcome of the test is then settled),
+    provided at least `min_number` surrogates were drawn, or once `max_number` surrogates were drawn.
+
+    Parameters
+    ----------
+
+    draw : callable
+        draw(number) returns an array of `number` surrogate statistics
+
+    exceed : callable
+        exceed(stats) returns a boolean array, True where the surrogate statistic is at least as extreme as the observed one
+
+    alpha : float
+        significance level of the test. The default is 0.05.
+
+    mc_kwargs : dict, optional
+        Settings of the procedure: 'batch_size' (default: 50), 'min_number' (default: 100),
+        'max_number' (default: 2000), 'tol' (default: 0.02) and 'level', the confidence level of the interval (default: 0.95).
+
+    Returns
+    -------
+
+    stats : array
+        All the surrogate statistics
+
+    diagnostics : dict
+        The convergence diagnostics, containing
+
+        - number : int
+            the number of surrogates
+        - converged : bool
+            True if the p-value was settled before max_number was reached
+        - tol : float
+            the tolerance on the half-width of the confidence interval
+        - p_ci : tuple
+            the confidence interval of the p-value
+        - history : list
+            (number, p-value) after each batch
+
+    References
+    ----------
+
+    Wilson, E. B. Probable inference, the law of succession, and statistical inference.
+        Journal of the American Statistical Association 22, 209–212 (1927).
+
+    '''
+    settings = mc_settings(mc_kwargs)
+    batch_size, max_number = settings['batch_size'], settings['max_number']
+    z = norm.ppf(0.5 + settings['level']/2)
+
+    stats = np.array([])
+    nexceed = 0
+    history = []
+    converged = False
+    p_ci = (0., 1.)
+
+    while np.size(stats) < max_number:
+        number = min(batch_size, max_number - np.size(stats))
+        batch = np.asarray(draw(number), dtype=float)
+        stats = np.concatenate([stats, batch])
+        nexceed += int(np.sum(exceed(batch)))
+
+        n = np.size(stats)
+        p = nexceed / n
+        center = (p + z**2/(2*n)) / (1 + z**2/n)
+        half = z * np.sqrt(p*(1-p)/n + z**2/(4*n**2)) / (1 + z**2/n)
+        p_ci = (center - half, center + half)
+        history.append((n, p))
+
+        if n >= settings['min_number'] and (half <= settings['tol'] or p_ci[1] < alpha or p_ci[0] > alpha):
+            converged = True
+            break
+
+    diagnostics = {
+        'number': np.size(stats),
+        'converged': converged,
+        'tol': settings['tol'],
+        'p_ci': p_ci,
+        'history': history,
+    }
+
+    return stats, diagnostics
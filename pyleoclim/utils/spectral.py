@@ -12,6 +12,7 @@
 
 import numpy as np
 from scipy import signal
+from scipy.stats import chi2
 import nitime.algorithms as nialg
 import statsmodels.api as sm
 import collections
@@ -33,6 +34,8 @@
 
 from .tsutils import preprocess
 
+from .tsmodel import tau_estimation
+
 from .wavelet import (
     make_freq_vector,
     prepare_wwz,
@@ -496,24 +499,11 @@ def lomb_scargle(ys, ts, freq=None, freq_method='lomb_scargle',
                gaussianize=gaussianize, standardize=standardize)
 
     # divide into segments
-    nseg=int(np.floor(2*len(ts)/(n50+1)))
-    index=np.array(np.arange(0,len(ts),nseg/2),dtype=int)
-    if len(index) == n50+2:
-        index[-1] = len(ts)
-    else:
-        index=np.append(index,len(ts)) #make it ends at the time series
-
     ts_seg=[]
     ys_seg=[]
-
-
-    if n50>1:
-        for idx,i in enumerate(np.arange(0,len(index)-2,1)):
-            ts_seg.append(ts[index[idx]:index[idx+2]])
-            ys_seg.append(ys[index[idx]:index[idx+2]])
-    else:
-        ts_seg.append(ts)
-        ys_seg.append(ys)
+    for seg in lomb_scargle_segments(len(ts), n50):
+        ts_seg.append(ts[seg])
+        ys_seg.append(ys[seg])
 
     if freq is None:
         freq_kwargs = {} if freq_kwargs is None else freq_kwargs.copy()
@@ -535,9 +525,17 @@ def lomb_scargle(ys, ts, freq=None, freq_method='lomb_scargle',
     # calculate the frequency vector if needed
         win=signal.get_window(window,len(ts_seg[idx]))
         scale = len(ts_seg[idx])*2*np.mean(np.diff(ts_seg[idx]))/((win*win).sum())
-        psd_seg.append(signal.lombscargle(ts_seg[idx],
-                                          item*win,
-                                          freq_angular,precenter=True)*scale)
+        yw = item*win
+        pgram = signal.lombscargle(ts_seg[idx], yw.copy(), freq_angular, precenter=True)
+        # at frequencies where all the samples fall on the zeros of the sine (e.g. the Nyquist frequency of
+        # evenly-spaced times), the sine term of the periodogram is 0/0 and scipy versions disagree on it:
+        # only the cosine term is defined
+        wt = np.outer(freq_angular, ts_seg[idx]-ts_seg[idx][0])
+        degenerate = np.max(np.abs(np.sin(wt)), axis=1) < 1e-8
+        if np.any(degenerate):
+            c = np.cos(wt[degenerate])
+            pgram[degenerate] = 0.5*((c @ (yw-np.mean(yw)))**2)/np.sum(c**2, axis=1)
+        psd_seg.append(pgram*scale)
     # average them up
     if average=='mean':
         psd=np.mean(psd_seg,axis=0)
@@ -586,6 +584,46 @@ def lomb_scargle(ys, ts, freq=None, freq_method='lomb_scargle',
     return res_dict
 
 
+def lomb_scargle_segments(nt, n50=3):
+    """ Return the 50% overlapping segments used by the Lomb-Scargle periodogram
+
+    Parameters
+    ----------
+
+    nt : int
+
+        number of points in the time series
+
+    n50 : int
+
+        the number of 50% overlapping segments
+
+    Returns
+    -------
+
+    segs : list
+        list of slices, one per segment
+
+    See Also
+    --------
+
+    pyleoclim.utils.spectral.lomb_scargle : Return the computed periodogram using lomb-scargle algorithm
+
+    """
+    if n50<=1:
+        return [slice(0, nt)]
+
+    nseg=int(np.floor(2*nt/(n50+1)))
+    index=np.array(np.arange(0,nt,nseg/2),dtype=int)
+    if len(index) == n50+2:
+        index[-1] = nt
+    else:
+        index=np.append(index,nt) #make it ends at the time series
+
+    segs = [slice(index[idx], index[idx+2]) for idx in range(len(index)-2)]
+
+    return segs
+
 def periodogram(ys, ts, window='hann', nfft=None,
            return_onesided=True, detrend = None, sg_kwargs=None,
            gaussianize=False, standardize=True,
@@ -1284,3 +1322,171 @@ def psd_fBM(freq, ts, H):
         psd[k] = (1 - 2**(1 - 2*H)*np.sin(tmp)/tmp) / np.abs(omega[k])**(1 + 2*H)
 
     return psd
+
+def lomb_scargle_dof(nt, n50=3, window='hann'):
+    ''' Effective degrees of freedom of a WOSA-averaged Lomb-Scargle periodogram
+
+    Each of the `n50` 50%-overlapping segments contributes a chi-square variable with 2 degrees of freedom,
+    reduced by the correlation between overlapping tapered segments.
+
+    Parameters
+    ----------
+
+    nt : int
+
+        number of points in the time series
+
+    n50 : int
+
+        number of 50% overlapping segments, as in pyleoclim.utils.spectral.lomb_scargle
+
+    window : str or tuple
+
+        the taper applied to each segment, as in pyleoclim.utils.spectral.lomb_scargle
+
+    Returns
+    -------
+
+    dof : float
+        effective degrees of freedom
+
+    References
+    ----------
+
+    Welch, P. D. The use of fast Fourier transform for the estimation of power spectra: a method based on
+        time averaging over short, modified periodograms. IEEE Trans. Audio Electroacoust. 15, 70–73 (1967).
+
+    Schulz, M. & Mudelsee, M. REDFIT: estimating red-noise spectra directly from unevenly spaced
+        paleoclimatic time series. Computers & Geosciences 28, 421–426 (2002).
+
+    '''
+    if n50 <= 1:
+        return 2.
+
+    nseg = int(np.floor(2*nt/(n50+1)))
+    win = signal.get_window(window, nseg)
+    shift = nseg//2
+    c50 = np.sum(win[:nseg-shift]*win[shift:]) / np.sum(win**2)
+
+    dof = 2*n50 / (1 + 2*c50**2 - 2*c50**2/n50)
+
+    return dof
+
+def wwz_dof(freq, ts, c=1e-3):
+    ''' Effective degrees of freedom of a time-averaged WWZ spectrum
+
+    The WWZ weights exp(-c*omega**2*(t-tau)**2) define a Gaussian window of standard deviation
+    1/(omega*sqrt(2c)). Local spectra decorrelate over sqrt(2*pi) times that width, so the time average
+    over a span T pools T*omega*sqrt(c/pi) independent chi-square variables with 2 degrees of freedom each.
+
+    Parameters
+    ----------
+
+    freq : array
+
+        vector of frequency
+
+    ts : array
+
+        the time axis of the time series
+
+    c : float
+
+        the decay constant of the WWZ method
+
+    Returns
+    -------
+
+    dof : array
+        effective degrees of freedom at each frequency
+
+    See also
+    --------
+
+    pyleoclim.utils.spectral.wwz_psd : Spectral estimation using the Weighted Wavelet Z-transform
+
+    '''
+    T = np.max(ts) - np.min(ts)
+    omega = 2 * np.pi * np.asarray(freq)
+    nind = T * omega * np.sqrt(c/np.pi)
+    dof = 2 * np.fmax(nind, 1)
+
+    return dof
+
+def ar1_psd_signif(psd, freq, ys, ts, dof, qs=[0.95]):
+    ''' Closed-form AR(1) significance levels for spectra of unevenly-spaced series
+
+    The theoretical spectrum of an AR(1) process with the persistence of the series (estimated with tauest) is
+    scaled to the area under the PSD, and multiplied by chi-square quantiles with `dof` degrees of freedom,
+    following the REDFIT approach.
+
+    Parameters
+    ----------
+
+    psd : array
+
+        the power spectral density of the series
+
+    freq : array
+
+        vector of frequency
+
+    ys : array
+
+        a time series
+
+    ts : array
+
+        the time axis of the time series
+
+    dof : float or array
+
+        the effective degrees of freedom, either a scalar or one value per frequency
+
+    qs : list
+
+        significance levels
+
+    Returns
+    -------
+
+    signif_levels : array
+        the significance levels, of shape (len(qs), len(freq))
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.tau_estimation : Estimates the  temporal decay scale of an (un)evenly spaced time series.
+
+    pyleoclim.utils.spectral.lomb_scargle_dof : Effective degrees of freedom of a WOSA-averaged Lomb-Scargle periodogram
+
+    pyleoclim.utils.spectral.wwz_dof : Effective degrees of freedom of a time-averaged WWZ spectrum
+
+    References
+    ----------
+
+    Schulz, M. & Mudelsee, M. REDFIT: estimating red-noise spectra directly from unevenly spaced
+        paleoclimatic time series. Computers & Geosciences 28, 421–426 (2002).
+
+    '''
+    ys = np.asarray(ys, dtype=float)
+    ts = np.asarray(ts, dtype=float)
+    psd = np.asarray(psd, dtype=float)
+    freq = np.asarray(freq, dtype=float)
+
+    ys = (ys - np.mean(ys)) / np.std(ys)
+    tau = tau_estimation(ys, ts)
+    dt = np.mean(np.diff(ts))
+    rho = np.exp(-dt / tau)
+
+    psd_ar1 = (1-rho**2) / (1 - 2*rho*np.cos(2*np.pi*freq*dt) + rho**2)
+
+    mask = ~np.isnan(psd)
+    psd_ar1 = psd_ar1 * np.trapz(psd[mask], freq[mask]) / np.trapz(psd_ar1[mask], freq[mask])
+
+    dof = np.broadcast_to(np.asarray(dof, dtype=float), np.shape(freq))
+    signif_levels = np.ndarray(shape=(np.size(qs), np.size(freq)))
+    for i, q in enumerate(qs):
+        signif_levels[i, :] = psd_ar1 * chi2.ppf(q, dof) / dof
+
+    return signif_levels
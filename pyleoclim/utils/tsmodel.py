@@ -2,6 +2,7 @@
 '''
 
 import numpy as np
+import numba as nb
 # new for statsmodels v0.12
 from statsmodels.tsa.arima_process import arma_generate_sample
 from statsmodels.tsa.arima.model import ARIMA
@@ -10,18 +11,21 @@
     is_evenly_spaced
 )
 #from .tsutils import preprocess   # no longer used here
-from scipy import optimize
+from scipy import optimize, signal
 
 __all__ = [
     'ar1_sim',
+    'ar1_sim_evenly',
+    'ar1_sim_unevenly',
     'ar1_fit',
+    'ar1_fit_batch',
     'colored_noise',
     'colored_noise_2regimes',
     'gen_ar1_evenly',
     'gen_ts'
 ]
 
-def ar1_model(t, tau, output_sigma=1):
+def ar1_model(t, tau, output_sigma=1, seed=None):
     ''' Simulate AR(1) process with REDFIT
     
     Simulate a (possibly irregularly-sampled) AR(1) process with given decay constant tau, à la REDFIT.
@@ -33,6 +37,10 @@ def ar1_model(t, tau, output_sigma=1):
         Time axis of the time series
     tau : float
         The averaged persistence
+    output_sigma : float
+        The standard deviation of the process
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
 
     Returns
     -------
@@ -40,6 +48,11 @@ def ar1_model(t, tau, output_sigma=1):
     y : array
         The AR(1) time series
 
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.ar1_sim_unevenly : Simulate several realizations of a (possibly irregularly-sampled) AR(1) process at once
+
     References
     ----------
 
@@ -47,18 +60,111 @@ def ar1_model(t, tau, output_sigma=1):
         paleoclimatic time series. Computers & Geosciences 28, 421–426 (2002).
 
     '''
+    y = ar1_sim_unevenly(t, 1, tau, output_sigma=output_sigma, seed=seed)[:, 0]
+
+    return y
+
+@nb.jit(nopython=True, parallel=True, cache=True)
+def _ar1_recursion(rho, err):
+    ''' Apply the AR(1) recursion y[i] = rho[i-1]*y[i-1] + err[i-1], starting from zero, to each column of err
+    '''
+    n = err.shape[0] + 1
+    p = err.shape[1]
+    y = np.zeros((n, p), dtype=err.dtype)
+    for j in nb.prange(p):
+        for i in range(1, n):
+            y[i, j] = y[i-1, j]*rho[i-1] + err[i-1, j]
+
+    return y
+
+def ar1_sim_unevenly(t, p, tau, output_sigma=1, seed=None, dtype=np.float64):
+    ''' Simulate several realizations of a (possibly irregularly-sampled) AR(1) process at once
+
+    Same model as pyleoclim.utils.tsmodel.ar1_model. The coefficients exp(-dt/tau) are computed once
+    and the recursion is compiled with Numba, advancing all realizations in parallel.
+
+    Parameters
+    ----------
+
+    t :  array
+        Time axis of the time series
+    p : int
+        number of realizations
+    tau : float
+        The averaged persistence
+    output_sigma : float
+        The standard deviation of the process
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+    dtype : {numpy.float64, numpy.float32}
+        Floating-point type of the output. float32 halves the memory footprint of large ensembles.
+        The default is numpy.float64.
+
+    Returns
+    -------
+
+    y : array
+        n by p matrix of AR(1) time series, where n is the size of t
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.ar1_model : Simulate AR(1) process with REDFIT
+
+    '''
+    rng = np.random.default_rng(seed)
     n = np.size(t)
-    y = np.zeros(n)
-    y[0] = 0  # initializing
+    rho = np.exp(-np.diff(np.asarray(t, dtype=float)) / tau)
+    err = rng.standard_normal(size=(n-1, p), dtype=dtype)
+    err *= (np.sqrt(1 - rho**2)*output_sigma).astype(dtype)[:, np.newaxis]
 
-    for i in range(1, n):
-        scaled_dt = (t[i] - t[i-1]) / tau
-        rho = np.exp(-scaled_dt)
-        err = np.random.normal(0, np.sqrt(1 - rho**2)*output_sigma, 1)
-        y[i] = y[i-1]*rho + err
+    y = _ar1_recursion(rho.astype(dtype), err)
 
     return y
 
+def ar1_sim_evenly(n, p, g, scale=1, burnin=50, seed=None, dtype=np.float64):
+    ''' Simulate several realizations of an evenly-spaced AR(1) process at once
+
+    A single matrix of Gaussian noise is drawn and the AR(1) recursion is applied to all its columns
+    with `scipy.signal.lfilter <https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.lfilter.html>`_,
+    which is equivalent to (but much faster than) calling statsmodels' arma_generate_sample once per column.
+
+    Parameters
+    ----------
+
+    n : int
+        row dimension (length of the series)
+    p : int
+        column dimension (number of realizations)
+    g : float
+        lag-1 autocorrelation
+    scale : float
+        The standard deviation of noise.
+    burnin : int
+        Number of observation at the beginning of the sample to drop. Used to reduce dependence on initial values.
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+    dtype : {numpy.float64, numpy.float32}
+        Floating-point type of the output. The default is numpy.float64.
+
+    Returns
+    -------
+
+    y : array
+        n by p matrix of AR(1) series
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.gen_ar1_evenly : Generate AR(1) series samples
+
+    '''
+    rng = np.random.default_rng(seed)
+    eta = scale*rng.standard_normal(size=(n+burnin, p), dtype=dtype)
+    y = signal.lfilter(np.array([1.], dtype=dtype), np.array([1., -g], dtype=dtype), eta, axis=0)
+
+    return y[burnin:].astype(dtype, copy=False)
+
 
 def ar1_fit(y, t=None):
     ''' Return lag-1 autocorrelation
@@ -97,7 +203,7 @@ def ar1_fit(y, t=None):
 
     return g
 
-def ar1_sim(y, p, t=None):
+def ar1_sim(y, p, t=None, seed=None, dtype=np.float64):
     '''Simulate AR(1) process(es) with sample autocorrelation value
 
     Produce p realizations of an AR(1) process of length n with lag-1 autocorrelation g calculated from `y` and (if provided) `t`
@@ -111,6 +217,10 @@ def ar1_sim(y, p, t=None):
         column dimension (number of surrogates)
     t : array
         the time axis of the series
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+    dtype : {numpy.float64, numpy.float32}
+        Floating-point type of the simulations. The default is numpy.float64.
 
     Returns
     -------
@@ -121,7 +231,9 @@ def ar1_sim(y, p, t=None):
     See also
     --------
 
-    pyleoclim.utils.tsmodel.ar1_model : Simulates a (possibly irregularly-sampled) AR(1) process with given decay constant tau, à la REDFIT.
+    pyleoclim.utils.tsmodel.ar1_sim_evenly : Simulate several realizations of an evenly-spaced AR(1) process at once
+
+    pyleoclim.utils.tsmodel.ar1_sim_unevenly : Simulate several realizations of a (possibly irregularly-sampled) AR(1) process at once
 
     pyleoclim.utils.tsmodel.ar1_fit : Returns the lag-1 autocorrelation from AR(1) fit OR persistence from tauest.
 
@@ -131,34 +243,27 @@ def ar1_sim(y, p, t=None):
 
     '''
     n = np.size(y)
-    ysim = np.empty(shape=(n, p))  # declare array
 
     sig = np.std(y)
     if is_evenly_spaced(t):
         g = ar1_fit_evenly(y)
-
-        # specify model parameters (statmodel want lag0 coefficent as unity)
-        ar = np.r_[1, -g]  # AR model parameter
-        ma = np.r_[1, 0.0]  # MA model parameters
         sig_n = sig*np.sqrt(1-g**2)  # theoretical noise variance for the process to achieve the same variance as y
 
-        # simulate AR(1) model for each column
-        for i in np.arange(p):
-            ysim[:, i] = arma_generate_sample(ar, ma, nsample=n, scale=sig_n, burnin=50) # statsmodels v0.12+
+        # simulate all columns at once
+        ysim = ar1_sim_evenly(n, p, g, scale=sig_n, burnin=50, seed=seed, dtype=dtype)
     else:
         #  tau_est = ar1_fit(y, t=t, detrend=detrend, params=params)
         tau_est = tau_estimation(y, t)
-        for i in np.arange(p):
-            # the output of ar1_model has unit variance,
-            # multiply by sig to be consistent with the original input timeseries
-            ysim[:, i] = ar1_model(t, tau_est, output_sigma=sig)
+        # the output of ar1_sim_unevenly has unit variance,
+        # multiply by sig to be consistent with the original input timeseries
+        ysim = ar1_sim_unevenly(t, p, tau_est, output_sigma=sig, seed=seed, dtype=dtype)
 
     if p == 1:
         ysim = ysim[:, 0]
 
     return ysim
 
-def gen_ar1_evenly(t, g, scale=1, burnin=50):
+def gen_ar1_evenly(t, g, scale=1, burnin=50, seed=None):
     ''' Generate AR(1) series samples
 
     Wrapper for the function `statsmodels.tsa.arima_process.arma_generate_sample <https://www.statsmodels.org/stable/generated/statsmodels.tsa.arima_process.arma_generate_sample.html>`_.
@@ -179,6 +284,9 @@ def gen_ar1_evenly(t, g, scale=1, burnin=50):
     burnin : int
         Number of observation at the beginning of the sample to drop. Used to reduce dependence on initial values.
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+
     Returns
     -------
     y : array
@@ -192,7 +300,8 @@ def gen_ar1_evenly(t, g, scale=1, burnin=50):
     '''
     ar = np.r_[1, -g]  # AR model parameter
     ma = np.r_[1, 0.0]  # MA model parameters
-    y = arma_generate_sample(ar, ma, nsample=np.size(t), scale=scale, burnin=burnin)
+    rng = np.random.default_rng(seed)
+    y = arma_generate_sample(ar, ma, nsample=np.size(t), scale=scale, burnin=burnin, distrvs=rng.standard_normal)
     return y
 
 
@@ -269,8 +378,345 @@ def ar1_fun(a):
 
     return tau_est
 
+def _pack(ys):
+    ''' Concatenate a ragged list of arrays, and return the index of the array each element comes from
+    '''
+    ys = [np.asarray(y, dtype=float) for y in ys]
+    lens = np.array([np.size(y) for y in ys], dtype=int)
+    seg = np.repeat(np.arange(len(ys)), lens)
+    packed = np.concatenate(ys) if len(ys) > 0 else np.array([])
+
+    return packed, seg, lens
+
+def _minimize_scalar_bounded_batch(fun, lo, hi, xatol=1e-5, maxiter=500):
+    ''' Minimize many scalar functions at once over bounded intervals
+
+    Vectorized version of the bounded Brent method (golden-section search with parabolic interpolation)
+    of scipy.optimize.minimize_scalar(method='bounded'): the steps of all the problems are taken together,
+    and a problem is no longer updated once it has converged.
+
+    Parameters
+    ----------
+
+    fun : callable
+        maps an array of ns abscissae to the ns values of the functions to minimize
+    lo, hi : arrays
+        the bounds of each problem
+    xatol : float
+        Absolute tolerance on the minimizers
+    maxiter : int
+        Maximum number of function evaluations
+
+    Returns
+    -------
+
+    xf : array
+        the minimizers
+
+    '''
+    sqrt_eps = np.sqrt(2.2e-16)
+    golden_mean = 0.5 * (3.0 - np.sqrt(5.0))
+    a = np.array(lo, dtype=float)
+    b = np.array(hi, dtype=float)
+    ns = np.size(a)
+    fulc = a + golden_mean * (b - a)
+    nfc, xf = fulc.copy(), fulc.copy()
+    rat = np.zeros(ns)
+    e = np.zeros(ns)
+    fx = fun(xf)
+    ffulc, fnfc = fx.copy(), fx.copy()
+    xm = 0.5 * (a + b)
+    tol1 = sqrt_eps * np.abs(xf) + xatol / 3.0
+    tol2 = 2.0 * tol1
+    active = np.abs(xf - xm) > (tol2 - 0.5 * (b - a))
+
+    num = 1
+    while np.any(active) and num < maxiter:
+        # parabolic step, where the previous steps allow it
+        r = (xf - nfc) * (fx - ffulc)
+        q = (xf - fulc) * (fx - fnfc)
+        p = (xf - fulc) * q - (xf - nfc) * r
+        q = 2.0 * (q - r)
+        p = np.where(q > 0, -p, p)
+        q = np.abs(q)
+        parabolic = ((np.abs(e) > tol1) & (np.abs(p) < np.abs(0.5*q*e))
+                     & (p > q*(a - xf)) & (p < q*(b - xf)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rat_p = p / q
+        x_p = xf + rat_p
+        near_bound = ((x_p - a) < tol2) | ((b - x_p) < tol2)
+        si = np.sign(xm - xf) + ((xm - xf) == 0)
+        rat_p = np.where(near_bound, tol1*si, rat_p)
+
+        # golden-section step otherwise
+        e_g = np.where(xf >= xm, a - xf, b - xf)
+        e_new = np.where(parabolic, rat, e_g)
+        rat_new = np.where(parabolic, rat_p, golden_mean*e_g)
+
+        si = np.sign(rat_new) + (rat_new == 0)
+        x = xf + si * np.maximum(np.abs(rat_new), tol1)
+        x = np.where(active, x, xf)
+        fu = fun(x)
+        num += 1
+
+        better = fu <= fx
+        worse_1 = ~better & ((fu <= fnfc) | (nfc == xf))
+        worse_2 = ~better & ~worse_1 & ((fu <= ffulc) | (fulc == xf) | (fulc == nfc))
+        a_new = np.where(better, np.where(x >= xf, xf, a), np.where(x < xf, x, a))
+        b_new = np.where(better, np.where(x >= xf, b, xf), np.where(x < xf, b, x))
+        fulc_new = np.where(better | worse_1, nfc, np.where(worse_2, x, fulc))
+        ffulc_new = np.where(better | worse_1, fnfc, np.where(worse_2, fu, ffulc))
+        nfc_new = np.where(better, xf, np.where(worse_1, x, nfc))
+        fnfc_new = np.where(better, fx, np.where(worse_1, fu, fnfc))
+        xf_new = np.where(better, x, xf)
+        fx_new = np.where(better, fu, fx)
+
+        # only the series that have not converged are updated
+        a, b, e, rat = (np.where(active, new, old) for new, old in ((a_new, a), (b_new, b), (e_new, e), (rat_new, rat)))
+        fulc, ffulc, nfc, fnfc, xf, fx = (np.where(active, new, old) for new, old in
+                                          ((fulc_new, fulc), (ffulc_new, ffulc), (nfc_new, nfc),
+                                           (fnfc_new, fnfc), (xf_new, xf), (fx_new, fx)))
+
+        xm = 0.5 * (a + b)
+        tol1 = sqrt_eps * np.abs(xf) + xatol / 3.0
+        tol2 = 2.0 * tol1
+        active &= np.abs(xf - xm) > (tol2 - 0.5 * (b - a))
+
+    return xf
+
+def tau_estimation_batch(ys, ts, xatol=1e-5, maxiter=500):
+    ''' Estimates the temporal decay scale of many (un)evenly spaced time series at once.
+
+    Same estimator as pyleoclim.utils.tsmodel.tau_estimation, for a ragged set of series.
+    The series are packed into a single array and the bounded minimization is carried out
+    for all of them simultaneously, with a vectorized version of the bounded Brent method
+    (golden-section search with parabolic interpolation) used by scipy.optimize.minimize_scalar,
+    so that the estimates also agree when the minimum lies on a bound.
+
+    Parameters
+    ----------
+
+    ys : list of arrays
+        The time series, possibly of different lengths
+    ts : list of arrays
+        The time axes of the time series
+    xatol : float
+        Absolute tolerance on the lag-1 coefficient exp(-1/tau)
+    maxiter : int
+        Maximum number of function evaluations
 
-def colored_noise(alpha, t, f0=None, m=None, seed=None):
+    Returns
+    -------
+
+    tau_est : array
+        The estimated persistence of each series
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.tau_estimation : Estimates the  temporal decay scale of an (un)evenly spaced time series.
+
+    References
+    ----------
+
+    Mudelsee, M. TAUEST: A Computer Program for Estimating Persistence in Unevenly Spaced Weather/Climate Time Series.
+        Comput. Geosci. 28, 69–72 (2002).
+
+    '''
+    ns = len(ys)
+    y0, seg, _ = _pack([np.asarray(y)[:-1] for y in ys])
+    y1, _, _ = _pack([np.asarray(y)[1:] for y in ys])
+    dt, _, _ = _pack([np.diff(t) for t in ts])
+
+    def ar1_fun(a):
+        return np.bincount(seg, weights=(y1 - y0*a[seg]**dt)**2, minlength=ns)
+
+    xf = _minimize_scalar_bounded_batch(ar1_fun, np.zeros(ns), np.ones(ns), xatol=xatol, maxiter=maxiter)
+
+    with np.errstate(divide='ignore'):
+        tau_est = -1 / np.log(xf)
+
+    return tau_est
+
+def ar1_fit_evenly_batch(ys, xatol=1e-6, maxiter=500):
+    ''' Returns the lag-1 autocorrelation of many evenly-spaced series at once.
+
+    Same model as pyleoclim.utils.tsmodel.ar1_fit_evenly, a linear trend with AR(1) errors fitted by exact
+    maximum likelihood, for a ragged set of series. For a given lag-1 autocorrelation, the trend is the
+    generalized least-squares fit (Prais-Winsten transform) and the innovation variance follows in closed form,
+    so the likelihood is maximized over the autocorrelation alone, for all the series simultaneously.
+    The estimates therefore agree with those of ar1_fit_evenly up to the convergence tolerance of the
+    numerical optimizer used by statsmodels, typically to within a few thousandths.
+
+    Parameters
+    ----------
+
+    ys : list of arrays
+        The time series, possibly of different lengths
+    xatol : float
+        Absolute tolerance on the lag-1 autocorrelation
+    maxiter : int
+        Maximum number of likelihood evaluations
+
+    Returns
+    -------
+
+    g : array
+        Lag-1 autocorrelation coefficient of each series
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.ar1_fit_evenly : Returns the lag-1 autocorrelation from AR(1) fit.
+
+    '''
+    ns = len(ys)
+    y, seg, lens = _pack(ys)
+    offsets = np.concatenate([[0], np.cumsum(lens)[:-1]]).astype(int)
+    x = np.arange(np.size(y)) - offsets[seg] - (lens[seg] - 1) / 2  # centered time index within each series
+
+    def seg_sum(v):
+        return np.bincount(seg, weights=v, minlength=ns)
+
+    # removing the least-squares trend leaves the likelihood unchanged, and avoids cancellations below
+    slope = seg_sum(x*y) / seg_sum(x**2)
+    y = y - (seg_sum(y) / lens)[seg] - slope[seg]*x
+
+    first = np.zeros(np.size(y), dtype=bool)
+    first[offsets] = True
+    y_prev = np.roll(y, 1)
+    x_prev = np.roll(x, 1)
+
+    def neg_loglik(g):
+        # concentrated negative log-likelihood of each series
+        gs = g[seg]
+        s0 = np.sqrt(1 - gs**2)
+        z = np.where(first, s0*y, y - gs*y_prev)
+        c1 = np.where(first, s0, 1 - gs)
+        c2 = np.where(first, s0*x, x - gs*x_prev)
+        a11, a12, a22 = seg_sum(c1**2), seg_sum(c1*c2), seg_sum(c2**2)
+        b1, b2 = seg_sum(c1*z), seg_sum(c2*z)
+        ssr = seg_sum(z**2) - (a22*b1**2 - 2*a12*b1*b2 + a11*b2**2) / (a11*a22 - a12**2)
+        return lens/2*np.log(ssr/lens) - 0.5*np.log(1 - g**2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g = _minimize_scalar_bounded_batch(neg_loglik, -np.ones(ns), np.ones(ns), xatol=xatol, maxiter=maxiter)
+
+    eps = np.spacing(1.0)
+    g = np.where(g > 1, 1.0 - eps**(1/4), g)
+
+    return g
+
+def ar1_fit_batch(ys, ts=None):
+    ''' Return the lag-1 autocorrelation or persistence of many series at once
+
+    Batched counterpart of pyleoclim.utils.tsmodel.ar1_fit: for each series, returns the lag-1 autocorrelation
+    (for evenly-spaced series) or the estimated persistence (for unevenly-spaced series).
+
+    Parameters
+    ----------
+
+    ys : list of arrays
+        The time series, possibly of different lengths
+    ts : list of arrays
+        The time axes of the series. If None, all series are considered evenly spaced.
+
+    Returns
+    -------
+
+    g : array
+        Lag-1 autocorrelation coefficient (for evenly-spaced time series)
+        OR estimated persistence (for unevenly-spaced time series)
+
+    See also
+    --------
+
+    pyleoclim.utils.tsmodel.ar1_fit : Return lag-1 autocorrelation
+
+    pyleoclim.utils.tsmodel.ar1_fit_evenly_batch : Returns the lag-1 autocorrelation of many evenly-spaced series at once.
+
+    pyleoclim.utils.tsmodel.tau_estimation_batch : Estimates the temporal decay scale of many (un)evenly spaced time series at once.
+
+    '''
+    evenly = np.ones(len(ys), dtype=bool) if ts is None else np.array([is_evenly_spaced(t) for t in ts], dtype=bool)
+    g = np.empty(len(ys))
+
+    idx = np.flatnonzero(evenly)
+    if np.size(idx) > 0:
+        g[idx] = ar1_fit_evenly_batch([ys[i] for i in idx])
+
+    idx = np.flatnonzero(~evenly)
+    if np.size(idx) > 0:
+        g[idx] = tau_estimation_batch([ys[i] for i in idx], [ts[i] for i in idx])
+
+    return g
+
+
+def _sum_sinusoids(t, f0, coeff, theta, chunk=1024):
+    ''' Evaluate y(t) = sum_k coeff[k]*sin(2*pi*(k+1)*f0*t + theta[k]) for one or several sets of phases
+
+    For an evenly-spaced t such that 1/(f0*dt) is an integer N, the frequencies lie on the grid
+    of a discrete Fourier transform of length N, and the sum is evaluated exactly with an inverse FFT
+    in O(N log N) operations. Otherwise, the sum is evaluated directly, by blocks of `chunk` time points,
+    as matrix products over all sets of phases at once.
+
+    Parameters
+    ----------
+
+    t : array
+        time axis, of size n
+
+    f0 : float
+        fundamental frequency
+
+    coeff : array
+        amplitude of each of the m waves
+
+    theta : array
+        phases, of shape (m, p)
+
+    chunk : int
+        number of time points evaluated at once by the direct summation
+
+    Returns
+    -------
+
+    y : array
+        the sums, of shape (n, p)
+
+    '''
+    t = np.asarray(t, dtype=float)
+    n = np.size(t)
+    m, p = np.shape(theta)
+    k = np.arange(m) + 1
+
+    evenly = False
+    if n > 1:
+        dt = (t[-1] - t[0]) / (n-1)
+        if dt > 0:
+            nfft = 1/(f0*dt)
+            evenly = np.allclose(t, t[0] + dt*np.arange(n), rtol=0, atol=1e-9*dt*n)
+
+    if evenly and np.isclose(nfft, np.round(nfft), rtol=1e-9, atol=0) and np.round(nfft) <= 16*(n+m):
+        # sin(x) = Im(exp(ix)), and the phase of wave k at t[0] is absorbed into its complex amplitude
+        nfft = int(np.round(nfft))
+        amp = coeff[:, np.newaxis] * np.exp(1j*(theta + 2*np.pi*k[:, np.newaxis]*f0*t[0]))
+        spec = np.zeros((nfft, p), dtype=complex)
+        np.add.at(spec, k % nfft, amp)
+        z = np.fft.ifft(spec, axis=0) * nfft
+        y = np.imag(z[np.arange(n) % nfft])
+    else:
+        # sin(wt + theta) = sin(wt)*cos(theta) + cos(wt)*sin(theta)
+        a = coeff[:, np.newaxis] * np.cos(theta)
+        b = coeff[:, np.newaxis] * np.sin(theta)
+        y = np.empty((n, p))
+        for i in range(0, n, chunk):
+            wt = 2*np.pi*f0*np.outer(t[i:i+chunk], k)
+            y[i:i+chunk] = np.sin(wt) @ a + np.cos(wt) @ b
+
+    return y
+
+def colored_noise(alpha, t, f0=None, m=None, seed=None, p=1):
     ''' Generate a colored noise timeseries
 
     Parameters
@@ -287,11 +733,17 @@ def colored_noise(alpha, t, f0=None, m=None, seed=None):
     m : int
         maximum number of the waves, which determines the highest frequency of the components in the synthetic noise
 
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+
+    p : int
+        number of realizations. The default is 1.
+
     Returns
     -------
 
     y : array
-        the generated 1/f^alpha noise
+        the generated 1/f^alpha noise, of shape (n, p) if p > 1
 
     See also
     --------
@@ -305,7 +757,6 @@ def colored_noise(alpha, t, f0=None, m=None, seed=None):
 
     '''
     n = np.size(t)  # number of time points
-    y = np.zeros(n)
 
     if f0 is None:
         f0 = 1/n  # fundamental frequency
@@ -314,18 +765,17 @@ def colored_noise(alpha, t, f0=None, m=None, seed=None):
 
     k = np.arange(m) + 1  # wave numbers
 
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+    theta = rng.random((int(m), p))*2*np.pi  # random phase
+    coeff = (k*f0)**(-alpha/2)
+    y = _sum_sinusoids(t, f0, coeff, theta)
 
-    theta = np.random.rand(int(m))*2*np.pi  # random phase
-    for j in range(n):
-        coeff = (k*f0)**(-alpha/2)
-        sin_func = np.sin(2*np.pi*k*f0*t[j] + theta)
-        y[j] = np.sum(coeff*sin_func)
+    if p == 1:
+        y = y[:, 0]
 
     return y
 
-def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=None):
+def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=None, p=1):
     ''' Generate a colored noise timeseries with two regimes
 
     Parameters
@@ -343,12 +793,17 @@ def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=Non
         fundamental frequency
     m : int
         maximum number of the waves, which determines the highest frequency of the components in the synthetic noise
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the random number generator. The default is None.
+
+    p : int
+        number of realizations. The default is 1.
 
     Returns
     -------
 
     y : array
-        the generated 1/f^alpha noise
+        the generated 1/f^alpha noise, of shape (n, p) if p > 1
 
     See also
     --------
@@ -361,7 +816,6 @@ def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=Non
      Eq. (15) in Kirchner, J. W. Aliasing in 1/f(alpha) noise spectra: origins, consequences, and remedies. Phys Rev E Stat Nonlin Soft Matter Phys 71, 066110 (2005).
     '''
     n = np.size(t)  # number of time points
-    y = np.zeros(n)
 
     if f0 is None:
         f0 = 1/n  # fundamental frequency
@@ -370,10 +824,8 @@ def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=Non
 
     k = np.arange(m) + 1  # wave numbers
 
-    if seed is not None:
-        np.random.seed(seed)
-
-    theta = np.random.rand(int(m))*2*np.pi  # random phase
+    rng = np.random.default_rng(seed)
+    theta = rng.random((int(m), p))*2*np.pi  # random phase
 
     f_vec = k*f0
     regime1= k*f0>=f_break
@@ -382,12 +834,13 @@ def colored_noise_2regimes(alpha1, alpha2, f_break, t, f0=None, m=None, seed=Non
     f_vec2 = f_vec[regime2]
     s = np.exp(alpha1/alpha2*np.log(f_vec1[0])) / f_vec2[-1]
 
-    for j in range(n):
-        coeff = np.ndarray((np.size(f_vec)))
-        coeff[regime1] = f_vec1**(-alpha1/2)
-        coeff[regime2] = (s*f_vec2)**(-alpha2/2)
-        sin_func = np.sin(2*np.pi*k*f0*t[j] + theta)
-        y[j] = np.sum(coeff*sin_func)
+    coeff = np.ndarray((np.size(f_vec)))
+    coeff[regime1] = f_vec1**(-alpha1/2)
+    coeff[regime2] = (s*f_vec2)**(-alpha2/2)
+    y = _sum_sinusoids(t, f0, coeff, theta)
+
+    if p == 1:
+        y = y[:, 0]
 
     return y
 
@@ -8,12 +8,16 @@
     'simple_stats',
     'bin',
     'interp',
+    'interp_batch',
     'gkernel',
     'standardize',
     'ts2segments',
     'annualize',
     'gaussianize',
     'detrend',
+    'detrend_emd_batch',
+    'emd',
+    'emd_batch',
     'detect_outliers_DBSCAN',
     'detect_outliers_kmeans',
     'remove_outliers'
@@ -26,8 +30,8 @@
 from scipy import special
 from scipy import signal
 from scipy import interpolate
+from scipy import linalg
 from scipy import stats
-from pyhht import EMD
 from sklearn.neighbors import NearestNeighbors
 from sklearn.cluster import DBSCAN
 from sklearn.cluster import KMeans
@@ -92,6 +96,95 @@ def simple_stats(y, axis=None):
     return mean, median, min_, max_, std, IQR
 
 
+def _binned_statistics(x, y, bin_edges, statistics=('mean', 'count', 'std')):
+    """ Compute several statistics of the values in each bin, digitizing x only once
+
+    The bins follow the convention of scipy.stats.binned_statistic: all bins are half open,
+    except the last one, which includes its right edge. Points outside of the bins are ignored.
+    The values of each bin are gathered into a contiguous segment of a sorted copy of y, and the statistics
+    are computed with segment reductions.
+
+    Parameters
+    ----------
+
+    x : 1d array
+        The x-axis series.
+
+    y : 1d or 2d array
+        The y-axis series. If 2d, each column is a series sampled on x.
+
+    bin_edges : 1d array
+        The (increasing) edges of the bins.
+
+    statistics : iterable of str
+        Any of 'mean', 'count', 'sum', 'std', 'min', 'max' and 'median'.
+
+    Returns
+    -------
+
+    res : dict
+        The binned statistics, with the bins along the first axis. As in scipy.stats.binned_statistic,
+        the statistics of empty bins are NaN, except 'count' and 'sum', which are 0.
+
+    """
+    bin_edges = np.asarray(bin_edges, dtype='float64')
+    nb = len(bin_edges) - 1
+
+    idx = np.searchsorted(bin_edges, x, side='right') - 1
+    idx[x == bin_edges[-1]] = nb - 1  # the last bin is closed
+    valid = (idx >= 0) & (idx < nb)
+
+    order = np.argsort(idx[valid], kind='stable')
+    idx = idx[valid][order]
+    ys = y[valid][order]
+
+    count = np.bincount(idx, minlength=nb)
+    nonempty = count > 0
+    seg = np.concatenate([[0], np.cumsum(count)[:-1]])[nonempty]
+    cnt = count[nonempty].reshape((-1,) + (1,)*(ys.ndim-1))
+
+    def per_bin(values, fill=np.nan):
+        out = np.full((nb,) + np.shape(y)[1:], fill, dtype='float64')
+        out[nonempty] = values
+        return out
+
+    res = {}
+    if 'count' in statistics:
+        res['count'] = per_bin(cnt, fill=0)
+    if not np.any(nonempty):
+        for stat in statistics:
+            if stat not in res:
+                res[stat] = per_bin(None, fill=0 if stat == 'sum' else np.nan)
+        return res
+
+    sums = np.add.reduceat(ys, seg, axis=0)
+    mean = sums / cnt
+    if 'sum' in statistics:
+        res['sum'] = per_bin(sums, fill=0)
+    if 'mean' in statistics:
+        res['mean'] = per_bin(mean)
+    if 'std' in statistics:
+        dev = ys - np.repeat(mean, count[nonempty], axis=0)
+        res['std'] = per_bin(np.sqrt(np.add.reduceat(dev**2, seg, axis=0) / cnt))
+    if 'min' in statistics:
+        res['min'] = per_bin(np.minimum.reduceat(ys, seg, axis=0))
+    if 'max' in statistics:
+        res['max'] = per_bin(np.maximum.reduceat(ys, seg, axis=0))
+    if 'median' in statistics:
+        # sort the values within each segment; NaNs go last, and make the median NaN
+        yv = ys.reshape((len(ys), -1))
+        med = np.zeros((len(seg), yv.shape[1]))
+        half = count[nonempty] // 2
+        for col in range(yv.shape[1]):
+            ysorted = yv[np.lexsort((yv[:, col], idx)), col]
+            med[:, col] = np.where(count[nonempty] % 2 == 1, ysorted[seg+half],
+                                   (ysorted[seg+half-1+(count[nonempty] % 2)] + ysorted[seg+half])/2)
+            has_nan = np.add.reduceat(np.isnan(ysorted).astype(int), seg) > 0
+            med[has_nan, col] = np.nan
+        res['median'] = per_bin(med.reshape((len(seg),) + np.shape(y)[1:]))
+
+    return res
+
 def bin(x, y, bin_size=None, start=None, stop=None, step_style=None, evenly_spaced = False, statistic = 'mean', bin_edges=None, time_axis=None,no_nans = True):
     """ Bin the values
 
@@ -106,7 +199,7 @@ def bin(x, y, bin_size=None, start=None, stop=None, step_style=None, evenly_spac
         The x-axis series.
 
     y : array
-        The y-axis series.
+        The y-axis series. If 2d, each column is a series sampled on x, and all the columns are binned at once.
 
     bin_size : float
         The size of the bins. Default is the maximum resolution if no_nans is True.
@@ -126,7 +219,8 @@ def bin(x, y, bin_size=None, start=None, stop=None, step_style=None, evenly_spac
 
     statistic : str
         Statistic to calculate and return in values. Default is 'mean'.
-        See scipy.stats.binned_statistic for other options.
+        'mean', 'count', 'sum', 'std', 'min', 'max' and 'median' are computed in a single pass over the data, together with n and error;
+        see scipy.stats.binned_statistic for other options.
 
     bin_edges : np.ndarray
         The edge of bins to use for binning. 
@@ -253,10 +347,16 @@ def bin(x, y, bin_size=None, start=None, stop=None, step_style=None, evenly_spac
         bin_edges = make_even_axis(x=x,start=start,stop=stop,step=bin_size,step_style=step_style,no_nans=no_nans)
         time_axis = (bin_edges[1:]+bin_edges[:-1])/2
 
-    # Perform the calculation
-    binned_values = stats.binned_statistic(x=x,values=y,bins=bin_edges,statistic=statistic).statistic
-    n = stats.binned_statistic(x=x,values=y,bins=bin_edges,statistic='count').statistic
-    error = stats.binned_statistic(x=x,values=y,bins=bin_edges,statistic='std').statistic
+    # Perform the calculation, digitizing x only once
+    fast_stats = ['mean', 'count', 'sum', 'std', 'min', 'max', 'median']
+    statistics = ['count', 'std'] + ([statistic] if statistic in fast_stats else [])
+    res = _binned_statistics(x, y, bin_edges, statistics=statistics)
+    n = res['count']
+    error = res['std']
+    if statistic in fast_stats:
+        binned_values = res[statistic]
+    else:
+        binned_values = stats.binned_statistic(x=x,values=y.T,bins=bin_edges,statistic=statistic).statistic.T
 
     #Returned bins should be at the midpoint of the bin edges
     res_dict = {
@@ -286,8 +386,9 @@ def gkernel(t,y, h = None, step=None,start=None,stop=None, step_style = None, ev
     t  : 1d array
         the original time axis
     
-    y  : 1d array
-        values on the original time axis
+    y  : 1d or 2d array
+        values on the original time axis. If 2d, each column is a series sampled on t,
+        and all the columns are coarsened at once.
         
     h  : float 
         kernel e-folding scale. Default value is None, in which case the median time step will be used.
@@ -330,12 +431,15 @@ def gkernel(t,y, h = None, step=None,start=None,stop=None, step_style = None, ev
     tc : 1d array
         the coarse-grained time axis
         
-    yc:  1d array
+    yc:  1d or 2d array
         The coarse-grained time series
 
     Notes
     -----
 
+    The time axis is sorted once and the bin boundaries are located with `np.searchsorted`;
+    the kernel-weighted means of all bins are then obtained with segment reductions (`np.add.reduceat`).
+
     `start`, `stop`, `step`, and `step_style` are interpreted as defining the `bin_edges` for this function.
     This differs from the `interp` interpretation, which uses these to define the time axis over which interpolation is applied.
     For `gkernel`, the time axis will be specified as the midpoints between `bin_edges`, unless `time_axis` is explicitly passed.
@@ -450,23 +554,24 @@ def gkernel(t,y, h = None, step=None,start=None,stop=None, step_style = None, ev
     if h is None:
         h = np.median(t)
 
-    yc    = np.zeros((len(time_axis)))
+    yc    = np.zeros((len(time_axis),) + np.shape(y)[1:])
     yc[:] = np.nan
 
-    for i in range(len(bin_edges)-1):
-        if i < len(bin_edges)-1:
-            xslice = t[(t>=bin_edges[i])&(t<bin_edges[i+1])]
-            yslice = y[(t>=bin_edges[i])&(t<bin_edges[i+1])]
-        else:
-            xslice = t[(t>=bin_edges[i])&(t<=bin_edges[i+1])]
-            yslice = y[(t>=bin_edges[i])&(t<=bin_edges[i+1])]
-
-        if len(xslice)>0:
-            d      = xslice-time_axis[i]
-            weight = kernel(d,h)
-            yc[i]  = sum(weight*yslice)/sum(weight) # normalize by the sum of weights
-        else:
-            yc[i] = np.nan
+    # sort once, and locate the points of each bin [bin_edges[i], bin_edges[i+1])
+    order = np.argsort(t, kind='stable')
+    ts, ys = t[order], y[order]
+    lo = np.searchsorted(ts, bin_edges[:-1], side='left')
+    hi = np.searchsorted(ts, bin_edges[1:], side='left')
+    nonempty = hi > lo
+
+    if np.any(nonempty):
+        # the bins are contiguous, so their points form consecutive segments of ts[lo[0]:hi[-1]]
+        ts, ys = ts[lo[0]:hi[-1]], ys[lo[0]:hi[-1]]
+        centers = np.repeat(time_axis, hi-lo)
+        weight = kernel(ts-centers,h)
+        seg = (lo-lo[0])[nonempty]
+        num = np.add.reduceat(weight.reshape((-1,) + (1,)*(ys.ndim-1))*ys, seg, axis=0)
+        yc[nonempty] = num/np.add.reduceat(weight, seg).reshape((-1,) + (1,)*(ys.ndim-1)) # normalize by the sum of weights
 
     if no_nans:
         check = np.isnan(yc).any()
@@ -665,6 +770,227 @@ def interp(x,y, interp_type='linear', step=None, start=None, stop=None, step_sty
 
     return time_axis, yi
 
+def _interp_ragged(x, y, offsets, xi, interp_type='linear', bounds_error=None, fill_value=np.nan):
+    """ Interpolate a ragged set of series, packed end to end, onto a common axis
+
+    Parameters
+    ----------
+
+    x : array
+        The concatenated x-axes, sorted within each series, without NaNs
+
+    y : array
+        The concatenated y values
+
+    offsets : array
+        The start index of each series in x and y, followed by the total length
+
+    xi : array
+        The common axis, sorted
+
+    interp_type : str; {'linear', 'nearest', 'cubic'}
+        The kind of interpolation
+
+    bounds_error : bool
+        If True, raise a ValueError when xi is outside the range of a series. Default is None,
+        i.e. True unless fill_value is 'extrapolate', as in `scipy.interpolate.interp1d`.
+
+    fill_value : float or 'extrapolate'
+        The value used outside the range of a series when bounds_error is False
+
+    Returns
+    -------
+
+    yi : array
+        The interpolated values, of shape (len(xi), number of series)
+
+    """
+    lens = np.diff(offsets)
+    ns, nt = np.size(lens), np.size(xi)
+    min_len = 4 if interp_type == 'cubic' else 2
+    if np.any(lens < min_len):
+        raise ValueError(f'{interp_type} interpolation requires at least {min_len} non-NaN points per series')
+    if bounds_error is None:
+        bounds_error = not (isinstance(fill_value, str) and fill_value == 'extrapolate')
+
+    seg_q = np.repeat(np.arange(ns), nt)
+    xq = np.tile(xi, ns)
+    lo, hi = _bracket(x, offsets, xq, seg_q)
+    x_lo, x_hi = x[lo], x[hi]
+
+    if interp_type == 'linear':
+        slope = (y[hi] - y[lo]) / (x_hi - x_lo)
+        yq = y[lo] + slope*(xq - x_lo)
+    elif interp_type == 'nearest':
+        yq = np.where(xq <= (x_lo + x_hi)/2, y[lo], y[hi])
+    elif interp_type == 'cubic':
+        yq = _cubic_eval(x, y, _cubic_slopes(x, y, offsets), lo, xq)
+    else:
+        raise ValueError(f'Unsupported interp_type: {interp_type}. Available types are "linear", "nearest" and "cubic"')
+
+    below = xq < x[offsets[seg_q]]
+    above = xq > x[offsets[seg_q+1]-1]
+    if bounds_error:
+        if np.any(below):
+            raise ValueError('A value in x_new is below the interpolation range.')
+        if np.any(above):
+            raise ValueError('A value in x_new is above the interpolation range.')
+    elif not (isinstance(fill_value, str) and fill_value == 'extrapolate'):
+        yq = np.where(below | above, fill_value, yq)
+
+    return yq.reshape(ns, nt).T
+
+def _bracket(x, offsets, xq, seg_q):
+    """ Indices of the knots bracketing each query, within its own series
+
+    The knots and the queries are sorted together, series by series, so that the position
+    of a query gives the number of knots strictly below it. Queries outside the range of their
+    series are bracketed by the first or last two knots.
+    """
+    lens = np.diff(offsets)
+    seg = np.repeat(np.arange(np.size(lens)), lens)
+    is_data = np.concatenate([np.ones(np.size(x), dtype=int), np.zeros(np.size(xq), dtype=int)])
+    order = np.lexsort((is_data, np.concatenate([x, xq]), np.concatenate([seg, seg_q])))
+    pos = np.empty(np.size(order), dtype=int)
+    pos[order] = np.cumsum(is_data[order]) # inclusive count, equal to the exclusive one at queries
+    cnt = pos[np.size(x):] - offsets[seg_q]
+
+    hi = np.clip(cnt, 1, lens[seg_q]-1) + offsets[seg_q]
+    return hi - 1, hi
+
+def _cubic_eval(x, y, s, lo, xq):
+    """ Evaluate piecewise cubic Hermite polynomials, given the knots, the values and the slopes,
+    on the intervals starting at knots lo
+    """
+    # coefficients of all the intervals; those straddling two series are never used
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = np.diff(x)
+        m = np.diff(y) / h
+        t_ = (s[:-1] + s[1:] - 2*m) / h
+        c0, c1 = t_/h, (m - s[:-1])/h - t_
+    dt = xq - x[lo]
+    return ((c0[lo]*dt + c1[lo])*dt + s[lo])*dt + y[lo]
+
+def _cubic_slopes(x, y, offsets):
+    """ First derivatives at the knots of the not-a-knot cubic splines of a ragged set of series
+
+    The tridiagonal systems of all the series are assembled into one block-diagonal banded
+    system, solved at once. Same equations as `scipy.interpolate.CubicSpline`.
+    """
+    n = np.size(x)
+    k = np.arange(n)
+    starts, ends = offsets[:-1], offsets[1:]-1
+    first = np.zeros(n, dtype=bool)
+    last = np.zeros(n, dtype=bool)
+    first[starts], last[ends] = True, True
+    inner = ~(first | last)
+
+    # differences and slopes; the values straddling two series are never used
+    dx = np.append(np.diff(x), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.append(np.diff(y), np.nan) / dx
+
+    # banded storage: upper diagonal, diagonal, lower diagonal
+    ab = np.zeros((3, n))
+    b = np.empty(n)
+
+    i = k[inner]
+    ab[2, i-1] = dx[i]
+    ab[1, i] = 2*(dx[i-1] + dx[i])
+    ab[0, i+1] = dx[i-1]
+    b[i] = 3*(dx[i]*slope[i-1] + dx[i-1]*slope[i])
+
+    i = starts
+    d = x[i+2] - x[i]
+    ab[1, i] = dx[i+1]
+    ab[0, i+1] = d
+    b[i] = ((dx[i] + 2*d)*dx[i+1]*slope[i] + dx[i]**2*slope[i+1]) / d
+
+    i = ends
+    d = x[i] - x[i-2]
+    ab[1, i] = dx[i-2]
+    ab[2, i-1] = d
+    b[i] = (dx[i-1]**2*slope[i-2] + (2*d + dx[i-1])*dx[i-2]*slope[i-1]) / d
+
+    return linalg.solve_banded((1, 1), ab, b, overwrite_ab=True, overwrite_b=True, check_finite=False)
+
+def interp_batch(xs, ys, time_axis, interp_type='linear', bounds_error=None, fill_value=np.nan):
+    """ Interpolate many series onto a common time axis at once
+
+    Vectorized counterpart of `interp` for a ragged set of series: they are packed end to end,
+    and all the interpolated values are computed in a single pass. The cubic splines of all the series
+    are obtained from a single banded solve.
+
+    Parameters
+    ----------
+
+    xs : list of arrays
+       The x-axes of the series, possibly of different lengths
+
+    ys : list of arrays
+       The y values of the series
+
+    time_axis : array
+        Time axis onto which the series will be interpolated
+
+    interp_type : str; {'linear', 'nearest', 'cubic'}
+        The kind of interpolation, as in `scipy.interpolate.interp1d`. Default is 'linear'.
+
+    bounds_error : bool
+        If True, raise a ValueError when the time axis is outside the range of a series.
+        Default is None, i.e. True unless fill_value is 'extrapolate'.
+
+    fill_value : float or 'extrapolate'
+        The value used outside the range of a series when bounds_error is False.
+        If 'extrapolate', the end intervals are extrapolated. Default is NaN.
+
+    Returns
+    -------
+
+    xi : array
+        The interpolated x-axis
+
+    yi : array
+        The interpolated y values, of shape (len(xi), number of series)
+
+    See Also
+    --------
+
+    pyleoclim.utils.tsutils.interp : Interpolate y onto a new x-axis
+
+    Examples
+    --------
+
+    .. jupyter-execute::
+
+        import numpy as np
+        import pyleoclim as pyleo
+
+        xs = [np.array([1,2,3,5,8,12,20]), np.array([0,4,9,13,21])]
+        ys = [np.ones(7), np.arange(5)]
+        xi,yi = pyleo.utils.tsutils.interp_batch(xs,ys,time_axis=[1,4,8,12,16])
+        yi
+
+    """
+    xs = [np.asarray(x, dtype='float64') for x in xs]
+    ys = [np.asarray(y, dtype='float64') for y in ys]
+    time_axis = np.sort(np.asarray(time_axis, dtype='float64'))
+
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    seg = np.repeat(np.arange(len(xs)), [np.size(x_) for x_ in xs])
+
+    # drop NaNs and sort each series
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y, seg = x[keep], y[keep], seg[keep]
+    order = np.lexsort((x, seg))
+    x, y = x[order], y[order]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(seg, minlength=len(xs)))])
+
+    yi = _interp_ragged(x, y, offsets, time_axis, interp_type=interp_type,
+                        bounds_error=bounds_error, fill_value=fill_value)
+
+    return time_axis, yi
+
 
 def standardize(x, scale=1, axis=0, ddof=0, eps=1e-3):
     """Centers and normalizes a time series. Constant or nearly constant time series not rescaled.
@@ -908,12 +1234,356 @@ def gaussianize(ys):
     return yg
 
 
+def _segment_extrema(m, seg, starts, ends):
+    """ Local maxima and minima (as in scipy.signal.argrelmax and argrelmin) and number of zero crossings
+    of series packed end to end
+    """
+    n, ns = np.size(m), np.size(starts)
+    first = np.zeros(n, dtype=bool)
+    last = np.zeros(n, dtype=bool)
+    first[starts], last[ends] = True, True
+    interior = ~(first | last)
+    prev, nxt = np.roll(m, 1), np.roll(m, -1)
+    imax = np.nonzero(interior & (m > prev) & (m > nxt))[0]
+    imin = np.nonzero(interior & (m < prev) & (m < nxt))[0]
+
+    # zero crossings, each run of exact zeros counting once
+    cross = ~last & (m*nxt < 0)
+    zero = m == 0
+    zero_start = zero & ~(np.roll(zero, 1) & ~first)
+    nzm = np.bincount(seg, weights=cross, minlength=ns) + np.bincount(seg, weights=zero_start, minlength=ns)
+
+    return imax, imin, nzm
+
+def _envelope(t, m, iext, seg, starts, ends, nbsym=2):
+    """ Cubic spline envelope through the extrema iext of series packed end to end, evaluated at all their points
+
+    The extrema are mirrored about both ends of their series (nbsym on each side), and the splines of all
+    the series are obtained from one banded solve. The time axes must be strictly increasing, so that the knots
+    bracketing each point follow from a running count of the extrema.
+    """
+    ns = np.size(starts)
+    sseg = seg[iext]
+    c = np.bincount(sseg, minlength=ns)
+    nb = np.minimum(c, nbsym)
+    koffsets = np.concatenate([[0], np.cumsum(c + 2*nb)])
+    rank = np.arange(np.size(iext)) - (np.cumsum(c) - c)[sseg]
+    te, ve = t[iext], m[iext]
+
+    # knots of each series: mirrored left extrema, extrema, mirrored right extrema
+    kt, kv = np.empty(koffsets[-1]), np.empty(koffsets[-1])
+    pos = koffsets[sseg] + nb[sseg] + rank
+    kt[pos], kv[pos] = te, ve
+    left = rank < nb[sseg]
+    pos = koffsets[sseg[left]] + nb[sseg[left]] - 1 - rank[left]
+    kt[pos], kv[pos] = 2*t[starts[sseg[left]]] - te[left], ve[left]
+    right = rank >= c[sseg] - nb[sseg]
+    pos = koffsets[sseg[right]] + nb[sseg[right]] + 2*c[sseg[right]] - 1 - rank[right]
+    kt[pos], kv[pos] = 2*t[ends[sseg[right]]] - te[right], ve[right]
+
+    # number of knots strictly before each point
+    is_ext = np.zeros(np.size(m), dtype=int)
+    is_ext[iext] = 1
+    before = np.cumsum(is_ext) - is_ext
+    cnt = nb[seg] + before - before[starts][seg]
+    lo = np.clip(cnt, 1, (c + 2*nb)[seg] - 1) + koffsets[seg] - 1
+
+    return _cubic_eval(kt, kv, _cubic_slopes(kt, kv, koffsets), lo, t)
+
+def _sifting_mean(m, t, seg, starts, ends, threshold_1=0.05, threshold_2=0.5, alpha=0.05, nbsym=2):
+    """ Mean of the envelopes and stopping criterion of the sifting of series packed end to end
+
+    Same criterion as Rilling's EMD (and pyhht): the extrema are mirrored about the ends of each series,
+    the envelopes are interpolating cubic splines, and sifting stops when the mean of the envelopes is small
+    compared to their half-difference. Series that do not have enough extrema to build both envelopes stop,
+    with a zero mean.
+    """
+    ns = np.size(starts)
+    imax, imin, nzm = _segment_extrema(m, seg, starts, ends)
+    nmax = np.bincount(seg[imax], minlength=ns)
+    nmin = np.bincount(seg[imin], minlength=ns)
+    nem = nmax + nmin
+    # the splines need at least 4 knots
+    ok = (nem >= 3) & (nmax + 2*np.minimum(nmax, nbsym) >= 4) & (nmin + 2*np.minimum(nmin, nbsym) >= 4)
+
+    stop = np.ones(ns, dtype=bool)
+    moyenne = np.zeros(np.size(m))
+    if not np.any(ok):
+        return stop, moyenne
+
+    lens = (ends - starts + 1)[ok]
+    if np.all(ok):
+        q, sub_seg = slice(None), seg
+        env = [_envelope(t, m, iext, seg, starts, ends, nbsym=nbsym) for iext in (imin, imax)]
+    else:
+        # restrict to the series with enough extrema
+        pts = ok[seg]
+        q = np.nonzero(pts)[0]
+        newpos = np.cumsum(pts) - 1
+        sub_offsets = np.concatenate([[0], np.cumsum(lens)])
+        sub_seg = np.repeat(np.arange(np.size(lens)), lens)
+        env = [_envelope(t[q], m[q], newpos[iext[pts[iext]]], sub_seg, sub_offsets[:-1], sub_offsets[1:]-1, nbsym=nbsym)
+               for iext in (imin, imax)]
+
+    envmoy = (env[0] + env[1]) / 2
+    amp = np.abs(env[1] - env[0]) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sx = np.abs(envmoy) / amp
+    frac = np.bincount(sub_seg, weights=sx > threshold_1) / lens
+    over = np.bincount(sub_seg, weights=sx > threshold_2) > 0
+    stop_ok = ~(((frac > alpha) | over) & (nem[ok] > 2))
+    stop[ok] = stop_ok & ~(np.abs(nzm[ok] - nem[ok]) > 1)
+    moyenne[q] = envmoy
+
+    return stop, moyenne
+
+def emd_batch(ys, ts=None, n_imfs=0, threshold_1=0.05, threshold_2=0.5, alpha=0.05, maxiter=2000):
+    """ Empirical Mode Decomposition of many series at once
+
+    Vectorized version of the EMD algorithm of Rilling et al. (2003), as implemented in
+    `pyhht.emd.EMD <https://pyhht.readthedocs.io/en/stable/apiref/pyhht.html>`_, for a ragged set of series.
+    The series are packed end to end and sifted together: the extrema of all the series are found
+    in one pass, and the cubic spline envelopes of all the series are obtained from a single banded solve.
+    Each series stops sifting and decomposing on its own criterion, and then leaves the batch.
+
+    Parameters
+    ----------
+
+    ys : list of arrays
+        The series, possibly of different lengths
+
+    ts : list of arrays
+        The time axes of the series, strictly increasing. Default is None, i.e. the sample indices
+
+    n_imfs : int
+        Maximum number of intrinsic mode functions (IMFs) to extract; 0 (default) extracts them all
+
+    threshold_1 : float
+        Threshold of the ratio between the envelope mean and amplitude, to be met by most of the mode
+
+    threshold_2 : float
+        Threshold of the ratio between the envelope mean and amplitude, to be met by all of the mode
+
+    alpha : float
+        Tolerated fraction of the mode above threshold_1
+
+    maxiter : int
+        Maximum number of sifting iterations per mode
+
+    Returns
+    -------
+
+    imfs : list of arrays
+        For each series, the IMFs followed by the residue (the trend), of shape (number of modes, length of the series)
+
+    References
+    ----------
+
+    Rilling, G., Flandrin, P., & Goncalves, P. (2003). On empirical mode decomposition and its algorithms.
+    IEEE-EURASIP workshop on nonlinear signal and image processing, 3, 8-11.
+
+    See also
+    --------
+
+    pyleoclim.utils.tsutils.emd : Empirical Mode Decomposition of one series
+
+    pyleoclim.utils.tsutils.detrend : Detrending function
+
+    """
+    ys = [np.asarray(y, dtype='float64').ravel() for y in ys]
+    ns = len(ys)
+    lens = np.array([np.size(y) for y in ys], dtype=int)
+    if np.any(lens == 0):
+        raise ValueError('All the series must be non-empty')
+    offsets = np.concatenate([[0], np.cumsum(lens)])
+    starts, ends = offsets[:-1], offsets[1:]-1
+    seg = np.repeat(np.arange(ns), lens)
+
+    x = np.concatenate(ys)
+    if np.any(np.isinf(x)):
+        raise ValueError('All elements of the series must be finite.')
+    if ts is None:
+        t = (np.arange(np.size(x)) - starts[seg]).astype(float)
+    else:
+        t = np.concatenate([np.asarray(t_, dtype='float64').ravel() for t_ in ts])
+    scale = np.maximum.reduceat(np.abs(x), starts)
+
+    def sift_update(active, m, stop, moyenne):
+        # recompute the envelope mean and stopping criterion of the active series only
+        if np.all(active):
+            stop[:], moyenne[:] = _sifting_mean(m, t, seg, starts, ends, threshold_1=threshold_1,
+                                                threshold_2=threshold_2, alpha=alpha)
+            return
+        sel = np.nonzero(active[seg])[0]
+        sub_lens = lens[active]
+        sub_offsets = np.concatenate([[0], np.cumsum(sub_lens)])
+        sub_seg = np.repeat(np.arange(np.size(sub_lens)), sub_lens)
+        stop[active], moyenne[sel] = _sifting_mean(m[sel], t[sel], sub_seg, sub_offsets[:-1], sub_offsets[1:]-1,
+                                                   threshold_1=threshold_1, threshold_2=threshold_2, alpha=alpha)
+
+    def keep_decomposing(residue, k):
+        imax, imin, _ = _segment_extrema(residue, seg, starts, ends)
+        ner = np.bincount(seg[imax], minlength=ns) + np.bincount(seg[imin], minlength=ns)
+        return (ner >= 3) & ((k < n_imfs) | (n_imfs == 0))
+
+    imfs = [[] for _ in range(ns)]
+    residue = x.copy()
+    m = x.copy()
+    moyenne = np.zeros(np.size(x))
+    stop = np.ones(ns, dtype=bool)
+    nbit = np.zeros(ns, dtype=int)
+    k = np.zeros(ns, dtype=int)
+
+    active = keep_decomposing(residue, k)
+    while np.any(active):
+        # start a new mode from the residue
+        pts = active[seg]
+        m[pts] = residue[pts]
+        sift_update(active, m, stop, moyenne)
+
+        # stop when the mode is small enough to cause spurious extrema
+        tiny = np.maximum.reduceat(np.abs(m), starts) < 1e-10*scale
+        active &= ~tiny
+
+        nbit[active] = 0
+        sifting = active & ~stop
+        while np.any(sifting):
+            pts = sifting[seg]
+            m[pts] -= moyenne[pts]
+            sift_update(sifting, m, stop, moyenne)
+            nbit[sifting] += 1
+            sifting &= ~stop & (nbit < maxiter)
+
+        for j in np.nonzero(active)[0]:
+            imfs[j].append(m[starts[j]:ends[j]+1].copy())
+        pts = active[seg]
+        residue[pts] -= m[pts]
+        k[active] += 1
+        active &= keep_decomposing(residue, k)
+
+    for j in range(ns):
+        res_j = residue[starts[j]:ends[j]+1]
+        if np.any(res_j):
+            imfs[j].append(res_j)
+
+    return [np.array(imf) for imf in imfs]
+
+def emd(y, t=None, n_imfs=0, threshold_1=0.05, threshold_2=0.5, alpha=0.05, maxiter=2000):
+    """ Empirical Mode Decomposition
+
+    Decomposes a series into intrinsic mode functions (IMFs) and a residue, following the algorithm of
+    Rilling et al. (2003), as implemented in `pyhht.emd.EMD <https://pyhht.readthedocs.io/en/stable/apiref/pyhht.html>`_.
+
+    Parameters
+    ----------
+
+    y : array
+        The series
+
+    t : array
+        The time axis of the series, strictly increasing. Default is None, i.e. the sample indices
+
+    n_imfs : int
+        Maximum number of IMFs to extract; 0 (default) extracts them all
+
+    threshold_1 : float
+        Threshold of the ratio between the envelope mean and amplitude, to be met by most of the mode
+
+    threshold_2 : float
+        Threshold of the ratio between the envelope mean and amplitude, to be met by all of the mode
+
+    alpha : float
+        Tolerated fraction of the mode above threshold_1
+
+    maxiter : int
+        Maximum number of sifting iterations per mode
+
+    Returns
+    -------
+
+    imfs : array
+        The IMFs followed by the residue (the trend), of shape (number of modes, len(y))
+
+    See also
+    --------
+
+    pyleoclim.utils.tsutils.emd_batch : Empirical Mode Decomposition of many series at once
+
+    Examples
+    --------
+
+    .. jupyter-execute::
+
+        import numpy as np
+        import pyleoclim as pyleo
+
+        t = np.linspace(0, 1, 1000)
+        y = np.sin(2*np.pi*5*t) + np.sin(2*np.pi*40*t) + t
+        imfs = pyleo.utils.tsutils.emd(y)
+        imfs.shape
+
+    """
+    ts = None if t is None else [t]
+    return emd_batch([y], ts=ts, n_imfs=n_imfs, threshold_1=threshold_1, threshold_2=threshold_2,
+                     alpha=alpha, maxiter=maxiter)[0]
+
+def _emd_trend(imfs, n):
+    """ Sum of the n smoothest modes of an EMD, or zero if the series has no IMF
+    """
+    if np.shape(imfs)[0] <= 1:
+        return np.zeros(np.shape(imfs)[-1]) if np.ndim(imfs) == 2 else 0
+    return np.sum(imfs[-n:], axis=0)  # remove the n smoothest modes
+
+def detrend_emd_batch(ys, n=1, preserve_mean=False):
+    """ Detrend many series at once with Empirical Mode Decomposition
+
+    Batched version of `detrend(method='emd')`, based on `emd_batch`.
+
+    Parameters
+    ----------
+
+    ys : list of arrays
+        The series to be detrended, possibly of different lengths
+
+    n : int
+        The number of smoothest modes to remove.
+
+    preserve_mean : boolean
+        flag to indicate whether the mean of the series should be preserved despite the detrending
+
+    Returns
+    -------
+
+    ys_detrended : list of arrays
+        The detrended versions of the series
+
+    trends : list of arrays
+        The removed trends
+
+    See also
+    --------
+
+    pyleoclim.utils.tsutils.detrend : Detrend a timeseries
+
+    """
+    ys = [np.array(y, dtype='float64') for y in ys]
+    ys_detrended, trends = [], []
+    for y, imfs in zip(ys, emd_batch(ys)):
+        trend = _emd_trend(imfs, n)
+        yd = y - trend
+        if preserve_mean:
+            yd = yd - yd.mean() + y.mean()
+        ys_detrended.append(yd)
+        trends.append(trend)
+
+    return ys_detrended, trends
+
 def detrend(y, x=None, method="emd", n=1, preserve_mean = False, sg_kwargs=None):
     """Detrend a timeseries according to four methods
 
     Detrending methods include: "linear", "constant", using a low-pass Savitzky-Golay filter, and Empirical Mode Decomposition (default).
     Linear and constant methods use `scipy.signal.detrend <https://docs.scipy.org/doc/scipy/reference/generated/scipy.signal.detrend.html>`_.,
-    EMD uses `pyhht.emd.EMD <https://pyhht.readthedocs.io/en/stable/apiref/pyhht.html>`_.
+    EMD uses `pyleoclim.utils.tsutils.emd`, a port of `pyhht.emd.EMD <https://pyhht.readthedocs.io/en/stable/apiref/pyhht.html>`_.
 
     Parameters
     ----------
@@ -995,12 +1665,8 @@ def detrend(y, x=None, method="emd", n=1, preserve_mean = False, sg_kwargs=None)
         trend = np.interp(x,x_interp,y_filt)
         ys = y - trend
     elif method == "emd":
-        imfs = EMD(y).decompose()
-        if np.shape(imfs)[0] == 1:
-            trend = np.zeros(np.size(y))
-        else:
-            trend = np.sum(imfs[-n:], axis=0)  # remove the n smoothest modes
-
+        imfs = emd(y)
+        trend = _emd_trend(imfs, n)
         ys = y - trend
     else:
         raise KeyError('Unknown method. Use one of linear, constant, savitzky-golay, emd (case-sensitive)')
@@ -1047,11 +1713,12 @@ def calculate_distances(ys, n_neighbors=None, NN_kwargs=None):
         if min_eps<=0:
             min_eps=0.01
     
-        # Highest number of nearest neighbors
-        neigh = NearestNeighbors(n_neighbors=len(ys)-1)
-        nbrs = neigh.fit(ys.reshape(-1, 1))
-        distances, indices = nbrs.kneighbors(ys.reshape(-1, 1))
-        max_eps = np.max(distances)
+        # Highest number of nearest neighbors: all points but the farthest one. In 1D, the two
+        # farthest points are among the two smallest and the two largest values
+        v = np.sort(ys)
+        ends = v[np.unique([0, 1, len(v)-2, len(v)-1])]
+        distances = np.sort(np.abs(ys[:, None] - ends[None, :]), axis=1)
+        max_eps = np.max(distances[:, -2])
     
     else:
         neigh = NearestNeighbors(n_neighbors=n_neighbors)
@@ -1062,7 +1729,217 @@ def calculate_distances(ys, n_neighbors=None, NN_kwargs=None):
     
     return min_eps, max_eps
 
-def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None, n_neighbors=None, metric='euclidean', NN_kwargs= None, DBSCAN_kwargs=None):
+def _neighbor_bounds_1d(v, eps):
+    """ Bounds of the eps-neighborhoods of sorted 1D data
+
+    Neighbors are tested on the differences of the values, v[j] - v[i] <= eps, as the distances computed by
+    sklearn.neighbors; this is not the same, in floating point, as comparing v[j] to v[i] + eps, notably for
+    rounded data. Since the differences are monotonic in sorted order, the bounds are found by a bisection
+    carried out for all points at once.
+
+    Parameters
+    ----------
+    v : numpy.array
+        the data, sorted in ascending order
+    eps : float
+        the maximum distance between two neighbors
+
+    Returns
+    -------
+    lo : numpy.array
+        the index of the first neighbor of each point
+    hi : numpy.array
+        one past the index of the last neighbor of each point
+
+    """
+    n = np.size(v)
+
+    # smallest j such that v[i] - v[j] <= eps
+    a, lo = np.zeros(n, dtype=int), np.arange(n)
+    while np.any(a < lo):
+        mid = (a + lo) // 2
+        ok = v - v[mid] <= eps
+        lo, a = np.where(ok, mid, lo), np.where(ok, a, mid+1)
+
+    # smallest j such that v[j] - v[i] > eps
+    a, hi = np.arange(n) + 1, np.full(n, n)
+    while np.any(a < hi):
+        mid = (a + hi) // 2
+        out = v[np.minimum(mid, n-1)] - v > eps
+        hi, a = np.where(out, mid, hi), np.where(out, a, mid+1)
+
+    return lo, hi
+
+def _dbscan_labels_1d(v, order, core, eps):
+    """ DBSCAN labels of sorted 1D data, given its core points
+
+    In one dimension, two consecutive core points (in sorted order) belong to the same cluster
+    if and only if they are at most eps apart, and a border point can only be reached from the nearest
+    core point on either side. Clusters are numbered, and contested border points assigned, in the same
+    order as sklearn.cluster.DBSCAN does, i.e. by the smallest original index of their core points.
+
+    Parameters
+    ----------
+    v : numpy.array
+        the data, sorted in ascending order
+    order : numpy.array
+        the original indices of the sorted data
+    core : numpy.array
+        boolean mask of the core points, in sorted order
+    eps : float
+        the maximum distance between two neighbors
+
+    Returns
+    -------
+    labels : numpy.array
+        the cluster of each point, in sorted order; -1 for noise
+
+    """
+    n = np.size(v)
+    labels = np.full(n, -1)
+    ci = np.nonzero(core)[0]
+    if ci.size == 0:
+        return labels
+
+    new_block = np.ones(ci.size, dtype=bool)
+    new_block[1:] = v[ci[1:]] - v[ci[:-1]] > eps
+    block = np.cumsum(new_block) - 1
+    first_idx = np.minimum.reduceat(order[ci], np.nonzero(new_block)[0])
+    block_label = np.argsort(np.argsort(first_idx))
+    labels[ci] = block_label[block]
+
+    # border points: nearest core point on the left and on the right
+    pos = np.arange(n)
+    il = np.searchsorted(ci, pos, side='right') - 1
+    ir = np.searchsorted(ci, pos, side='left')
+    cl = ci[np.maximum(il, 0)]
+    cr = ci[np.minimum(ir, ci.size-1)]
+    lab_l = np.where((il >= 0) & (v - v[cl] <= eps), labels[cl], n)
+    lab_r = np.where((ir < ci.size) & (v[cr] - v <= eps), labels[cr], n)
+    lab_b = np.minimum(lab_l, lab_r)
+    border = ~core & (lab_b < n)
+    labels[border] = lab_b[border]
+
+    return labels
+
+def _silhouette_1d(v, labels):
+    """ Silhouette score of a DBSCAN clustering of sorted 1D data
+
+    Same as sklearn.metrics.silhouette_score, with the noise (-1) counted as a cluster, but linear
+    in the number of points: the summed distances to the members of a cluster are obtained from
+    prefix sums, and since DBSCAN clusters of 1D data are contiguous in sorted order, the nearest
+    other cluster of a point is the noise or one of the two clusters on either side of it.
+
+    Parameters
+    ----------
+    v : numpy.array
+        the data, sorted in ascending order
+    labels : numpy.array
+        the cluster of each point, in sorted order; -1 for noise
+
+    Returns
+    -------
+    score : float
+        the mean silhouette coefficient; NaN if there are fewer than 2 or more than n-1 labels
+
+    """
+    n = np.size(v)
+    lab = labels + 1 # the noise becomes label 0
+    counts = np.bincount(lab)
+    if np.count_nonzero(counts) < 2 or np.count_nonzero(counts) > n-1:
+        return np.nan
+    sums = np.bincount(lab, weights=v)
+
+    # mean distance to the other members of the own cluster
+    idx = np.argsort(lab, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[lab[idx]]
+    csum = np.cumsum(v[idx]) - v[idx]
+    cnt_below = np.empty(n)
+    sum_below = np.empty(n)
+    cnt_below[idx] = np.arange(n) - starts
+    sum_below[idx] = csum - csum[starts]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (v*(2*cnt_below - counts[lab]) - 2*sum_below + sums[lab]) / (counts[lab] - 1)
+
+    # mean distance to the nearest other cluster
+    b = np.full(n, np.inf)
+    noise = lab == 0
+    if counts[0] > 0:
+        cnt_noise = np.cumsum(noise) - noise
+        sum_noise = np.cumsum(v*noise) - v*noise
+        d_noise = (v*(2*cnt_noise - counts[0]) - 2*sum_noise + sums[0]) / counts[0]
+        b[~noise] = d_noise[~noise]
+
+    is_real = ~noise
+    rp = np.nonzero(is_real)[0]
+    if rp.size > 0:
+        new_block = np.zeros(n, dtype=bool)
+        new_block[rp] = np.concatenate([[True], lab[rp[1:]] != lab[rp[:-1]]])
+        block_mean = sums[lab[new_block]] / counts[lab[new_block]]
+        nb = block_mean.size
+        bcount = np.cumsum(new_block)
+        left = bcount - 1 - is_real
+        right = bcount
+        d_left = np.where(left >= 0, v - block_mean[np.maximum(left, 0)], np.inf)
+        d_right = np.where(right < nb, block_mean[np.minimum(right, nb-1)] - v, np.inf)
+        b = np.minimum(b, np.minimum(d_left, d_right))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.nan_to_num((b - a) / np.maximum(a, b))
+
+    return np.mean(s)
+
+def _dbscan_sweep_1d(ys, eps_list, min_samples_list):
+    """ DBSCAN clusterings of 1D data over a grid of eps and min_samples values
+
+    The data are sorted once; for each eps, the size of the neighborhood of every point is obtained
+    by a binary search in the sorted data, and the clusterings for all the min_samples values follow
+    from it in linear time, as does their silhouette score. As neighbors are tested on the differences
+    of the values, like the distances of sklearn, the labels are identical to those of
+    sklearn.cluster.DBSCAN with the euclidean metric, including for tied or rounded values.
+
+    Parameters
+    ----------
+    ys : numpy.array
+        the data
+    eps_list : list
+        the eps values
+    min_samples_list : list
+        the min_samples values
+
+    Returns
+    -------
+    res : dict
+        with keys 'eps', 'min_samples', 'number of clusters', 'silhouette score', 'outlier indices' and 'clusters',
+        each holding a list with one entry per (eps, min_samples) combination, eps varying slowest
+
+    See also
+    --------
+
+    pyleoclim.utils.tsutils.detect_outliers_DBSCAN : Outlier detection using the DBSCAN method
+
+    """
+    order = np.argsort(ys, kind='stable')
+    v = ys[order]
+
+    res = {key: [] for key in ['eps', 'min_samples', 'number of clusters', 'silhouette score', 'outlier indices', 'clusters']}
+    for eps_item in eps_list:
+        lo, hi = _neighbor_bounds_1d(v, eps_item)
+        n_neighbors = hi - lo
+        for min_samples_item in min_samples_list:
+            labels_sorted = _dbscan_labels_1d(v, order, n_neighbors >= min_samples_item, eps_item)
+            labels = np.empty_like(labels_sorted)
+            labels[order] = labels_sorted
+            res['eps'].append(eps_item)
+            res['min_samples'].append(min_samples_item)
+            res['number of clusters'].append(len(np.unique(labels))-1)
+            res['silhouette score'].append(_silhouette_1d(v, labels_sorted))
+            res['outlier indices'].append(np.where(labels==-1)[0])
+            res['clusters'].append(labels)
+
+    return res
+
+def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None, n_neighbors=None, metric='euclidean', NN_kwargs= None, DBSCAN_kwargs=None, sweep=True):
     """
     Uses the unsupervised learning DBSCAN algorithm to identify outliers in timeseries data. 
     The algorithm uses the silhouette score calculated over a range of epsilon and minimum sample values to determine the best clustering. In this case, we take the largest silhouette score (as close to 1 as possible). 
@@ -1071,6 +1948,8 @@ def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None,
     
     The Silhouette Coefficient is calculated using the mean intra-cluster distance (a) and the mean nearest-cluster distance (b) for each sample. The best value is 1 and the worst value is -1. Values near 0 indicate overlapping clusters. Negative values generally indicate that a sample has been assigned to the wrong cluster, as a different cluster is more similar. For additional details, see: https://scikit-learn.org/stable/modules/generated/sklearn.metrics.silhouette_score.html
 
+    By default, the clusterings for all the (eps, min_samples) combinations are derived from a single sort of the data rather than by fitting DBSCAN for each of them: in one dimension, the neighbors of a point are contiguous in sorted order and the clusters are runs of core points at most eps apart, which gives the same labels as scikit-learn in O(N log N) per eps value. The silhouette scores are computed exactly in linear time, using prefix sums.
+
     Parameters
     ----------
     ys : numpy.array
@@ -1092,6 +1971,9 @@ def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None,
     DBSCAN_kwargs : dict, optional
         Other arguments for sklearn.cluster.DBSCAN. The default is None.
         See: https://scikit-learn.org/stable/modules/generated/sklearn.cluster.DBSCAN.html
+        If passed, sweep is ignored and DBSCAN is fitted for each combination.
+    sweep : bool, optional
+        If True, the clusterings for the whole grid of eps and min_samples are derived from a single sort of the data. If False, sklearn.cluster.DBSCAN is fitted and sklearn.metrics.silhouette_score computed for each combination, which scales as O(N²). The default is True.
 
 
     Returns
@@ -1130,41 +2012,41 @@ def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None,
         print("You have tried to pass a float or integer, coercing to a list")
         min_samples_list=list(min_samples)
     
-    print("Optimizing for the best number of clusters, this may take a few minutes")
-    
-    
-    nbr_clusters=[]
-    sil_score =[]
-    eps_matrix=[]
-    min_sample_matrix=[]
-    idx_out = []
-    clusters = []
-
-    for eps_item in eps_list:
-        for min_samples_item in min_samples_list:
-            eps_matrix.append(eps_item)
-            min_sample_matrix.append(min_samples_item)
-            m = DBSCAN(eps=eps_item, min_samples=min_samples_item,**DBSCAN_kwargs)
-            m.fit(ys.reshape(-1,1))
-            nbr_clusters.append(len(np.unique(m.labels_))-1)
-            try:
-                sil_score.append(silhouette_score(ys.reshape(-1,1), m.labels_))
-            except:
-                sil_score.append(np.nan)
-            idx_out.append(np.where(m.labels_==-1)[0])
-            clusters.append(m.labels_)
-            
-    res = pd.DataFrame({'eps':eps_matrix,'min_samples':min_sample_matrix,'number of clusters':nbr_clusters,'silhouette score':sil_score,'outlier indices':idx_out,'clusters':clusters})
-    
-    if nbr_clusters is None: 
-        res_sil = res.loc[res['silhouette score']==np.max(res['silhouette score'])]
+    if sweep and not DBSCAN_kwargs:
+        res = pd.DataFrame(_dbscan_sweep_1d(ys, eps_list, min_samples_list))
     else:
-        try: 
-            res_cl = res.loc[res['number of clusters']==nbr_clusters]
-            res_sil = res_cl.loc[res_cl['silhouette score']==np.max(res_cl['silhouette score'])]
-        except:
+        print("Optimizing for the best number of clusters, this may take a few minutes")
+
+        nbr_clusters_list=[]
+        sil_score =[]
+        eps_matrix=[]
+        min_sample_matrix=[]
+        idx_out = []
+        clusters = []
+
+        for eps_item in eps_list:
+            for min_samples_item in min_samples_list:
+                eps_matrix.append(eps_item)
+                min_sample_matrix.append(min_samples_item)
+                m = DBSCAN(eps=eps_item, min_samples=min_samples_item,**DBSCAN_kwargs)
+                m.fit(ys.reshape(-1,1))
+                nbr_clusters_list.append(len(np.unique(m.labels_))-1)
+                try:
+                    sil_score.append(silhouette_score(ys.reshape(-1,1), m.labels_))
+                except:
+                    sil_score.append(np.nan)
+                idx_out.append(np.where(m.labels_==-1)[0])
+                clusters.append(m.labels_)
+
+        res = pd.DataFrame({'eps':eps_matrix,'min_samples':min_sample_matrix,'number of clusters':nbr_clusters_list,'silhouette score':sil_score,'outlier indices':idx_out,'clusters':clusters})
+    
+    res_cl = res
+    if nbr_clusters is not None:
+        res_cl = res.loc[res['number of clusters']==nbr_clusters]
+        if res_cl.empty:
             print("No valid solutions for the number of clusters, returning from silhouette score")
-            res_sil = res.loc[res['silhouette score']==np.max(res['silhouette score'])]
+            res_cl = res
+    res_sil = res_cl.loc[res_cl['silhouette score']==np.max(res_cl['silhouette score'])]
     
     unique_idx = list(res_sil['outlier indices'].iloc[0])
     
@@ -1178,7 +2060,84 @@ def detect_outliers_DBSCAN(ys, nbr_clusters = None, eps=None, min_samples=None,
     
     return indices, res
 
-def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=3, LOF=False, n_frac=0.9, contamination='auto', kmeans_kwargs=None):
+def _kmeans_1d(v, range_n_clusters):
+    """ Optimal k-means clusterings of sorted 1D data, for several numbers of clusters
+
+    In one dimension, the clusters of an optimal k-means partition are contiguous in sorted order,
+    so the partition minimizing the within-cluster sum of squares can be found exactly by dynamic
+    programming over the split points (Wang & Song, 2011). The optimal split points are monotonic,
+    which allows each of the k-1 passes to be solved by divide and conquer in O(N log N); all the
+    subproblems of one recursion level are solved at once.
+
+    Parameters
+    ----------
+    v : numpy.array
+        the data, sorted in ascending order
+    range_n_clusters : list
+        the numbers of clusters
+
+    Returns
+    -------
+    labels_list : list
+        for each number of clusters, the cluster of each point (in sorted order), numbered from the smallest values up
+
+    References
+    ----------
+
+    Wang, H., & Song, M. (2011). Ckmeans.1d.dp: Optimal k-means clustering in one dimension by dynamic programming. The R Journal, 3(2), 29-33.
+
+    """
+    n = np.size(v)
+    k_max = int(np.max(range_n_clusters))
+    if k_max > n:
+        raise ValueError(f'n_samples={n} should be >= n_clusters={k_max}')
+
+    s1 = np.concatenate([[0], np.cumsum(v)])
+    s2 = np.concatenate([[0], np.cumsum(v**2)])
+
+    def cost(j, i):
+        # sum of squares of v[j:i+1] around its mean
+        return (s2[i+1] - s2[j]) - (s1[i+1] - s1[j])**2 / (i - j + 1)
+
+    D = cost(np.zeros(n, dtype=int), np.arange(n))
+    first = [np.zeros(n, dtype=int)] # start of the last cluster of v[:i+1], for each number of clusters
+    for k in range(2, k_max+1):
+        Dk = np.full(n, np.inf)
+        Jk = np.zeros(n, dtype=int)
+        i_lo, i_hi, j_lo, j_hi = (np.array([x]) for x in (k-1, n-1, k-1, n-1))
+        while i_lo.size > 0:
+            mid = (i_lo + i_hi) // 2
+            size = np.minimum(j_hi, mid) - j_lo + 1
+            starts = np.cumsum(size) - size
+            seg = np.repeat(np.arange(mid.size), size)
+            j = np.arange(np.sum(size)) - starts[seg] + j_lo[seg]
+            val = D[j-1] + cost(j, mid[seg])
+            vmin = np.minimum.reduceat(val, starts)
+            is_min = np.flatnonzero(val == vmin[seg])
+            jbest = j[is_min[np.unique(seg[is_min], return_index=True)[1]]]
+            Dk[mid] = vmin
+            Jk[mid] = jbest
+
+            left = mid > i_lo
+            right = mid < i_hi
+            i_lo, i_hi, j_lo, j_hi = (np.concatenate([a[left], b[right]]) for a, b in
+                                      ((i_lo, mid+1), (mid-1, i_hi), (j_lo, jbest), (jbest, j_hi)))
+        D = Dk
+        first.append(Jk)
+
+    labels_list = []
+    for num_clusters in range_n_clusters:
+        labels = np.empty(n, dtype=int)
+        i = n - 1
+        for k in range(num_clusters, 0, -1):
+            j = first[k-1][i]
+            labels[j:i+1] = k - 1
+            i = j - 1
+        labels_list.append(labels)
+
+    return labels_list
+
+def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=3, LOF=False, n_frac=0.9, contamination='auto', kmeans_kwargs=None, optimal=True):
     """
     Outlier detection using the unsupervised alogrithm kmeans. The algorithm runs through various number of clusters and optimizes based on the silhouette score.
     
@@ -1188,6 +2147,8 @@ def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=
 
     Outliers are identified based on their distance from the clusters. This can be done in two ways: (1) by using a threshold that corresponds to the Euclidean distance from the centroid and (2) using the Local Outlier Function (https://scikit-learn.org/stable/auto_examples/neighbors/plot_lof_outlier_detection.html)
 
+    By default, the clusterings are not obtained from scikit-learn's KMeans but from the exact k-means solution for one-dimensional data (Wang & Song, 2011), computed by dynamic programming on the sorted values for all the numbers of clusters at once. Since these clusters are contiguous in sorted order, their silhouette scores are also computed exactly in linear time, which makes the method usable on series of 10^5 points.
+
     Parameters
     ----------
     ys : numpy.array
@@ -1207,6 +2168,9 @@ def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=
         Same as LOF parameter from scikit-learn. We recommend using the default mode of auto. See: https://scikit-learn.org/stable/modules/generated/sklearn.neighbors.LocalOutlierFactor.html for details.
     kmeans_kwargs : dict, optional
         Other parameters for the kmeans function. See: https://scikit-learn.org/stable/modules/generated/sklearn.cluster.KMeans.html for details. The default is None.
+        If passed, optimal is ignored and KMeans is fitted for each number of clusters.
+    optimal : bool, optional
+        If True, the clusterings are the optimal k-means partitions of the values, found by dynamic programming. If False, sklearn.cluster.KMeans is fitted and sklearn.metrics.silhouette_score computed for each number of clusters, which scales as O(N²). The default is True.
 
     Returns
     -------
@@ -1215,6 +2179,10 @@ def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=
     res : pandas.DataFrame
         Results of the clustering analysis. Contains information about number of clusters, the silhouette score, the indices of the outliers for each combination, and the cluster assignment for each point. 
 
+    References
+    ----------
+
+    Wang, H., & Song, M. (2011). Ckmeans.1d.dp: Optimal k-means clustering in one dimension by dynamic programming. The R Journal, 3(2), 29-33.
 
     """
     
@@ -1235,20 +2203,35 @@ def detect_outliers_kmeans(ys, nbr_clusters = None, max_cluster = 10, threshold=
     silhouette_avg = []
     idx_out=[]
     clusters = []
+
+    optimal = optimal and not kmeans_kwargs
+    if optimal:
+        order = np.argsort(ys, kind='stable')
+        labels_sorted_list = _kmeans_1d(ys[order], range_n_clusters)
+
+    if LOF:
+        # the outliers do not depend on the clustering
+        model = LocalOutlierFactor(n_neighbors=int(ys.size*n_frac), contamination=contamination)
+        pred = model.fit_predict(ys.reshape(-1,1))
     
-    for num_clusters in range_n_clusters:
-        kmeans = KMeans(n_clusters=num_clusters)
-        kmeans.fit(ys.reshape(-1, 1), **kmeans_kwargs)
-        silhouette_avg.append(silhouette_score(ys.reshape(-1, 1), kmeans.labels_))
-        center=kmeans.cluster_centers_[kmeans.labels_,0]
+    for k, num_clusters in enumerate(range_n_clusters):
+        if optimal:
+            labels = np.empty(ys.size, dtype=int)
+            labels[order] = labels_sorted_list[k]
+            silhouette_avg.append(_silhouette_1d(ys[order], labels_sorted_list[k]))
+            center = (np.bincount(labels, weights=ys)/np.bincount(labels))[labels]
+        else:
+            kmeans = KMeans(n_clusters=num_clusters)
+            kmeans.fit(ys.reshape(-1, 1), **kmeans_kwargs)
+            labels = kmeans.labels_
+            silhouette_avg.append(silhouette_score(ys.reshape(-1, 1), labels))
+            center=kmeans.cluster_centers_[labels,0]
         if LOF:
-            model = LocalOutlierFactor(n_neighbors=int(ys.size*n_frac), contamination=contamination)
-            pred = model.fit_predict(ys.reshape(-1,1))
             idx_out.append(np.where(pred==-1))
         else:
             distance=np.sqrt((ys-center)**2)
             idx_out.append(np.argwhere(distance>threshold).reshape(1,-1)[0])
-        clusters.append(kmeans.labels_)
+        clusters.append(labels)
     
     res = pd.DataFrame({'number of clusters':range_n_clusters, 'silhouette score':silhouette_avg,'outlier indices':idx_out,'clusters':clusters})
     res_sil = res.loc[res['silhouette score']==np.max(res['silhouette score'])]